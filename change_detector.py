@@ -0,0 +1,185 @@
+"""
+Frame change detector for AnimeParadoxMacro
+Compares grayscale copies of named regions between consecutive frames and
+marks regions dirty when enough of their pixels changed. Boxed regions (HUD
+counters, buttons) are small and diffed pixel for pixel, so a one-digit
+change is never missed; the whole-frame region is compared as step x step
+block means, which keeps every pixel in play at a fraction of the cost.
+Detection (OCR, template matching) only needs to run on dirty regions, and
+wait_for_change() lets the loop idle on cheap diffs instead of fixed sleeps
+followed by full detection.
+"""
+import time
+import threading
+import numpy as np
+
+FULL_FRAME = 'frame'
+
+
+class _RegionState:
+    __slots__ = ('box', 'previous', 'dirty', 'changes', 'last_change')
+
+    def __init__(self, box):
+        self.box = box
+        self.previous = None
+        self.dirty = True
+        self.changes = 0
+        self.last_change = 0.0
+
+
+class ChangeDetector:
+    """Per-region change tracking over a stream of Frames"""
+
+    def __init__(self, regions=None, step=8, pixel_threshold=24, min_fraction=0.01, min_pixels=6):
+        # Whole frame as step x step block means: a 960x600 frame compares 120x75 blocks
+        self.step = max(1, int(step))
+        # Boxed regions also count as changed once this many pixels moved (a digit is a few dozen)
+        self.min_pixels = min_pixels
+        self._block_counts = {}
+        self.pixel_threshold = pixel_threshold
+        self.min_fraction = min_fraction
+        self._regions = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.update_seconds = 0.0
+        for name, box in (regions or {FULL_FRAME: None}).items():
+            self.add_region(name, box)
+
+    def add_region(self, name, box=None):
+        """Watch (left, top, right, bottom) in frame pixels; None means the whole frame"""
+        with self._lock:
+            self._regions[name] = _RegionState(tuple(box) if box is not None else None)
+
+    def remove_region(self, name):
+        with self._lock:
+            self._regions.pop(name, None)
+
+    def add_listener(self, callback):
+        """``callback(changed_names, frame)`` runs on the updating thread after each change"""
+        self._listeners.append(callback)
+
+    def _counts(self, height, width):
+        """Pixels per block for a region shape (edge blocks may be partial)"""
+        counts = self._block_counts.get((height, width))
+        if counts is None:
+            rows = np.diff(np.append(np.arange(0, height, self.step), height))
+            cols = np.diff(np.append(np.arange(0, width, self.step), width))
+            counts = np.outer(rows, cols).astype(np.float32)
+            self._block_counts[(height, width)] = counts
+        return counts
+
+    def _sample(self, gray, box):
+        """Pixels of a boxed region, or step x step block means of the whole frame, as float32"""
+        if box is not None:
+            left, top, right, bottom = box
+            return gray[top:bottom, left:right].astype(np.float32)
+        height, width = gray.shape[:2]
+        if height == 0 or width == 0:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self.step == 1:
+            return gray.astype(np.float32)
+        step = self.step
+        if height % step == 0 and width % step == 0:
+            # Summing the step interleaved row/column slices is ~10x faster than reducing a reshaped view
+            rows = gray[0::step].astype(np.uint16 if step <= 16 else np.uint32)
+            for i in range(1, step):
+                rows += gray[i::step]
+            sums = rows[:, 0::step].copy()
+            for j in range(1, step):
+                sums += rows[:, j::step]
+            return sums.astype(np.float32) / (step * step)
+        sums = np.add.reduceat(gray, np.arange(0, height, self.step), axis=0, dtype=np.uint32)
+        sums = np.add.reduceat(sums, np.arange(0, width, self.step), axis=1)
+        return sums.astype(np.float32) / self._counts(height, width)
+
+    def update(self, frame):
+        """Diff a new frame against the previous one; returns the names of regions that changed"""
+        started = time.perf_counter()
+        gray = frame.gray() if hasattr(frame, 'gray') else np.asarray(frame)
+        changed = []
+        with self._lock:
+            for name, state in self._regions.items():
+                sample = self._sample(gray, state.box)
+                previous = state.previous
+                if previous is None or previous.shape != sample.shape:
+                    state.previous = sample.copy()
+                    is_changed = True
+                else:
+                    diff = np.abs(sample - previous)
+                    moved = np.count_nonzero(diff > self.pixel_threshold)
+                    is_changed = moved > self.min_fraction * diff.size or \
+                        (state.box is not None and moved >= self.min_pixels)
+                    if is_changed:
+                        np.copyto(state.previous, sample)
+                if is_changed:
+                    state.dirty = True
+                    state.changes += 1
+                    state.last_change = time.monotonic()
+                    changed.append(name)
+            self.frames += 1
+            self.update_seconds += time.perf_counter() - started
+
+        if changed:
+            for callback in list(self._listeners):
+                try:
+                    callback(changed, frame)
+                except Exception as e:
+                    print(f"Change listener error: {e}")
+        return changed
+
+    def is_dirty(self, name):
+        state = self._regions.get(name)
+        return state is None or state.dirty
+
+    def consume(self, name):
+        """True if the region changed since the last consume(); clears its dirty flag"""
+        with self._lock:
+            state = self._regions.get(name)
+            if state is None:
+                return True
+            dirty = state.dirty
+            state.dirty = False
+            return dirty
+
+    def mark_dirty(self, name=None):
+        """Force detection on a region (or all regions) at the next check"""
+        with self._lock:
+            for region, state in self._regions.items():
+                if name is None or region == name:
+                    state.dirty = True
+
+    def wait_for_change(self, source, names=None, timeout=None, interval=0.05, stop_event=None):
+        """Read frames from source until one of names (default: any region) changes.
+
+        Returns (changed_names, frame); changed_names is empty on timeout, on a
+        stop_event or when the source runs out of frames.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        wanted = None if names is None else set(names)
+        frame = None
+        while True:
+            frame = source.read()
+            if frame is None:
+                return [], None
+            changed = self.update(frame)
+            if wanted is not None:
+                changed = [name for name in changed if name in wanted]
+            if changed:
+                return changed, frame
+            if deadline is not None and time.monotonic() >= deadline:
+                return [], frame
+            if stop_event is not None:
+                if stop_event.wait(interval):
+                    return [], frame
+            else:
+                time.sleep(interval)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "frames": self.frames,
+                "avg_update_ms": round(self.update_seconds * 1000 / self.frames, 3) if self.frames else 0.0,
+                "regions": {name: {"changes": state.changes, "dirty": state.dirty}
+                            for name, state in self._regions.items()}
+            }
@@ -0,0 +1,113 @@
+"""
+In-memory config store for AnimeParadoxMacro
+Serves the macro config from memory (re-reading only when the file's mtime
+changes) and coalesces saves into debounced atomic writes. The file is the
+one the config module names; a write that load_config() does not read back
+goes through config.save_config() instead, so the two never drift apart.
+"""
+import os
+import json
+import atexit
+import tempfile
+import threading
+import config
+from config import load_config, save_config
+
+
+def _config_path():
+    """The file config.load_config() reads, as named by the config module"""
+    path = getattr(config, 'CONFIG_FILE', None) or getattr(config, 'CONFIG_PATH', None) or "macro_config.json"
+    if os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(config.__file__)), path)
+
+
+CONFIG_PATH = _config_path()
+
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file next to ``path`` and rename it into place"""
+    folder = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '-', suffix='.tmp', dir=folder)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ConfigStore:
+    """Cached config with mtime revalidation and debounced atomic saves"""
+
+    def __init__(self, path=CONFIG_PATH, delay=0.5):
+        self.path = path
+        self.delay = delay
+        self._lock = threading.RLock()
+        self._config = None
+        self._mtime = None
+        self._dirty = False
+        self._timer = None
+        self._via_save_config = False
+        self.writes = 0
+        atexit.register(self.flush)
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self):
+        """Current config; reloaded only if the file changed on disk and nothing is pending"""
+        with self._lock:
+            if self._config is None:
+                self._config = load_config()
+                self._mtime = self._file_mtime()
+            elif not self._dirty:
+                mtime = self._file_mtime()
+                if mtime != self._mtime:
+                    self._config = load_config()
+                    self._mtime = mtime
+            return self._config
+
+    def save(self, config):
+        """Update the in-memory config and schedule a write"""
+        with self._lock:
+            self._config = config
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending changes now"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            try:
+                if self._via_save_config:
+                    save_config(self._config)
+                else:
+                    atomic_write_json(self.path, self._config)
+                    if self.path == CONFIG_PATH and load_config() != json.loads(json.dumps(self._config)):
+                        # load_config() reads another file than CONFIG_PATH: let config write its own file
+                        print(f"Config is not read from {self.path}; saving through config.save_config()")
+                        self._via_save_config = True
+                        save_config(self._config)
+                self._mtime = self._file_mtime()
+                self._dirty = False
+                self.writes += 1
+            except Exception as e:
+                print(f"Error saving config: {e}")
@@ -0,0 +1,228 @@
+"""
+Digit reader for AnimeParadoxMacro
+Reads numeric HUD counters (wave, money, timers) without Tesseract. A counter
+region is binarized, split into characters on empty columns, every character
+is scaled to the glyph height, and all of them are scored against all glyph
+templates with one matrix product. Readings below the confidence threshold go
+to OCR restricted to digits.
+
+Glyph templates are small images named after their character in
+glyphs/digits (0.png ... 9.png, plus comma.png, colon.png, slash.png,
+dollar.png, period.png, x.png if the HUD uses them). from_font() can render
+a starting set from a TrueType font.
+"""
+import os
+import time
+import threading
+from functools import lru_cache
+import numpy as np
+
+DIGITS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'glyphs', 'digits')
+GLYPH_WIDTH = 12
+GLYPH_HEIGHT = 16
+NAMED_GLYPHS = {'comma': ',', 'colon': ':', 'slash': '/', 'dollar': '$', 'period': '.', 'x': 'x'}
+OCR_CONFIG = '--psm 7 -c tessedit_char_whitelist=0123456789,.:/$x'
+
+
+def _gray(image):
+    if hasattr(image, 'gray'):
+        return image.gray()
+    if hasattr(image, 'convert'):
+        return np.asarray(image.convert('L'))
+    image = np.asarray(image)
+    if image.ndim == 2:
+        return image
+    # Integer BT.601 weights, as Frame.gray()
+    acc = image[..., 0].astype(np.uint16) * 29
+    acc += image[..., 1].astype(np.uint16) * 150
+    acc += image[..., 2].astype(np.uint16) * 77
+    return (acc >> 8).astype(np.uint8)
+
+
+def _ink(gray):
+    """(mask, ink) for a region: Otsu-thresholded glyph pixels (the minority side) and
+    a 0..1 ink intensity with the same polarity, which keeps anti-aliased edges"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    levels = np.arange(256)
+    weight = np.cumsum(hist)
+    mean = np.cumsum(hist * levels)
+    between = (mean[-1] * weight - mean * total) ** 2 / np.maximum(weight * (total - weight), 1e-9)
+    threshold = int(np.argmax(between))
+    mask = gray > threshold
+    ink = gray.astype(np.float32) / 255.0
+    if np.count_nonzero(mask) > mask.size / 2:
+        mask = ~mask
+        ink = 1.0 - ink
+    return mask, ink
+
+
+def _runs(flags):
+    """(start, end) index pairs of consecutive True values"""
+    padded = np.concatenate(([False], flags, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges.reshape(-1, 2)
+
+
+def _normalize(vectors):
+    """Zero-mean, unit-length rows so a dot product is a correlation"""
+    vectors = vectors - vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-9)
+
+
+@lru_cache(maxsize=512)
+def _linear_axis(size, target):
+    """Source index pairs and weights for linear resampling of one axis (cached: glyph sizes repeat)"""
+    positions = np.clip((np.arange(target) + 0.5) * size / target - 0.5, 0, size - 1)
+    low = np.floor(positions).astype(np.intp)
+    high = np.minimum(low + 1, size - 1)
+    return low, high, (positions - low).astype(np.float32)
+
+
+def _resample(ink):
+    """Scale a glyph crop to the template height, keeping its aspect ratio, centered in the box"""
+    height, width = ink.shape
+    scaled_width = min(GLYPH_WIDTH, max(1, round(width * GLYPH_HEIGHT / height)))
+    y0, y1, wy = _linear_axis(height, GLYPH_HEIGHT)
+    x0, x1, wx = _linear_axis(width, scaled_width)
+    rows = ink[y0] * (1 - wy[:, None]) + ink[y1] * wy[:, None]
+    scaled = rows[:, x0] * (1 - wx) + rows[:, x1] * wx
+    box = np.zeros((GLYPH_HEIGHT, GLYPH_WIDTH), dtype=np.float32)
+    left = (GLYPH_WIDTH - scaled_width) // 2
+    box[:, left:left + scaled_width] = scaled
+    return box
+
+
+class DigitReading:
+    """Text read from a counter; value is the number it spells, if any"""
+    __slots__ = ('text', 'confidence', 'method', 'seconds')
+
+    def __init__(self, text, confidence, method, seconds):
+        self.text = text
+        self.confidence = confidence
+        self.method = method
+        self.seconds = seconds
+
+    @property
+    def value(self):
+        digits = ''.join(ch for ch in self.text if ch.isdigit())
+        return int(digits) if digits else None
+
+    def __repr__(self):
+        return f"DigitReading({self.text!r}, confidence={self.confidence:.2f}, method={self.method}, {self.seconds * 1e6:.0f} us)"
+
+
+class DigitReader:
+    """Glyph-template counter reader with an OCR fallback"""
+
+    def __init__(self, ocr_func=None, min_confidence=0.75, min_glyph_height=5):
+        # ocr_func(image, config) -> text, e.g. an OCRCache; None disables the fallback
+        self.ocr_func = ocr_func
+        self.min_confidence = min_confidence
+        self.min_glyph_height = min_glyph_height
+        self.characters = []
+        self._templates = np.empty((0, GLYPH_WIDTH * GLYPH_HEIGHT), dtype=np.float32)
+        self.reads = 0
+        self.fallbacks = 0
+
+    def add_glyph(self, character, image):
+        """Add a template for a character from an image of that character"""
+        mask, ink = _ink(_gray(image))
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if rows.size == 0:
+            return
+        glyph = _resample(ink[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1])
+        self.characters.append(character)
+        self._templates = np.vstack([self._templates, _normalize(glyph.reshape(1, -1).astype(np.float32))])
+
+    @classmethod
+    def from_folder(cls, folder=DIGITS_DIR, **kwargs):
+        from PIL import Image
+        reader = cls(**kwargs)
+        if not os.path.isdir(folder):
+            return reader
+        for file in sorted(os.listdir(folder)):
+            stem, ext = os.path.splitext(file)
+            character = stem if len(stem) == 1 else NAMED_GLYPHS.get(stem.lower())
+            if character is None or ext.lower() not in ('.png', '.bmp', '.jpg'):
+                continue
+            with Image.open(os.path.join(folder, file)) as img:
+                reader.add_glyph(character, img)
+        return reader
+
+    @classmethod
+    def from_font(cls, font_path, size=24, characters='0123456789', **kwargs):
+        """Reader with glyphs rendered from a font, for authoring glyphs/digits"""
+        from PIL import Image, ImageDraw, ImageFont
+        font = ImageFont.truetype(font_path, size)
+        reader = cls(**kwargs)
+        for character in characters:
+            image = Image.new('L', (size * 2, size * 2), 0)
+            ImageDraw.Draw(image).text((size // 2, size // 2), character, fill=255, font=font)
+            reader.add_glyph(character, image)
+        return reader
+
+    def segment(self, image):
+        """Per-character template-sized ink boxes, left to right, as one (K, H*W) array"""
+        mask, ink = _ink(_gray(image))
+        rows = np.flatnonzero(mask.any(axis=1))
+        if rows.size == 0:
+            return np.empty((0, GLYPH_WIDTH * GLYPH_HEIGHT), dtype=np.float32)
+        mask = mask[rows[0]:rows[-1] + 1]
+        ink = ink[rows[0]:rows[-1] + 1]
+        pieces = []
+        for start, end in _runs(mask.any(axis=0)):
+            piece_rows = np.flatnonzero(mask[:, start:end].any(axis=1))
+            height = piece_rows[-1] + 1 - piece_rows[0]
+            # Specks and separators shorter than a glyph are noise
+            if height < self.min_glyph_height and height < mask.shape[0] // 3:
+                continue
+            pieces.append(_resample(ink[piece_rows[0]:piece_rows[-1] + 1, start:end]).ravel())
+        if not pieces:
+            return np.empty((0, GLYPH_WIDTH * GLYPH_HEIGHT), dtype=np.float32)
+        return np.asarray(pieces, dtype=np.float32)
+
+    def read(self, image):
+        """Read a counter region; falls back to OCR when the glyph match is weak"""
+        started = time.perf_counter()
+        self.reads += 1
+        text, confidence = '', 0.0
+        if self.characters:
+            pieces = self.segment(image)
+            if len(pieces):
+                scores = _normalize(pieces) @ self._templates.T
+                best = scores.argmax(axis=1)
+                text = ''.join(self.characters[i] for i in best)
+                # A reading is only as trustworthy as its worst character
+                confidence = float(scores[np.arange(len(best)), best].min())
+        if confidence >= self.min_confidence or self.ocr_func is None:
+            return DigitReading(text, confidence, 'glyphs', time.perf_counter() - started)
+
+        self.fallbacks += 1
+        image = image.to_pil() if hasattr(image, 'to_pil') else image
+        text = ''.join((self.ocr_func(image, OCR_CONFIG) or '').split())
+        return DigitReading(text, confidence, 'ocr', time.perf_counter() - started)
+
+    def read_value(self, image):
+        return self.read(image).value
+
+    def stats(self):
+        return {"glyphs": len(self.characters), "reads": self.reads, "fallbacks": self.fallbacks}
+
+
+_readers = {}
+_readers_lock = threading.Lock()
+
+
+def get_digit_reader(folder=DIGITS_DIR, ocr_func=None):
+    """Shared reader for a glyph folder; ocr_func replaces the fallback of the shared reader"""
+    with _readers_lock:
+        reader = _readers.get(folder)
+        if reader is None:
+            reader = DigitReader.from_folder(folder)
+            _readers[folder] = reader
+    if ocr_func is not None:
+        reader.ocr_func = ocr_func
+    return reader
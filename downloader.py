@@ -0,0 +1,300 @@
+"""
+Streaming downloader for AnimeParadoxMacro updates
+Downloads into a .part file with adaptive read sizes, resumes interrupted
+downloads with HTTP Range requests, hashes the data while it streams and
+reports progress at a throttled rate. A partial file is named after the URL
+(and expected digest) it belongs to and only resumed with an If-Range
+validator, so bytes from another release or a changed file are never
+appended to. RemoteFile exposes a remote zip as a
+seekable file so single members can be fetched without the whole archive.
+"""
+import io
+import os
+import json
+import time
+import hashlib
+import urllib.request
+import urllib.error
+from collections import OrderedDict
+
+USER_AGENT = 'AnimeParadoxMacro-Updater'
+MIN_BLOCK = 64 * 1024
+MAX_BLOCK = 4 * 1024 * 1024
+
+
+class DownloadError(Exception):
+    """Download failed or did not match the published digest"""
+
+
+def _hash_existing(path, hasher):
+    """Feed an existing partial file into the hasher; returns its size"""
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(MAX_BLOCK)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            size += len(chunk)
+    return size
+
+
+def part_path_for(url, dest_path, expected_sha256=None):
+    """Partial-download path unique to this URL and digest, next to dest_path"""
+    key = hashlib.sha256(f"{url}\n{(expected_sha256 or '').lower()}".encode('utf-8')).hexdigest()[:16]
+    return f"{dest_path}.{key}.part"
+
+
+def _read_validator(part_path):
+    try:
+        with open(part_path + '.json', 'r', encoding='utf-8') as f:
+            return json.load(f).get("validator")
+    except Exception:
+        return None
+
+
+def _write_validator(part_path, url, validator):
+    with open(part_path + '.json', 'w', encoding='utf-8') as f:
+        json.dump({"url": url, "validator": validator}, f)
+
+
+def _discard_part(part_path):
+    for path in (part_path, part_path + '.json'):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _response_validator(response):
+    """Strong ETag or Last-Modified usable in If-Range, or None"""
+    etag = response.headers.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('last-modified')
+
+
+class StreamingDownloader:
+    """Resumable, verified download of a single URL"""
+
+    def __init__(self, progress_callback=None, timeout=30, max_retries=3,
+                 progress_interval=1.0, progress_step=5):
+        self.progress_callback = progress_callback
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.progress_interval = progress_interval
+        self.progress_step = progress_step
+        self._last_report = (0.0, -1, -1)
+
+    def _report(self, downloaded, total, force=False):
+        if not self.progress_callback:
+            return
+        percent = int(downloaded * 100 / total) if total else -1
+        last_time, last_percent, last_downloaded = self._last_report
+        if downloaded == last_downloaded:
+            return
+        now = time.monotonic()
+        if force or percent - last_percent >= self.progress_step or (
+                now - last_time >= self.progress_interval and percent != last_percent):
+            self._last_report = (now, percent, downloaded)
+            self.progress_callback(downloaded, total)
+
+    def download(self, url, dest_path, expected_sha256=None):
+        """Download url to dest_path, resuming a partial download of the same URL if present"""
+        part_path = part_path_for(url, dest_path, expected_sha256)
+        attempt = 0
+        while True:
+            try:
+                digest = self._download_once(url, part_path)
+                break
+            except (urllib.error.URLError, ConnectionError, TimeoutError, OSError) as e:
+                if isinstance(e, urllib.error.HTTPError) and e.code < 500 and e.code != 416:
+                    raise DownloadError(f"HTTP {e.code} while downloading {url}")
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise DownloadError(f"Download failed after {attempt} attempts: {e}")
+                time.sleep(min(2 ** attempt, 10))
+
+        if expected_sha256 and digest != expected_sha256.lower():
+            _discard_part(part_path)
+            raise DownloadError(f"Checksum mismatch: expected {expected_sha256}, got {digest}")
+        os.replace(part_path, dest_path)
+        _discard_part(part_path)
+        return digest
+
+    def _download_once(self, url, part_path):
+        hasher = hashlib.sha256()
+        validator = _read_validator(part_path) if os.path.exists(part_path) else None
+        if validator is None:
+            # Without a validator the partial bytes cannot be proven to belong to this file
+            _discard_part(part_path)
+            offset = 0
+        else:
+            offset = _hash_existing(part_path, hasher)
+
+        headers = {'User-Agent': USER_AGENT}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            # The server sends the whole file (200) instead of a range if it changed since
+            headers['If-Range'] = validator
+        req = urllib.request.Request(url, headers=headers)
+
+        try:
+            response = urllib.request.urlopen(req, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 416:
+                # Partial file is not a prefix of what the server has; start over
+                _discard_part(part_path)
+            raise
+
+        with response:
+            if offset and response.status == 206 and \
+                    not (response.headers.get('content-range') or '').startswith(f'bytes {offset}-'):
+                _discard_part(part_path)
+                raise ConnectionError("Server answered a different range; restarting the download")
+            if offset and response.status != 206:
+                # File changed (If-Range failed) or the server ignored Range: take the whole body
+                hasher = hashlib.sha256()
+                offset = 0
+            if not offset:
+                validator = _response_validator(response)
+                if validator:
+                    _write_validator(part_path, url, validator)
+                else:
+                    _discard_part(part_path)
+            length = int(response.headers.get('content-length') or 0)
+            total = offset + length if length else 0
+
+            downloaded = offset
+            block_size = MIN_BLOCK
+            self._report(downloaded, total, force=True)
+            with open(part_path, 'ab' if offset else 'wb') as f:
+                while True:
+                    started = time.monotonic()
+                    chunk = response.read(block_size)
+                    if not chunk:
+                        break
+                    elapsed = time.monotonic() - started
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    downloaded += len(chunk)
+                    self._report(downloaded, total)
+
+                    # Grow reads while the connection keeps up, shrink when it stalls
+                    if len(chunk) == block_size and elapsed < 0.05:
+                        block_size = min(block_size * 2, MAX_BLOCK)
+                    elif elapsed > 0.5:
+                        block_size = max(block_size // 2, MIN_BLOCK)
+
+            if total and downloaded < total:
+                raise ConnectionError(f"Connection closed at {downloaded} of {total} bytes")
+            self._report(downloaded, total, force=True)
+        return hasher.hexdigest()
+
+
+class RangeNotSupported(DownloadError):
+    """Server does not honour HTTP Range requests"""
+
+
+class RemoteFile(io.RawIOBase):
+    """Read-only, seekable view of a remote file backed by HTTP Range requests.
+
+    Lets zipfile read the central directory and individual members of a release
+    zip without downloading the whole archive. Fetched blocks are cached.
+    """
+
+    def __init__(self, url, block_size=256 * 1024, readahead=4, timeout=30, max_cached_blocks=64):
+        super().__init__()
+        self.url = url
+        self.block_size = block_size
+        self.readahead = readahead
+        self.timeout = timeout
+        self.max_cached_blocks = max_cached_blocks
+        self._blocks = OrderedDict()
+        self._pos = 0
+        self.requests = 0
+        self.bytes_fetched = 0
+        self.size = self._probe_size()
+
+    def _request(self, start, end):
+        req = urllib.request.Request(self.url, headers={
+            'User-Agent': USER_AGENT,
+            'Range': f'bytes={start}-{end}'
+        })
+        response = urllib.request.urlopen(req, timeout=self.timeout)
+        self.requests += 1
+        return response
+
+    def _probe_size(self):
+        with self._request(0, 0) as response:
+            content_range = response.headers.get('content-range') or ''
+            if response.status != 206 or '/' not in content_range:
+                raise RangeNotSupported(f"Range requests not supported for {self.url}")
+            return int(content_range.rsplit('/', 1)[1])
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self.size + offset
+        return self._pos
+
+    def _fetch_blocks(self, first, last):
+        """Fetch blocks first..last (inclusive) in a single request"""
+        start = first * self.block_size
+        end = min((last + 1) * self.block_size, self.size) - 1
+        with self._request(start, end) as response:
+            if response.status != 206:
+                raise RangeNotSupported(f"Range requests not supported for {self.url}")
+            data = response.read()
+        self.bytes_fetched += len(data)
+        for index in range(first, last + 1):
+            offset = (index - first) * self.block_size
+            self._blocks[index] = data[offset:offset + self.block_size]
+        while len(self._blocks) > self.max_cached_blocks:
+            self._blocks.popitem(last=False)
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self._pos
+        size = max(0, min(size, self.size - self._pos))
+        if size == 0:
+            return b''
+
+        first = self._pos // self.block_size
+        last = (self._pos + size - 1) // self.block_size
+        missing = [index for index in range(first, last + 1) if index not in self._blocks]
+        if missing:
+            last_block = (self.size - 1) // self.block_size
+            self._fetch_blocks(missing[0], min(max(missing[-1], missing[0] + self.readahead - 1), last_block))
+
+        parts = []
+        for index in range(first, last + 1):
+            block = self._blocks.get(index)
+            if block is None:
+                self._fetch_blocks(index, index)
+                block = self._blocks[index]
+            else:
+                self._blocks.move_to_end(index)
+            parts.append(block)
+        data = b''.join(parts)
+        offset = self._pos - first * self.block_size
+        result = data[offset:offset + size]
+        self._pos += len(result)
+        return result
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
@@ -0,0 +1,186 @@
+"""
+Frame sources for AnimeParadoxMacro
+Everything that looks at the game reads frames through a FrameSource: either
+live captures of the Roblox region or a replay of recorded frames, so detection
+can be measured and debugged without Roblox running.
+
+Usage (replay throughput benchmark):
+    python frame_source.py <frames dir or .npy file> [fps]
+"""
+import os
+import sys
+import time
+import numpy as np
+from screen_capture import get_capture_service, allocate_frames, DEFAULT_RING_SIZE
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+RAW_EXTENSION = '.npy'
+
+
+class FrameSource:
+    """Base class for anything that produces Frames"""
+    region = None
+
+    def read(self):
+        """Return the next Frame, or None when the source is exhausted"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
+
+
+class LiveFrameSource(FrameSource):
+    """Live captures of a screen region via the shared capture service"""
+
+    def __init__(self, region, ring_size=DEFAULT_RING_SIZE, key=None):
+        self.region = tuple(region)
+        # key (the window handle) shares one capture service across moves of the same window
+        self._capture = get_capture_service(self.region, ring_size, key=key)
+
+    def read(self):
+        return self._capture.grab()
+
+
+class ReplayFrameSource(FrameSource):
+    """Replays recorded frames from a directory or a single packed .npy file.
+
+    A directory may hold images (PNG/JPG/BMP) and/or raw ``.npy`` BGRA dumps,
+    replayed in filename order. A packed file is one ``.npy`` array of shape
+    (frames, height, width, 4), memory-mapped rather than loaded. ``fps=None``
+    replays as fast as possible.
+    """
+
+    def __init__(self, path, fps=None, loop=False, ring_size=2):
+        self.path = path
+        self.fps = float(fps) if fps else None
+        self.loop = loop
+        self.ring_size = max(1, int(ring_size))
+        self._packed = None
+        self._files = []
+
+        if os.path.isdir(path):
+            self._files = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(IMAGE_EXTENSIONS + (RAW_EXTENSION,))
+            )
+            count = len(self._files)
+        elif path.lower().endswith(RAW_EXTENSION):
+            self._packed = np.load(path, mmap_mode='r')
+            if self._packed.ndim != 4 or self._packed.shape[3] != 4:
+                raise ValueError(f"Packed replay must be (frames, height, width, 4) BGRA: {path}")
+            count = self._packed.shape[0]
+        else:
+            raise ValueError(f"Unsupported replay source: {path}")
+
+        if count == 0:
+            raise ValueError(f"No frames found in {path}")
+        self.frame_count = count
+        self._position = 0
+        self._sequence = 0
+        self._next_time = None
+        self._rings = {}
+
+    def _next_slot(self, width, height):
+        ring = self._rings.get((width, height))
+        if ring is None:
+            ring = allocate_frames(self.ring_size, width, height)
+            self._rings[(width, height)] = ring
+        return ring[self._sequence % self.ring_size]
+
+    def _load_into_frame(self, index):
+        if self._packed is not None:
+            data = self._packed[index]
+            frame = self._next_slot(data.shape[1], data.shape[0])
+            np.copyto(frame.bgra, data)
+            return frame
+
+        path = self._files[index]
+        if path.lower().endswith(RAW_EXTENSION):
+            data = np.load(path)
+            frame = self._next_slot(data.shape[1], data.shape[0])
+            np.copyto(frame.bgra, data)
+            return frame
+
+        from PIL import Image
+        with Image.open(path) as img:
+            rgb = np.asarray(img.convert('RGB'))
+        frame = self._next_slot(rgb.shape[1], rgb.shape[0])
+        np.copyto(frame.bgra[..., 2::-1], rgb)
+        frame.bgra[..., 3] = 255
+        return frame
+
+    def read(self):
+        if self._position >= self.frame_count:
+            if not self.loop:
+                return None
+            self._position = 0
+
+        if self.fps:
+            now = time.perf_counter()
+            if self._next_time is None:
+                self._next_time = now
+            elif now < self._next_time:
+                time.sleep(self._next_time - now)
+            self._next_time = max(self._next_time + 1.0 / self.fps, time.perf_counter() - 1.0 / self.fps)
+
+        frame = self._load_into_frame(self._position)
+        self._position += 1
+        self._sequence += 1
+        self.region = (0, 0, frame.width, frame.height)
+        frame.region = self.region
+        frame.timestamp = time.perf_counter()
+        frame.sequence = self._sequence
+        frame._gray_ready = False
+        return frame
+
+    def close(self):
+        self._packed = None
+        self._rings = {}
+
+
+def open_frame_source(config, region=None, key=None):
+    """Build the frame source selected in config.
+
+    ``config["frame_source"]`` may be ``{"type": "replay", "path": ..., "fps": ..., "loop": ...}``;
+    anything else means live capture of ``region`` (through the capture service for ``key``).
+    """
+    settings = config.get("frame_source") or {}
+    if settings.get("type") == "replay" and settings.get("path"):
+        return ReplayFrameSource(
+            settings["path"],
+            fps=settings.get("fps"),
+            loop=settings.get("loop", False)
+        )
+    if not region:
+        return None
+    return LiveFrameSource(region, key=key)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python frame_source.py <frames dir or .npy file> [fps]")
+        return
+    fps = float(sys.argv[2]) if len(sys.argv) > 2 else None
+    source = ReplayFrameSource(sys.argv[1], fps=fps)
+
+    start = time.perf_counter()
+    frames = 0
+    for frame in source:
+        frame.gray()
+        frames += 1
+    elapsed = time.perf_counter() - start
+    source.close()
+
+    rate = frames / elapsed if elapsed > 0 else 0.0
+    print(f"Replayed {frames} frames in {elapsed:.3f}s ({rate:.1f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+A/B install slots for AnimeParadoxMacro
+A frozen install keeps two complete copies of the app under slots/A and
+slots/B. Updates are staged into the inactive slot (seeded from the active one
+with hardlinks, so unchanged files cost nothing), validated, and made live by
+atomically replacing the active_slot.json pointer. The previous slot stays on
+disk for an instant rollback. The running app keeps writing settings into
+its own slot until it exits, so user data is carried over by the first start
+after a switch (finish_switch), not at switch time.
+
+    <install root>/
+        AnimeParadoxMacro.exe     original exe, hands off to the active slot
+        active_slot.json          {"active": "B", "previous": "A", "user_data_pending": false}
+        slots/A/...               previous version
+        slots/B/...               running version
+"""
+import os
+import json
+import shutil
+from zip_installer import KEEP_STALE_FOLDERS
+from update_manifest import PROTECTED_FILES, INSTALLED_MANIFEST
+
+SLOT_NAMES = ('A', 'B')
+SLOTS_DIR = 'slots'
+POINTER_NAME = 'active_slot.json'
+EXE_NAME = 'AnimeParadoxMacro.exe'
+
+# Leftovers from interrupted installs/downloads that a new slot should not inherit
+_TEMP_SUFFIXES = ('.old', '.update-tmp', '.part', '.tmp')
+
+
+class SlotError(Exception):
+    """Staging, validation or switching a slot failed"""
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _is_user_data(rel):
+    """User-editable paths get real copies so writes in one slot never reach the other"""
+    parts = rel.replace(os.sep, '/').split('/')
+    return parts[0] in KEEP_STALE_FOLDERS or (len(parts) == 1 and parts[0] in PROTECTED_FILES)
+
+
+def _same_dir(a, b):
+    return os.path.normcase(os.path.realpath(a)) == os.path.normcase(os.path.realpath(b))
+
+
+def _copy_over(src, dst):
+    """Copy src onto dst via a temp file, replacing (not writing through) any existing link"""
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return
+    temp_path = dst + '.tmp'
+    shutil.copy2(src, temp_path)
+    os.replace(temp_path, dst)
+
+
+class InstallSlots:
+    """Manages the A/B slot directories and the active-slot pointer of one install root"""
+
+    def __init__(self, root):
+        self.root = root
+        self.pointer_path = os.path.join(root, POINTER_NAME)
+
+    @classmethod
+    def for_app_dir(cls, app_dir):
+        """Slots for the install that app_dir belongs to (app_dir may itself be a slot)"""
+        parent = os.path.dirname(app_dir)
+        if os.path.basename(app_dir) in SLOT_NAMES and os.path.basename(parent) == SLOTS_DIR:
+            return cls(os.path.dirname(parent))
+        return cls(app_dir)
+
+    def _read_pointer(self):
+        try:
+            with open(self.pointer_path, 'r', encoding='utf-8') as f:
+                pointer = json.load(f)
+        except Exception:
+            return {}
+        return pointer if pointer.get("active") in SLOT_NAMES else {}
+
+    def slot_dir(self, name):
+        return os.path.join(self.root, SLOTS_DIR, name)
+
+    def active(self):
+        """Name of the live slot, or None for an install that has never used slots"""
+        return self._read_pointer().get("active")
+
+    def previous(self):
+        """Slot the last switch came from, if it is still on disk"""
+        name = self._read_pointer().get("previous")
+        if name in SLOT_NAMES and os.path.isdir(self.slot_dir(name)):
+            return name
+        return None
+
+    def active_dir(self):
+        name = self.active()
+        return self.slot_dir(name) if name else self.root
+
+    def executable(self):
+        """Exe of the live slot"""
+        return os.path.join(self.active_dir(), EXE_NAME)
+
+    def inactive(self):
+        return SLOT_NAMES[1] if self.active() == SLOT_NAMES[0] else SLOT_NAMES[0]
+
+    def _user_data_dir(self, pointer):
+        source = pointer.get("user_data_from")
+        return self.slot_dir(source) if source in SLOT_NAMES else self.root
+
+    def stage(self, running_dir=None):
+        """Replace the inactive slot with a copy of the live tree; returns (name, path).
+
+        running_dir is where the running app lives. Until it restarts after a
+        switch, the inactive slot may be the running install (or still hold the
+        user data), so staging raises SlotError instead of deleting it.
+        """
+        name = self.inactive()
+        target = self.slot_dir(name)
+        if running_dir is not None:
+            pointer = self._read_pointer()
+            if _same_dir(target, running_dir) or \
+                    (pointer.get("user_data_pending") and _same_dir(self._user_data_dir(pointer), running_dir)):
+                raise SlotError("Restart pending: restart to finish the last update before installing another")
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        source = self.active_dir()
+        for dirpath, dirs, files in os.walk(source):
+            if dirpath == self.root:
+                # A pre-slots install shares its root with the slots themselves
+                dirs[:] = [d for d in dirs if d != SLOTS_DIR]
+                files = [f for f in files if f != POINTER_NAME]
+            rel = os.path.relpath(dirpath, source)
+            dst_dir = os.path.normpath(os.path.join(target, rel))
+            os.makedirs(dst_dir, exist_ok=True)
+            for file in files:
+                if file.endswith(_TEMP_SUFFIXES):
+                    continue
+                src = os.path.join(dirpath, file)
+                dst = os.path.join(dst_dir, file)
+                if _is_user_data(os.path.relpath(src, source)):
+                    shutil.copy2(src, dst)
+                else:
+                    # Installers replace files by rename, so shared hardlinks never see in-place writes
+                    _link_or_copy(src, dst)
+        return name, target
+
+    def validate(self, name, manifest=None):
+        """Check a staged slot is complete; raises SlotError if not"""
+        target = self.slot_dir(name)
+        if not os.path.exists(os.path.join(target, EXE_NAME)):
+            raise SlotError(f"Slot {name} has no {EXE_NAME}")
+        for file_name, entry in (manifest or {}).get("files", {}).items():
+            if os.path.basename(file_name) in PROTECTED_FILES:
+                continue
+            path = os.path.join(target, *file_name.split('/'))
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                raise SlotError(f"Slot {name} is missing {file_name}")
+            if size != entry["size"]:
+                raise SlotError(f"Slot {name} has a wrong size for {file_name}")
+        # Exe backups made while installing are not needed in a slot that is not running
+        for dirpath, dirs, files in os.walk(target):
+            for file in files:
+                if file.endswith('.old'):
+                    os.remove(os.path.join(dirpath, file))
+
+    def _write_pointer(self, pointer):
+        from config_store import atomic_write_json
+        atomic_write_json(self.pointer_path, pointer)
+
+    def activate(self, name):
+        """Make a slot live with a single atomic pointer replace.
+
+        User data is copied over later by finish_switch(), once the running
+        version has exited and written its last settings.
+        """
+        if not os.path.isdir(self.slot_dir(name)):
+            raise SlotError(f"Slot {name} does not exist")
+        pointer = self._read_pointer()
+        current = pointer.get("active")
+        if current == name:
+            return
+        if pointer.get("user_data_pending"):
+            # Never started since the last switch: user data still lives where that switch came from
+            source = pointer.get("user_data_from")
+        else:
+            source = current
+        self._write_pointer({
+            "active": name,
+            "previous": current,
+            "user_data_pending": True,
+            "user_data_from": source
+        })
+
+    def finish_switch(self):
+        """Carry user data into the live slot on the first start after a switch; True if it copied"""
+        pointer = self._read_pointer()
+        if not pointer.get("user_data_pending"):
+            return False
+        source_dir = self._user_data_dir(pointer)
+        if os.path.isdir(source_dir):
+            self.copy_user_data(source_dir, self.active_dir())
+        pointer["user_data_pending"] = False
+        pointer.pop("user_data_from", None)
+        self._write_pointer(pointer)
+        return True
+
+    def copy_user_data(self, source_dir, target_dir):
+        """Carry configs and user-kept folders across when switching slots"""
+        if _same_dir(source_dir, target_dir):
+            return
+        for file in PROTECTED_FILES:
+            if file == INSTALLED_MANIFEST:
+                continue
+            src = os.path.join(source_dir, file)
+            if os.path.exists(src):
+                _copy_over(src, os.path.join(target_dir, file))
+        for folder in KEEP_STALE_FOLDERS:
+            for dirpath, dirs, files in os.walk(os.path.join(source_dir, folder)):
+                dst_dir = os.path.join(target_dir, os.path.relpath(dirpath, source_dir))
+                os.makedirs(dst_dir, exist_ok=True)
+                for file in files:
+                    _copy_over(os.path.join(dirpath, file), os.path.join(dst_dir, file))
+
+    def rollback(self):
+        """Switch back to the previous slot; returns its name"""
+        name = self.previous()
+        if name is None:
+            raise SlotError("No previous version to roll back to")
+        self.activate(name)
+        return name
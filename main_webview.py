@@ -2,20 +2,28 @@
 Roblox Macro with OCR - Main Application (PyWebview Version)
 A macro for automating gameplay in Roblox games with OCR-based detection.
 """
-import webview
-import keyboard
+from startup_profile import PROFILE
 import threading
-import queue
 import os
-import base64
 import ctypes
 import time
 import sys
 from ctypes import wintypes
-from config import load_config, save_config
-from macro_engine import MacroEngine
+from config_store import ConfigStore
+from unit_config_store import UnitConfigRepository, unit_config_template
 from version import VERSION
-from updater import check_update, perform_update
+from status_bus import StatusBus
+from window_geometry import GeometryService
+
+# Heavy or rarely needed modules are imported on first use; startup_profile times them
+webview = PROFILE.lazy('webview')
+keyboard = PROFILE.lazy('keyboard')
+macro_engine = PROFILE.lazy('macro_engine')
+updater = PROFILE.lazy('updater')
+update_check = PROFILE.lazy('update_check')
+install_slots = PROFILE.lazy('install_slots')
+
+PROFILE_STARTUP = '--profile-startup' in sys.argv
 
 # Windows API for window management
 user32 = ctypes.windll.user32
@@ -25,7 +33,6 @@ GetWindowText = user32.GetWindowTextW
 GetWindowTextLength = user32.GetWindowTextLengthW
 SetParent = user32.SetParent
 SetWindowPos = user32.SetWindowPos
-GetWindowRect = user32.GetWindowRect
 ShowWindow = user32.ShowWindow
 IsWindow = user32.IsWindow
 
@@ -34,9 +41,11 @@ SW_SHOW = 5
 
 class MacroAPI:
     def __init__(self):
-        self.config = load_config()
+        self._config_store = ConfigStore()
+        self.config = self._config_store.get()
         self.engine = None
-        self._status_queue = queue.Queue()
+        self._status_bus = StatusBus()
+        self._unit_configs = UnitConfigRepository(status_callback=self._status_callback)
         self._hotkeys_registered = False
         self._capturing_key = False
         self._captured_key = None
@@ -44,6 +53,16 @@ class MacroAPI:
         self._original_parent = None
         self._window = None
         self._overlay_window = None
+        self._frame_source = None
+        self._screenshot_writer = None
+        self._preview_cache = None
+        self._picker_worker = None
+        self._ocr_cache = None
+        self._ocr_pool = None
+        self._update_info = {}
+        self._update_checks = None
+        self._geometry = GeometryService()
+        self._geometry.add_listener(self._on_roblox_region_changed)
         
     def capture_keybind(self, key_type):
         """Capture a keybind from user input"""
@@ -97,7 +116,7 @@ class MacroAPI:
             
             self.config["start_keybind"] = start_key
             self.config["stop_keybind"] = stop_key
-            save_config(self.config)
+            self._config_store.save(self.config)
             return True
         except Exception as e:
             print(f"Error registering hotkeys: {e}")
@@ -105,20 +124,15 @@ class MacroAPI:
     
     def _get_image_folder_path(self):
         """Get the image folder path based on current mode and location"""
-        # Reload config to get latest values
-        self.config = load_config()
-        
+        # self.config is kept current by update_story_config/start_macro
         base_folder = os.path.join(os.path.dirname(__file__), "starting image")
         mode = self.config.get("mode", "Story")
         location = self.config.get("location", "Leaf Village")
         
-        print(f"DEBUG: mode={mode}, location={location}")
-        
         # Build path based on mode and location
         # Legend mode uses the same images as Story mode
         if mode == "Story" or mode == "Legend":
             folder_name = self._get_location_key(location)
-            print(f"DEBUG: folder_name={folder_name}")
             image_folder = os.path.join(base_folder, "Story", folder_name)
         else:
             # For other modes, use base folder
@@ -126,7 +140,6 @@ class MacroAPI:
         
         # Create folder if it doesn't exist
         os.makedirs(image_folder, exist_ok=True)
-        print(f"DEBUG: image_folder={image_folder}")
         return image_folder
     
     def _get_location_key(self, location):
@@ -143,6 +156,75 @@ class MacroAPI:
     
 
     
+    def _get_frame_source(self, region):
+        """Get the frame source for a region (live capture unless replay is configured)"""
+        from frame_source import open_frame_source, ReplayFrameSource
+        
+        # Keep a replay source alive so repeated reads advance through the recording
+        if isinstance(self._frame_source, ReplayFrameSource):
+            return self._frame_source
+        # One capture service per attached window, retargeted as it moves
+        key = self._geometry.hwnd if self._geometry.is_attached() else None
+        self._frame_source = open_frame_source(self.config, region, key=key)
+        return self._frame_source
+    
+    def _get_template_index(self):
+        """Shared index of the buttons templates (built on first use)"""
+        from template_index import get_template_index
+        return get_template_index()
+    
+    def _get_ocr_pool(self):
+        """Persistent recognizer pool, used when config "ocr_backend" is "pool" """
+        if self._ocr_pool is None and self.config.get("ocr_backend") == "pool":
+            from ocr_pool import OCRPool
+            self._ocr_pool = OCRPool(
+                workers=self.config.get("ocr_workers"),
+                tessdata_path=self.config.get("tessdata_path")
+            )
+        return self._ocr_pool
+    
+    def _get_ocr_cache(self):
+        """OCR result cache shared by every engine run"""
+        if self._ocr_cache is None:
+            from ocr_cache import OCRCache
+            pool = self._get_ocr_pool()
+            self._ocr_cache = OCRCache(
+                ocr_func=pool.image_to_string if pool else None,
+                max_entries=int(self.config.get("ocr_cache_size", 256))
+            )
+        return self._ocr_cache
+    
+    def _get_placement_planner(self, region):
+        """Occupancy-grid planner for the current act; blocked spots are remembered for the session"""
+        from placement_planner import get_placement_planner, parse_area, DEFAULT_AREA, DEFAULT_STEP
+        area = self.config.get("placement_area")
+        if area:
+            area = parse_area(area)
+        else:
+            # No configured area: the whole game view, region-relative
+            area = (0, 0, region[2] - region[0], region[3] - region[1]) if region else DEFAULT_AREA
+        return get_placement_planner(
+            self.config.get("location", "Leaf Village"), self.config.get("act", "Act 1"),
+            area=area, step=int(self.config.get("placement_step", DEFAULT_STEP))
+        )
+    
+    def get_ocr_stats(self):
+        """OCR cache hit/miss counters (plus worker pool counters when the pool is in use)"""
+        if self._ocr_cache is None:
+            stats = {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0}
+        else:
+            stats = self._ocr_cache.stats()
+        if self._ocr_pool is not None:
+            stats["pool"] = self._ocr_pool.stats()
+        return stats
+    
+    def _get_screenshot_writer(self):
+        """Get the background screenshot writer, creating it on first use"""
+        if self._screenshot_writer is None:
+            from screenshot_writer import ScreenshotWriter
+            self._screenshot_writer = ScreenshotWriter(status_callback=self._status_callback)
+        return self._screenshot_writer
+    
     def _take_screenshot_callback(self):
         """Callback for F4 screenshot hotkey"""
         print("F4 screenshot hotkey pressed!")
@@ -151,53 +233,38 @@ class MacroAPI:
             region = None
             
             # Check if Roblox is attached/embedded
-            if self._roblox_hwnd and IsWindow(self._roblox_hwnd):
-                rect = wintypes.RECT()
-                GetWindowRect(self._roblox_hwnd, ctypes.byref(rect))
-                region = (rect.left, rect.top, rect.right, rect.bottom)
-                print(f"Using attached Roblox window region: {region}")
+            if self._geometry.is_attached():
+                region = self._geometry.roblox_region()
             # Fall back to engine detection
             elif self.engine and self.engine.roblox_region:
                 region = self.engine.roblox_region
                 print(f"Using engine Roblox region: {region}")
             
-            if not region:
+            source = self._get_frame_source(region)
+            if not source:
                 msg = "Screenshot failed: No Roblox window detected. Please attach Roblox first."
                 print(msg)
                 self._status_callback(msg)
                 return
             
-            # Take screenshot of Roblox window
-            import mss
-            from PIL import Image
-            import io
+            # Take screenshot from the frame source (live Roblox window or replay)
+            frame = source.read()
+            if frame is None:
+                self._status_callback("Screenshot failed: replay has no more frames")
+                return
             
-            with mss.mss() as sct:
-                monitor = {
-                    "left": region[0],
-                    "top": region[1],
-                    "width": region[2] - region[0],
-                    "height": region[3] - region[1]
-                }
-                screenshot = sct.grab(monitor)
-                img = Image.frombytes('RGB', (screenshot.width, screenshot.height), screenshot.rgb)
-                
-                # Get the correct folder path
-                image_folder = self._get_image_folder_path()
-                
-                # Delete existing images in the folder
-                for filename in os.listdir(image_folder):
-                    if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
-                        os.remove(os.path.join(image_folder, filename))
-                
-                # Save new screenshot
-                image_path = os.path.join(image_folder, "screenshot.png")
-                img.save(image_path)
-                
-                mode = self.config.get("mode", "Story")
-                location = self.config.get("location", "Leaf Village")
-                self._status_callback(f"Screenshot saved to {image_folder} for {mode} - {location}")
-                print(f"Screenshot saved: {image_path}")
+            # Encoding and saving happen on the writer thread so the hotkey hook returns immediately
+            image_folder = self._get_image_folder_path()
+            mode = self.config.get("mode", "Story")
+            location = self.config.get("location", "Leaf Village")
+            queued = self._get_screenshot_writer().submit(
+                frame,
+                image_folder,
+                encoding=self.config.get("screenshot_encoding", "png_fast"),
+                message=f"Screenshot saved to {image_folder} for {mode} - {location}"
+            )
+            if not queued:
+                self._status_callback("Screenshot skipped: previous screenshots are still being saved")
         except Exception as e:
             print(f"Error taking screenshot: {e}")
             self._status_callback(f"Screenshot error: {str(e)}")
@@ -205,7 +272,7 @@ class MacroAPI:
     def update_tolerance(self, tolerance):
         """Update OCR tolerance setting"""
         self.config["ocr_tolerance"] = tolerance
-        save_config(self.config)
+        self._config_store.save(self.config)
         print(f"OCR tolerance updated to: {tolerance}")
         return True
 
@@ -217,7 +284,7 @@ class MacroAPI:
             print(f"Invalid t_press_delay value: {delay}")
             return False
         self.config["t_press_delay"] = val
-        save_config(self.config)
+        self._config_store.save(self.config)
         print(f"T-press delay updated to: {val}")
         return True
     
@@ -225,10 +292,12 @@ class MacroAPI:
         """Callback for start hotkey"""
         print("Start hotkey pressed!")
         if not self.engine or not self.engine.running:
-            self._status_callback("Macro started via hotkey!")
-            self._start_macro_internal()
+            # The engine announces macro_started itself; a refused start has already published macro_stopped
+            result = self._start_macro_internal()
+            if not result or result.get("success"):
+                self._status_bus.publish("Macro started via hotkey!")
         else:
-            self._status_callback("Macro already running")
+            self._status_bus.publish("Macro already running", level='warning')
             print("Macro already running")
     
     def _stop_macro_callback(self):
@@ -236,9 +305,9 @@ class MacroAPI:
         print("Stop hotkey pressed!")
         if self.engine and self.engine.running:
             self.engine.stop()
-            self._status_callback("Macro stopped via hotkey")
+            self._status_bus.publish("Macro stopped via hotkey", type='macro_stopped')
         else:
-            self._status_callback("Macro not running")
+            self._status_bus.publish("Macro not running", level='warning')
             print("Macro not running")
     
 
@@ -293,45 +362,15 @@ class MacroAPI:
             if not webview_hwnd:
                 return {"success": False, "message": "Could not find app window handle"}
             
-            # Compute container offsets dynamically from ui.html to stay in sync with CSS
-            ui_path = os.path.join(os.path.dirname(__file__), 'ui.html')
-            main_panel_width = 550
-            body_padding = 15
-            gap = 15
-            border_adj = 5
-            try:
-                if os.path.exists(ui_path):
-                    with open(ui_path, 'r', encoding='utf-8') as fh:
-                        content = fh.read()
-                    import re
-                    m = re.search(r"\.main-panel\s*\{[^}]*width:\s*(\d+)px", content)
-                    if m:
-                        main_panel_width = int(m.group(1))
-            except Exception:
-                pass
-
-            settings_width = main_panel_width + body_padding + gap + border_adj
-            fixed_game_width = 960  # Fixed width for Roblox window (16:10 aspect)
-            fixed_game_height = 600  # Fixed height for Roblox window
-            header_height = 60  # Header for game container
+            # Container offsets come from ui.html (cached until it changes)
+            layout = self._geometry.layout()
+            settings_width = layout["settings_width"]
+            fixed_game_width = layout["game_width"]  # Fixed width for Roblox window (16:10 aspect)
+            fixed_game_height = layout["game_height"]  # Fixed height for Roblox window
+            header_height = layout["header_height"]  # Header for game container
 
-            # Try to account for DPI scaling of the webview window so child positioning matches CSS pixels
-            try:
-                # Get DPI for webview window if available (Windows 10+)
-                GetDpiForWindow = user32.GetDpiForWindow
-                dpi = GetDpiForWindow(webview_hwnd)
-            except Exception:
-                try:
-                    # Fallback: use desktop DPI
-                    hdc = user32.GetDC(0)
-                    gdi32 = ctypes.windll.gdi32
-                    LOGPIXELSX = 88
-                    dpi = gdi32.GetDeviceCaps(hdc, LOGPIXELSX)
-                    user32.ReleaseDC(0, hdc)
-                except Exception:
-                    dpi = 96
-
-            scale = float(dpi) / 96.0 if dpi else 1.0
+            # Account for DPI scaling of the webview window so child positioning matches CSS pixels
+            scale = self._geometry.dpi_scale(webview_hwnd)
             # Scale CSS pixel measurements to device pixels for positioning only
             scaled_settings_width = int(settings_width * scale)
             scaled_header_height = int(header_height * scale)
@@ -383,17 +422,10 @@ class MacroAPI:
             
             self._roblox_hwnd = hwnd
             self._original_style = original_style  # Store for restoration
-            # Update engine with exact Roblox region so image detection uses correct coords
-            try:
-                # After positioning, read back the actual window rect and update engine region
-                rect = wintypes.RECT()
-                GetWindowRect(hwnd, ctypes.byref(rect))
-                region = (rect.left, rect.top, rect.right, rect.bottom)
-                print(f"DEBUG: Attached Roblox region set to: {region}")
-                if self.engine:
-                    self.engine.roblox_region = region
-            except Exception as e:
-                print(f"DEBUG: Could not set engine.roblox_region: {e}")
+            # Track the positioned window; listeners push the region to the engine
+            region = self._geometry.track(hwnd)
+            self._geometry.start_watching()
+            print(f"DEBUG: Attached Roblox region set to: {region}")
             return {"success": True, "message": "Roblox window attached!"}
             
         except Exception as e:
@@ -431,41 +463,111 @@ class MacroAPI:
         self._roblox_hwnd = None
         self._original_parent = None
         self._original_style = None
+        self._geometry.stop_watching()
+        self._geometry.track(None)
         return {"success": True}
     
     def start_macro(self, config_update):
         """Start the macro with updated configuration"""
-        # Reload config from file first
-        self.config = load_config()
+        # Pick up external edits to the config file (served from memory otherwise)
+        self.config = self._config_store.get()
         
         # Update config with new values
         self.config["mode"] = config_update.get("mode", "Story")
         self.config["location"] = config_update.get("location", "Leaf Village")
         self.config["act"] = config_update.get("act", "Act 1")
-        save_config(self.config)
+        self._config_store.save(self.config)
         
         # Start macro
-        self._start_macro_internal()
-        return {"success": True}
+        return self._start_macro_internal() or {"success": True}
     
     def _start_macro_internal(self):
         """Internal method to start macro"""
         if self.engine and self.engine.running:
             return
 
-        self.engine = MacroEngine(self.config, self._status_callback)
-        # If we have an attached Roblox window, set engine.roblox_region before starting
+        # Parse and validate the act's unit setup now, so bad records stop the start instead of the run
+        location = self.config.get("location", "Leaf Village")
+        act = self.config.get("act", "Act 1")
+        unit_config = self._unit_configs.get(location, act)
+        region = self._geometry.roblox_region() if self._geometry.is_attached() else None
+        from placement_plan import compile_plan, PlacementPlanError
+        from placement_planner import parse_area
         try:
-            if self._roblox_hwnd and IsWindow(self._roblox_hwnd):
-                rect = wintypes.RECT()
-                GetWindowRect(self._roblox_hwnd, ctypes.byref(rect))
-                region = (rect.left, rect.top, rect.right, rect.bottom)
-                print(f"DEBUG: Setting engine.roblox_region from attached hwnd: {region}")
-                self.engine.roblox_region = region
-        except Exception as e:
-            print(f"DEBUG: Could not set engine.roblox_region before start: {e}")
+            plan = compile_plan(unit_config, region)
+            if self.config.get("placement_area"):
+                parse_area(self.config["placement_area"])
+        except PlacementPlanError as e:
+            message = f"Placement setup for {location} - {act} has errors: {e}"
+            self._status_bus.publish(message, type='macro_stopped', level='error')
+            return {"success": False, "message": message}
+        if plan.warnings:
+            self._status_bus.publish("; ".join(plan.warnings), level='warning', key='placement_plan_warnings')
+
+        self.engine = macro_engine.MacroEngine(self.config, self._status_callback)
+        # If we have an attached Roblox window, set engine.roblox_region before starting
+        if region:
+            self.engine.roblox_region = region
+        # Hand the engine the act's unit setup from memory, and its compiled form for the hot loop
+        self.engine.unit_config = unit_config
+        self.engine.placement_plan = plan
+        # Each subsystem below is optional for the engine; one failing must not skip the others
+        # Engine reads frames from the same source as the screenshot hotkey
+        self._wire_engine('frame_source', lambda: self._get_frame_source(self.engine.roblox_region))
+        # Button templates decoded once, matchable at any window size
+        self._wire_engine('template_index', self._get_template_index)
+        # Unchanged regions reuse the text read last time instead of running Tesseract
+        self._wire_engine('ocr_cache', self._get_ocr_cache)
+        # Batch/async OCR for the engine when the pool backend is configured (None otherwise)
+        self._wire_engine('ocr_pool', self._get_ocr_pool)
+
+        # Cheap per-region frame diffs so detection only runs where the screen changed
+        def change_detector():
+            from change_detector import ChangeDetector
+            return ChangeDetector()
+        self._wire_engine('change_detector', change_detector)
+
+        # Known screens (menus, Victory/Defeat) from starting image/screens; OCR only when ambiguous
+        def screen_classifier():
+            from screen_classifier import get_screen_classifier, text_label_fallback
+            ocr_cache = self.engine.ocr_cache
+            return get_screen_classifier(ocr_fallback=text_label_fallback(ocr_cache) if ocr_cache else None)
+        self._wire_engine('screen_classifier', screen_classifier)
+
+        # Wave/money/timer counters read from glyph templates, OCR only for weak matches
+        def digit_reader():
+            from digit_reader import get_digit_reader
+            return get_digit_reader(ocr_func=self.engine.ocr_cache)
+        self._wire_engine('digit_reader', digit_reader)
+
+        # Spiral placement positions with an occupancy grid, so blocked spots are never retried
+        self._wire_engine('placement_planner', lambda: self._get_placement_planner(self.engine.roblox_region))
+
+        # Next place/upgrade action from priority queues instead of re-scanning the units every tick
+        def placement_scheduler():
+            from placement_scheduler import PlacementScheduler
+            return PlacementScheduler(
+                plan,
+                place_cost=self.config.get("place_costs"),
+                upgrade_cost=self.config.get("upgrade_costs"),
+                slot_limits=self.config.get("slot_limits"),
+                priorities=self.config.get("unit_priorities")
+            )
+        self._wire_engine('placement_scheduler', placement_scheduler)
 
         self.engine.start()
+        return {"success": True}
+    
+    def _wire_engine(self, name, build):
+        """Set one engine subsystem; a failure is reported and leaves it None instead of aborting the rest"""
+        try:
+            value = build()
+        except Exception as e:
+            value = None
+            self._status_bus.publish(f"Could not set up {name.replace('_', ' ')}: {e}",
+                                     level='warning', key=f'engine_setup_{name}')
+        setattr(self.engine, name, value)
+        return value
     
     def stop_macro(self):
         """Stop the macro"""
@@ -474,21 +576,36 @@ class MacroAPI:
     
     def _status_callback(self, message):
         """Callback for status updates from macro engine"""
-        self._status_queue.put(message)
+        # The engine reports free text; tag its start/stop lines so the UI doesn't have to sniff them
+        message_lower = message.lower()
+        if 'macro started' in message_lower:
+            self._status_bus.publish(message, type='macro_started')
+        elif 'macro stopped' in message_lower:
+            self._status_bus.publish(message, type='macro_stopped')
+        elif 'error' in message_lower:
+            self._status_bus.publish(message, level='error')
+        else:
+            self._status_bus.publish(message)
+    
+    def subscribe_status(self):
+        """Start pushing status batches to the UI (called once the page is ready)"""
+        self._status_bus.attach(self._window)
+        PROFILE.mark_ready('page ready')
+        if PROFILE_STARTUP:
+            print(PROFILE.format_report())
+        return True
     
-    def get_status_updates(self):
-        """Get pending status updates"""
-        updates = []
-        while not self._status_queue.empty():
-            try:
-                updates.append(self._status_queue.get_nowait())
-            except queue.Empty:
-                break
-        return updates
+    def get_startup_profile(self):
+        """Import/initialization timing breakdown of this run"""
+        return PROFILE.report()
     
-
+    def get_status_updates(self):
+        """Get pending status events (polling fallback for subscribe_status)"""
+        return self._status_bus.drain()
     
-
+    def get_status_stats(self):
+        """Get status bus counters (published/coalesced/dropped/batches)"""
+        return self._status_bus.stats()
     
     def get_config(self):
         """Get full config for UI"""
@@ -500,122 +617,65 @@ class MacroAPI:
         self.config["location"] = location
         self.config["act"] = act
         self.config["nightmare"] = nightmare
-        save_config(self.config)
+        self._config_store.save(self.config)
         print(f"Config updated: mode={mode}, location={location}, act={act}, nightmare={nightmare}")
         return True
     
     def get_unit_config_template(self):
         """Get blank unit config template"""
-        return {
-            "Units": [
-                {
-                    "Index": i,
-                    "Enabled": False,
-                    "PlaceBeforeYes": False,
-                    "AutoUpgrade": False,
-                    "Slot": "1",
-                    "X": "",
-                    "Y": "",
-                    "Upgrade": "0",
-                    "Note": f"Unit {i}"
-                }
-                for i in range(1, 16)  # 15 unit slots
-            ]
-        }
+        return unit_config_template()
     
     def get_unit_config_path(self, location, act):
         """Get the path for unit config based on location and act"""
-        settings_folder = os.path.join(os.path.dirname(__file__), "Settings", "Story", location)
-        os.makedirs(settings_folder, exist_ok=True)
-        return os.path.join(settings_folder, f"{act}.json")
+        return self._unit_configs.path_for(location, act)
     
     def load_unit_config(self, location, act):
         """Load unit configuration for a location and act"""
-        import json
-        config_path = self.get_unit_config_path(location, act)
-        
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return self.get_unit_config_template()
-        else:
-            # Create blank config
-            template = self.get_unit_config_template()
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(template, f, indent=4)
-            return template
+        return self._unit_configs.get(location, act)
     
     def save_unit_config(self, location, act, config_data):
-        """Save unit configuration"""
-        import json
-        config_path = self.get_unit_config_path(location, act)
-        
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, indent=4)
-        
-        print(f"Unit config saved to: {config_path}")
+        """Save unit configuration (written to disk in the background)"""
+        self._unit_configs.save(location, act, config_data)
         return True
     
     def get_map_preview_path(self, location, act):
-        """Get the map preview image as base64 data URL"""
-        import base64
+        """Get a URL for the map preview thumbnail (served by the local preview server)"""
+        if self._preview_cache is None:
+            from preview_cache import PreviewCache
+            self._preview_cache = PreviewCache()
         
-        # Check Settings folder first (where coordinate picker saves screenshots)
-        settings_folder = os.path.join(os.path.dirname(__file__), "Settings", "Story", location)
-        
-        if os.path.exists(settings_folder):
-            for filename in os.listdir(settings_folder):
-                if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    image_path = os.path.join(settings_folder, filename)
-                    try:
-                        with open(image_path, 'rb') as f:
-                            img_data = base64.b64encode(f.read()).decode('utf-8')
-                        ext = filename.lower().split('.')[-1]
-                        mime = 'image/jpeg' if ext in ['jpg', 'jpeg'] else 'image/png'
-                        return {"success": True, "path": f"data:{mime};base64,{img_data}"}
-                    except Exception as e:
-                        print(f"Error reading image: {e}")
-        
-        # Fallback to starting image folder
+        # Check Settings folder first (where coordinate picker saves screenshots),
+        # then fall back to the starting image folder
         folder_name = self._get_location_key(location)
-        image_folder = os.path.join(os.path.dirname(__file__), "starting image", "Story", folder_name)
-        
-        if os.path.exists(image_folder):
-            for filename in os.listdir(image_folder):
-                if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    image_path = os.path.join(image_folder, filename)
-                    try:
-                        with open(image_path, 'rb') as f:
-                            img_data = base64.b64encode(f.read()).decode('utf-8')
-                        ext = filename.lower().split('.')[-1]
-                        mime = 'image/jpeg' if ext in ['jpg', 'jpeg'] else 'image/png'
-                        return {"success": True, "path": f"data:{mime};base64,{img_data}"}
-                    except Exception as e:
-                        print(f"Error reading image: {e}")
+        folders = [
+            os.path.join(os.path.dirname(__file__), "Settings", "Story", location),
+            os.path.join(os.path.dirname(__file__), "starting image", "Story", folder_name)
+        ]
+        
+        for folder in folders:
+            image_path = self._preview_cache.find_image(folder)
+            if image_path:
+                try:
+                    return {"success": True, "path": self._preview_cache.get_url(image_path)}
+                except Exception as e:
+                    print(f"Error reading image: {e}")
         
         return {"success": False, "path": None}
     
     def get_roblox_window_info(self):
         """Get the current Roblox window position and size"""
-        if self._roblox_hwnd and IsWindow(self._roblox_hwnd):
-            rect = wintypes.RECT()
-            GetWindowRect(self._roblox_hwnd, ctypes.byref(rect))
-            return {
-                "x": rect.left,
-                "y": rect.top,
-                "width": rect.right - rect.left,
-                "height": rect.bottom - rect.top
-            }
+        if self._geometry.is_attached():
+            return self._geometry.window_info()
         return {"x": 0, "y": 0, "width": 960, "height": 600}
     
+    def _on_roblox_region_changed(self, region):
+        """Keep the running engine's region in sync with the attached window"""
+        if region and self.engine:
+            self.engine.roblox_region = region
+            self.engine.frame_source = self._get_frame_source(region)
+    
     def open_coordinate_picker(self, location, act, unit_index):
-        """Open coordinate picker for a specific unit"""
-        import subprocess
-        import sys
-        import json
-        
+        """Open coordinate picker for a specific unit (result arrives as a picker_result status event)"""
         # Get image folder for the location
         image_folder = self._get_image_folder_path()
         image_path = None
@@ -630,100 +690,43 @@ class MacroAPI:
             return {"success": False, "message": "No screenshot found. Take a screenshot first (F4)."}
         
         # Load existing unit coordinates to display in picker
-        location_key = self._get_location_key(location)
-        config_path = os.path.join(os.path.dirname(__file__), "Settings", "Story", location_key, f"{act}.json")
         other_units = []
-        
-        print(f"DEBUG: Looking for unit config at: {config_path}")
-        
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                for unit in config.get("Units", []):
-                    # Show all units that have coordinates set (not just enabled ones)
-                    if unit.get("X") and unit.get("Y"):
-                        try:
-                            other_units.append({
-                                "index": unit["Index"],
-                                "x": int(unit["X"]),
-                                "y": int(unit["Y"]),
-                                "note": unit.get("Note", f"Unit {unit['Index']}")
-                            })
-                        except (ValueError, KeyError):
-                            pass
-                print(f"DEBUG: Found {len(other_units)} units with coordinates")
-            except Exception as e:
-                print(f"Error loading unit config: {e}")
-        else:
-            print(f"DEBUG: Config file does not exist: {config_path}")
-        
-        # Launch coordinate picker
-        script_path = os.path.join(os.path.dirname(__file__), "coordinate_picker.py")
-        
-        # Get the actual position of the Roblox window on screen
-        if self._roblox_hwnd and IsWindow(self._roblox_hwnd):
-            rect = wintypes.RECT()
-            GetWindowRect(self._roblox_hwnd, ctypes.byref(rect))
-            roblox_x = rect.left
-            roblox_y = rect.top
-            roblox_width = rect.right - rect.left
-            roblox_height = rect.bottom - rect.top
-        else:
-            # Fallback to default embedded position - compute offsets from ui.html
-            ui_path = os.path.join(os.path.dirname(__file__), 'ui.html')
-            main_panel_width = 550
-            body_padding = 15
-            gap = 15
-            border_adj = 5
-            try:
-                if os.path.exists(ui_path):
-                    with open(ui_path, 'r', encoding='utf-8') as fh:
-                        content = fh.read()
-                    import re
-                    m = re.search(r"\.main-panel\s*\{[^}]*width:\s*(\d+)px", content)
-                    if m:
-                        main_panel_width = int(m.group(1))
-            except Exception:
-                pass
-
-            settings_width = main_panel_width + body_padding + gap + border_adj
-            roblox_x = settings_width
-            roblox_y = 60
-            roblox_width = 960
-            roblox_height = 600
+        from placement_plan import compile_plan
+        plan = compile_plan(self._unit_configs.get(location, act), include_disabled=True, strict=False)
+        for unit in plan:
+            # Show all units that have coordinates set (not just enabled ones)
+            if unit.has_position:
+                other_units.append({
+                    "index": unit.index,
+                    "x": unit.screen_x,
+                    "y": unit.screen_y,
+                    "note": unit.note or f"Unit {unit.index}"
+                })
+        
+        # Actual position of the Roblox window on screen, or the default embedded position
+        window_info = self._geometry.window_info()
+        
+        def on_result(response):
+            if response.get("success"):
+                x, y = response["x"], response["y"]
+                print(f"Coordinates selected: ({x}, {y})")
+                config = self._unit_configs.get(location, act)
+                unit = config["Units"][unit_index - 1]
+                unit["X"] = str(x)
+                unit["Y"] = str(y)
+                config["WindowInfo"] = window_info
+                self._unit_configs.save(location, act, config)
+            data = {"location": location, "act": act, "unit_index": unit_index,
+                    "success": bool(response.get("success")), "x": response.get("x"), "y": response.get("y")}
+            self._status_bus.publish(response.get("message") or "Coordinates selected",
+                                     type='picker_result', level='info', data=data)
         
         try:
-            # Pass other units as JSON argument
-            other_units_json = json.dumps(other_units)
-            
-            # Run coordinate picker and wait for result (synchronously)
-            result = subprocess.run(
-                [sys.executable, script_path, image_path, location, act, str(unit_index),
-                 str(roblox_x), str(roblox_y), str(roblox_width), str(roblox_height), other_units_json],
-                cwd=os.path.dirname(__file__),
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            # Parse coordinates from output
-            for line in result.stdout.split('\n'):
-                line = line.strip()
-                if ',' in line and not line.startswith('✓'):
-                    try:
-                        x, y = line.split(',')
-                        x = int(x.strip())
-                        y = int(y.strip())
-                        print(f"Coordinates selected: ({x}, {y})")
-                        return {"success": True, "x": x, "y": y}
-                    except:
-                        continue
-            
-            return {"success": False, "message": "No coordinates selected"}
-            
-        except subprocess.TimeoutExpired:
-            return {"success": False, "message": "Coordinate picker timed out"}
+            if self._picker_worker is None:
+                from picker_worker import PickerWorker
+                self._picker_worker = PickerWorker()
+            self._picker_worker.pick(image_path, unit_index, window_info, other_units, on_result)
+            return {"success": True, "pending": True}
         except Exception as e:
             return {"success": False, "message": f"Error: {str(e)}"}
     
@@ -732,24 +735,72 @@ class MacroAPI:
         return {"version": VERSION}
     
     def check_for_updates(self):
-        """Check for available updates"""
-        return check_update()
+        """Latest release info from the update cache; never waits on the network.
+
+        A missing or expired cache is refreshed in the background and the answer
+        is pushed to the UI as an 'update_check' status event.
+        """
+        checks = self._get_update_checks()
+        result = checks.cached()
+        if result is None or result["stale"]:
+            checks.check_async(self._on_update_checked)
+        if result is None:
+            return {"success": True, "pending": True, "message": "Checking for updates..."}
+        self._remember_update(result)
+        return result
+    
+    def _get_update_checks(self):
+        if self._update_checks is None:
+            self._update_checks = update_check.UpdateCheckService()
+        return self._update_checks
+    
+    def _remember_update(self, result):
+        if result.get("success") and result.get("download_url"):
+            # Remember the digest/manifest so install_update can verify and diff the download
+            self._update_info[result["download_url"]] = result
+    
+    def _on_update_checked(self, result):
+        """Runs on the update-check thread when a background check finishes"""
+        self._remember_update(result)
+        if not result.get("success"):
+            message, level = result.get("message", "Update check failed"), 'error'
+        elif result.get("update_available"):
+            message, level = f"Update available: v{result['latest_version']}", 'success'
+        else:
+            message, level = "You are running the latest version.", 'info'
+        self._status_bus.publish(message, type='update_check', level=level, key='update_check', data=result)
     
     def install_update(self, download_url):
         """Download and install an update"""
         def status_callback(message):
-            # Queue status updates for UI
-            self._status_queue.put(message)
+            # Progress lines replace each other instead of flooding the UI
+            key = 'update_progress' if message.startswith('Downloading...') else None
+            self._status_bus.publish(message, type='update', level='info', key=key)
         
-        result = perform_update(download_url, status_callback)
+        info = self._update_info.get(download_url, {})
+        result = updater.perform_update(download_url, status_callback, info.get("sha256"), info.get("manifest_url"))
+        return result
+    
+    def rollback_update(self):
+        """Switch back to the version installed before the last update"""
+        result = updater.rollback_update()
+        level = 'success' if result.get("success") else 'error'
+        self._status_bus.publish(result["message"], type='update', level=level)
         return result
     
     def restart_application(self):
         """Restart the application after update"""
         try:
+            # exec skips the exit path, so write pending settings now; the next start carries them
+            # into the new install slot
+            self._config_store.flush()
+            self._unit_configs.flush()
             if getattr(sys, 'frozen', False):
-                # Running as exe
-                os.execv(sys.executable, [sys.executable])
+                # Running as exe: start whichever install slot is live now
+                exe = install_slots.InstallSlots.for_app_dir(os.path.dirname(sys.executable)).executable()
+                if not os.path.exists(exe):
+                    exe = sys.executable
+                os.execv(exe, [exe])
             else:
                 # Running as script
                 os.execv(sys.executable, [sys.executable] + sys.argv)
@@ -757,40 +808,87 @@ class MacroAPI:
             return {"success": False, "message": str(e)}
 
 
+def _launch_active_slot():
+    """Hand off to the live install slot if this exe is not it; True when it did"""
+    if not getattr(sys, 'frozen', False):
+        return False
+    slots = install_slots.InstallSlots.for_app_dir(os.path.dirname(sys.executable))
+    try:
+        # First start after an update or rollback: bring over settings saved by the version that ran last
+        slots.finish_switch()
+    except Exception as e:
+        print(f"Could not carry settings into the new install slot: {e}")
+    exe = slots.executable()
+    if os.path.normcase(os.path.abspath(exe)) == os.path.normcase(os.path.abspath(sys.executable)) or not os.path.exists(exe):
+        return False
+    import subprocess
+    subprocess.Popen([exe] + sys.argv[1:], cwd=os.path.dirname(exe))
+    return True
+
+
 def main():
-    api = MacroAPI()
+    if _launch_active_slot():
+        return
+    
+    with PROFILE.phase('MacroAPI()'):
+        api = MacroAPI()
     
     # Load HTML content
     html_path = os.path.join(os.path.dirname(__file__), 'ui.html')
     
-    # Register hotkeys before window creation
-    def setup_hotkeys():
-        start_key = api.config.get("start_keybind", "f1")
-        stop_key = api.config.get("stop_keybind", "f3")
-        api.apply_keybinds(start_key, stop_key)
+    # Runs on a webview thread once the GUI loop is up
+    def on_started():
+        PROFILE.mark('webview started')
+        with PROFILE.phase('register hotkeys'):
+            start_key = api.config.get("start_keybind", "f1")
+            stop_key = api.config.get("stop_keybind", "f3")
+            api.apply_keybinds(start_key, stop_key)
+        # Check for updates once in the background; the UI reads the cached answer
+        api._get_update_checks().check_async(api._on_update_checked)
+        # Decode the button templates before the first macro start needs them
+        def warm_templates():
+            with PROFILE.phase('template index'):
+                api._get_template_index()
+        threading.Thread(target=warm_templates, name="TemplateIndexWarmup", daemon=True).start()
     
     # Create single window with transparent background
-    window = webview.create_window(
-        'Anime Paradox Macro',
-        html_path,
-        js_api=api,
-        width=1100,
-        height=850,
-        resizable=False,
-        transparent=False,
-        frameless=False
-    )
+    with PROFILE.phase('create window'):
+        window = webview.create_window(
+            'Anime Paradox Macro',
+            html_path,
+            js_api=api,
+            width=1100,
+            height=850,
+            resizable=False,
+            transparent=False,
+            frameless=False
+        )
     
     api._window = window
     
     # Start webview
-    webview.start(setup_hotkeys, debug=False)
+    webview.start(on_started, debug=False)
     
     # Cleanup on exit
     if api._hotkeys_registered:
         keyboard.unhook_all_hotkeys()
     if api.engine and api.engine.running:
         api.engine.stop()
+    if api._screenshot_writer:
+        api._screenshot_writer.flush()
+    if api._frame_source:
+        api._frame_source.close()
+    if api._preview_cache:
+        api._preview_cache.close()
+    if api._picker_worker:
+        api._picker_worker.close()
+    if api._ocr_pool:
+        api._ocr_pool.close()
+    api._status_bus.close()
+    api._config_store.flush()
+    api._unit_configs.flush()
+    if 'screen_capture' in sys.modules:
+        sys.modules['screen_capture'].close_all_captures()
 
 
 if __name__ == "__main__":
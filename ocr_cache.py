@@ -0,0 +1,104 @@
+"""
+OCR result cache for AnimeParadoxMacro
+Sits in front of the Tesseract call: the region's pixels are downsampled,
+quantized and hashed, and an identical region returns the text read last
+time instead of running OCR again. Entries are evicted least recently used
+first and hit/miss counters show how much OCR the cache saves.
+"""
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def tesseract_image_to_string(image, config=''):
+    """Default backend: plain pytesseract"""
+    import pytesseract
+    return pytesseract.image_to_string(image, config=config)
+
+
+def _gray_pixels(image):
+    """Grayscale uint8 array for a Frame, PIL image or BGR/BGRA/gray array"""
+    if hasattr(image, 'gray'):
+        return image.gray()
+    if hasattr(image, 'convert'):
+        return np.asarray(image.convert('L'))
+    image = np.asarray(image)
+    if image.ndim == 2:
+        return image
+    # Channel order does not matter for a cache key, so a plain mean is enough
+    return image[..., :3].mean(axis=2, dtype=np.float32).astype(np.uint8)
+
+
+class OCRCache:
+    """LRU of OCR results keyed by a hash of the region's content"""
+
+    def __init__(self, ocr_func=None, max_entries=256, downsample=2, quantize_bits=2):
+        self.ocr_func = ocr_func or tesseract_image_to_string
+        self.max_entries = max_entries
+        self.downsample = max(1, int(downsample))
+        # Dropping the low bits keeps compression noise and slight flicker from missing the cache
+        self.quantize_bits = quantize_bits
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.ocr_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def key(self, image, config=''):
+        """Content key for a region plus the OCR settings used to read it"""
+        gray = _gray_pixels(image)
+        small = gray[::self.downsample, ::self.downsample]
+        if self.quantize_bits:
+            small = small >> self.quantize_bits
+        digest = hashlib.blake2b(np.ascontiguousarray(small).data, digest_size=16)
+        digest.update(f"{gray.shape}|{config}".encode())
+        return digest.digest()
+
+    def read(self, image, config=''):
+        """Text in image, from the cache when the same pixels were read before"""
+        key = self.key(image, config)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += entry[1]
+                return entry[0]
+            self.misses += 1
+
+        started = time.perf_counter()
+        text = self.ocr_func(image, config)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.ocr_seconds += elapsed
+            self._entries[key] = (text, elapsed)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return text
+
+    def __call__(self, image, config=''):
+        return self.read(image, config)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "evictions": self.evictions,
+                "ocr_seconds": round(self.ocr_seconds, 3),
+                "saved_seconds": round(self.saved_seconds, 3)
+            }
@@ -0,0 +1,244 @@
+"""
+Persistent OCR worker pool for AnimeParadoxMacro
+pytesseract starts a tesseract process and loads the language model for
+every call. This pool keeps long-lived recognizers instead: each worker
+thread owns a tesserocr API handle per OCR config (tesserocr releases the GIL
+while recognizing, so threads run in parallel). Batches of regions go to one
+worker in a single request and results come back as futures with per-region
+timing. Without tesserocr the pool falls back to pytesseract calls.
+
+Benchmark against the per-call path (needs a local tesseract install):
+    python ocr_pool.py [workers] [images]
+"""
+import os
+import sys
+import time
+import shlex
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class OCRResult:
+    """Text read from one region and how long recognition took"""
+    __slots__ = ('text', 'seconds', 'worker')
+
+    def __init__(self, text, seconds, worker):
+        self.text = text
+        self.seconds = seconds
+        self.worker = worker
+
+    def __repr__(self):
+        return f"OCRResult({self.text!r}, {self.seconds * 1000:.1f} ms, {self.worker})"
+
+
+def _to_pil(image):
+    """PIL image for a Frame, PIL image or RGB/gray array"""
+    if hasattr(image, 'to_pil'):
+        return image.to_pil()
+    if hasattr(image, 'convert'):
+        return image
+    from PIL import Image
+    return Image.fromarray(image)
+
+
+def parse_tesseract_config(config):
+    """Split a pytesseract config string into (lang, oem, psm, variables)"""
+    lang, oem, psm, variables = None, None, None, {}
+    tokens = shlex.split(config or '')
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        value = tokens[i + 1] if i + 1 < len(tokens) else None
+        if token == '--psm' and value is not None:
+            psm = int(value)
+            i += 1
+        elif token == '--oem' and value is not None:
+            oem = int(value)
+            i += 1
+        elif token == '-l' and value is not None:
+            lang = value
+            i += 1
+        elif token == '-c' and value is not None and '=' in value:
+            name, _, setting = value.partition('=')
+            variables[name] = setting
+            i += 1
+        i += 1
+    return lang, oem, psm, variables
+
+
+class _TesserocrRecognizer:
+    """One loaded tesseract engine configured for one config string"""
+
+    def __init__(self, config, lang, tessdata_path):
+        import tesserocr
+        config_lang, oem, psm, variables = parse_tesseract_config(config)
+        kwargs = {"lang": config_lang or lang}
+        if tessdata_path:
+            kwargs["path"] = tessdata_path
+        if oem is not None:
+            # OEM/PSM are plain int constants in tesserocr, not constructible enums
+            kwargs["oem"] = oem
+        self.api = tesserocr.PyTessBaseAPI(**kwargs)
+        if psm is not None:
+            self.api.SetPageSegMode(psm)
+        for name, value in variables.items():
+            self.api.SetVariable(name, value)
+
+    def read(self, image):
+        self.api.SetImage(_to_pil(image))
+        return self.api.GetUTF8Text()
+
+    def close(self):
+        self.api.End()
+
+
+class _PytesseractRecognizer:
+    """Fallback: a tesseract process per call"""
+
+    def __init__(self, config, lang, tessdata_path):
+        import pytesseract
+        self._pytesseract = pytesseract
+        self.config = config
+        if tessdata_path:
+            self.config = f'--tessdata-dir "{tessdata_path}" {config}'.strip()
+        self.lang = lang
+
+    def read(self, image):
+        return self._pytesseract.image_to_string(_to_pil(image), lang=self.lang, config=self.config)
+
+    def close(self):
+        pass
+
+
+def tesserocr_available():
+    try:
+        import tesserocr  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class OCRPool:
+    """Long-lived recognizers on a thread pool, fed single regions or batches"""
+
+    def __init__(self, workers=None, lang='eng', tessdata_path=None, backend='auto'):
+        self.workers = max(1, int(workers or os.cpu_count() or 2))
+        self.lang = lang
+        self.tessdata_path = tessdata_path
+        if backend == 'auto':
+            backend = 'tesserocr' if tesserocr_available() else 'pytesseract'
+        self.backend = backend
+        self._recognizer_class = _TesserocrRecognizer if backend == 'tesserocr' else _PytesseractRecognizer
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="OCRWorker")
+        self._local = threading.local()
+        self._recognizers = []
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.busy_seconds = 0.0
+
+    def _recognizer(self, config):
+        """This worker's recognizer for a config, loaded on first use and kept"""
+        recognizers = getattr(self._local, 'recognizers', None)
+        if recognizers is None:
+            recognizers = self._local.recognizers = {}
+        recognizer = recognizers.get(config)
+        if recognizer is None:
+            recognizer = self._recognizer_class(config, self.lang, self.tessdata_path)
+            recognizers[config] = recognizer
+            with self._lock:
+                self._recognizers.append(recognizer)
+        return recognizer
+
+    def _run(self, images, config):
+        recognizer = self._recognizer(config)
+        worker = threading.current_thread().name
+        results = []
+        for image in images:
+            started = time.perf_counter()
+            text = recognizer.read(image)
+            results.append(OCRResult(text, time.perf_counter() - started, worker))
+        with self._lock:
+            self.calls += len(results)
+            self.busy_seconds += sum(result.seconds for result in results)
+        return results
+
+    def submit(self, image, config=''):
+        """Future resolving to the OCRResult for one region"""
+        return self._executor.submit(lambda: self._run([image], config)[0])
+
+    def submit_batch(self, images, config=''):
+        """Future resolving to a list of OCRResults, read by one worker in order"""
+        return self._executor.submit(self._run, list(images), config)
+
+    def map(self, images, config=''):
+        """Spread regions over all workers; returns results in input order"""
+        futures = [self.submit(image, config) for image in images]
+        return [future.result() for future in futures]
+
+    def image_to_string(self, image, config=''):
+        """Blocking drop-in for pytesseract.image_to_string (and OCRCache's backend)"""
+        return self.submit(image, config).result().text
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "workers": self.workers,
+                "recognizers": len(self._recognizers),
+                "calls": self.calls,
+                "busy_seconds": round(self.busy_seconds, 3)
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            recognizers = self._recognizers
+            self._recognizers = []
+        for recognizer in recognizers:
+            try:
+                recognizer.close()
+            except Exception:
+                pass
+
+
+def _sample_images(count):
+    """Rendered text regions like the menu/counter labels the engine reads"""
+    from PIL import Image, ImageDraw
+    words = ['Victory', 'Defeat', 'Replay', 'Wave 12', 'Start', 'Create Match', '$1500', 'Leaf Village']
+    images = []
+    for i in range(count):
+        image = Image.new('L', (240, 48), 255)
+        ImageDraw.Draw(image).text((10, 16), words[i % len(words)], fill=0)
+        images.append(image.resize((480, 96)))
+    return images
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    images = _sample_images(count)
+    config = '--psm 7'
+
+    import pytesseract
+    started = time.perf_counter()
+    for image in images:
+        pytesseract.image_to_string(image, config=config)
+    per_call = time.perf_counter() - started
+    print(f"pytesseract per call: {count} regions in {per_call:.2f}s ({per_call / count * 1000:.1f} ms each)")
+
+    pool = OCRPool(workers=workers)
+    pool.map(images[:pool.workers], config)  # load one recognizer per worker
+    started = time.perf_counter()
+    results = pool.map(images, config)
+    pooled = time.perf_counter() - started
+    batch_started = time.perf_counter()
+    pool.submit_batch(images, config).result()
+    batched = time.perf_counter() - batch_started
+    pool.close()
+    print(f"OCRPool ({pool.backend}, {pool.workers} workers): {pooled:.2f}s spread, {batched:.2f}s as one batch; "
+          f"first result {results[0]}")
+    print(f"Speed-up: {per_call / pooled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
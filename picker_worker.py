@@ -0,0 +1,211 @@
+"""
+Coordinate picker worker for AnimeParadoxMacro
+A long-lived picker process that keeps screenshots decoded between picks and
+talks JSON lines over stdin/stdout, so picking coordinates for each unit does
+not pay an interpreter start and an image decode.
+
+Protocol (one JSON object per line):
+    request:  {"id": 1, "cmd": "pick", "image": path, "unit_index": 3,
+               "window": {"x": .., "y": .., "width": .., "height": ..},
+               "others": [{"index": .., "x": .., "y": .., "note": ..}]}
+    response: {"id": 1, "success": true, "x": 512, "y": 300}
+              {"id": 1, "success": false, "message": "..."}
+    {"cmd": "shutdown"} stops the worker.
+"""
+import os
+import sys
+import json
+import queue
+import threading
+import subprocess
+
+WORKER_SCRIPT = os.path.abspath(__file__)
+
+
+class PickerWorker:
+    """Client side: owns the worker process and routes responses to callbacks"""
+
+    def __init__(self):
+        self._process = None
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self._next_id = 1
+
+    def _ensure_process(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        self._process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT],
+            cwd=os.path.dirname(WORKER_SCRIPT),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            bufsize=1
+        )
+        threading.Thread(target=self._read_responses, args=(self._process,), name="PickerWorkerReader", daemon=True).start()
+
+    def _read_responses(self, process):
+        for line in process.stdout:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                callback = self._callbacks.pop(response.get("id"), None)
+            if callback:
+                callback(response)
+
+        # Worker exited: fail anything still waiting on it
+        with self._lock:
+            pending = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in pending:
+            callback({"success": False, "message": "Coordinate picker closed unexpectedly"})
+
+    def pick(self, image_path, unit_index, window, others, callback):
+        """Ask the worker for a point; ``callback(response)`` runs on the reader thread"""
+        with self._lock:
+            self._ensure_process()
+            request_id = self._next_id
+            self._next_id += 1
+            self._callbacks[request_id] = callback
+            request = {
+                "id": request_id,
+                "cmd": "pick",
+                "image": image_path,
+                "unit_index": unit_index,
+                "window": window,
+                "others": others
+            }
+            self._process.stdin.write(json.dumps(request) + "\n")
+            self._process.stdin.flush()
+        return request_id
+
+    def close(self):
+        with self._lock:
+            process = self._process
+            self._process = None
+        if process is not None and process.poll() is None:
+            try:
+                process.stdin.write(json.dumps({"cmd": "shutdown"}) + "\n")
+                process.stdin.flush()
+                process.wait(timeout=2)
+            except Exception:
+                process.kill()
+
+
+class _PickerApp:
+    """Worker side: hidden Tk root that opens a picker window per request"""
+
+    def __init__(self):
+        import tkinter as tk
+        self.tk = tk
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.requests = queue.Queue()
+        self.images = {}
+        self.busy = False
+
+    def send(self, response):
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+    def read_stdin(self):
+        for line in sys.stdin:
+            line = line.strip()
+            if line:
+                self.requests.put(line)
+        self.requests.put(json.dumps({"cmd": "shutdown"}))
+
+    def poll(self):
+        while not self.busy:
+            try:
+                line = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                request = json.loads(line)
+            except ValueError:
+                continue
+            if request.get("cmd") == "shutdown":
+                self.root.destroy()
+                return
+            if request.get("cmd") == "pick":
+                self.open_picker(request)
+        self.root.after(30, self.poll)
+
+    def load_image(self, path, width, height):
+        """Decoded, window-sized PhotoImage, cached until the file changes"""
+        from PIL import Image, ImageTk
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size, width, height)
+        photo = self.images.get(key)
+        if photo is None:
+            with Image.open(path) as img:
+                img = img.convert('RGB')
+                if img.size != (width, height):
+                    img = img.resize((width, height))
+                photo = ImageTk.PhotoImage(img)
+            # Only the latest version of each screenshot is worth keeping
+            for old_key in [k for k in self.images if k[0] == path]:
+                del self.images[old_key]
+            self.images[key] = photo
+        return photo
+
+    def open_picker(self, request):
+        tk = self.tk
+        request_id = request.get("id")
+        window = request.get("window") or {}
+        win_x = int(window.get("x", 0))
+        win_y = int(window.get("y", 0))
+        width = int(window.get("width", 960))
+        height = int(window.get("height", 600))
+
+        try:
+            photo = self.load_image(request["image"], width, height)
+        except Exception as e:
+            self.send({"id": request_id, "success": False, "message": f"Could not open screenshot: {e}"})
+            return
+
+        self.busy = True
+        top = tk.Toplevel(self.root)
+        top.overrideredirect(True)
+        top.attributes('-topmost', True)
+        top.geometry(f"{width}x{height}+{win_x}+{win_y}")
+        canvas = tk.Canvas(top, width=width, height=height, highlightthickness=0, cursor='crosshair')
+        canvas.pack()
+        canvas.create_image(0, 0, image=photo, anchor='nw')
+
+        for unit in request.get("others") or []:
+            if unit.get("index") == request.get("unit_index"):
+                continue
+            ux = int(unit["x"]) - win_x
+            uy = int(unit["y"]) - win_y
+            canvas.create_oval(ux - 5, uy - 5, ux + 5, uy + 5, fill='#8b5cf6', outline='white')
+            canvas.create_text(ux + 8, uy - 8, text=f"U{unit['index']}", fill='white', anchor='sw')
+        canvas.create_text(
+            width // 2, 16, fill='white',
+            text=f"Click to place Unit {request.get('unit_index')} (Esc to cancel)"
+        )
+
+        def finish(response):
+            response["id"] = request_id
+            self.send(response)
+            top.destroy()
+            self.busy = False
+
+        top.bind('<Button-1>', lambda e: finish({"success": True, "x": win_x + e.x, "y": win_y + e.y}))
+        top.bind('<Escape>', lambda e: finish({"success": False, "message": "No coordinates selected"}))
+        top.focus_force()
+
+
+def main():
+    app = _PickerApp()
+    threading.Thread(target=app.read_stdin, daemon=True).start()
+    app.root.after(30, app.poll)
+    app.root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
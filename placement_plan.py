@@ -0,0 +1,210 @@
+"""
+Compiled placement plan for AnimeParadoxMacro
+Unit configs keep every field as a string so the UI can edit them as-is.
+compile_plan() parses and validates a Units list once, before the macro
+starts, into immutable UnitPlan records and read-only NumPy arrays with
+coordinates relative to the Roblox region. Bad records raise
+PlacementPlanError listing every problem, instead of failing mid-run. Units
+without coordinates are valid: they keep NO_POSITION and are placed by the
+placement planner inside the placement area.
+"""
+import numpy as np
+from unit_fields import UNIT_SLOTS, UPGRADE_VALUES, UPGRADE_MAX
+
+MAX_SLOT = 6
+NO_POSITION = -1
+
+
+class PlacementPlanError(ValueError):
+    """A unit config that cannot be run; errors lists one message per problem"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("; ".join(self.errors))
+
+
+class UnitPlan:
+    """One parsed unit record; x/y are region-relative, screen_x/screen_y as stored (None when unset)"""
+    __slots__ = ('index', 'enabled', 'place_before_yes', 'auto_upgrade', 'slot', 'upgrade',
+                 'screen_x', 'screen_y', 'x', 'y', 'note')
+
+    def __init__(self, index, enabled, place_before_yes, auto_upgrade, slot, upgrade,
+                 screen_x, screen_y, x, y, note):
+        set_field = object.__setattr__
+        set_field(self, 'index', index)
+        set_field(self, 'enabled', enabled)
+        set_field(self, 'place_before_yes', place_before_yes)
+        set_field(self, 'auto_upgrade', auto_upgrade)
+        set_field(self, 'slot', slot)
+        set_field(self, 'upgrade', upgrade)
+        set_field(self, 'screen_x', screen_x)
+        set_field(self, 'screen_y', screen_y)
+        set_field(self, 'x', x)
+        set_field(self, 'y', y)
+        set_field(self, 'note', note)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("UnitPlan is immutable")
+
+    @property
+    def has_position(self):
+        return self.screen_x is not None
+
+    @property
+    def position(self):
+        return (self.x, self.y) if self.has_position else None
+
+    @property
+    def upgrade_label(self):
+        return UPGRADE_VALUES[self.upgrade]
+
+    def __repr__(self):
+        return (f"UnitPlan({self.index}, slot={self.slot}, upgrade={self.upgrade_label}, "
+                f"position={self.position}, enabled={self.enabled})")
+
+
+class PlacementPlan:
+    """Ordered UnitPlans plus column arrays for vectorized access in the engine loop"""
+
+    def __init__(self, units, region_size, warnings=()):
+        self.units = tuple(units)
+        self.region_size = region_size
+        # Non-fatal notes for the user, e.g. enabled units placed by the planner for lack of X/Y
+        self.warnings = tuple(warnings)
+        self.indices = self._column([u.index for u in self.units], np.int16)
+        self.slots = self._column([u.slot for u in self.units], np.int8)
+        self.upgrades = self._column([u.upgrade for u in self.units], np.int8)
+        self.place_before_yes = self._column([u.place_before_yes for u in self.units], np.bool_)
+        self.auto_upgrade = self._column([u.auto_upgrade for u in self.units], np.bool_)
+        self.positions = self._column([(u.x, u.y) for u in self.units], np.int32).reshape(-1, 2)
+        self._by_index = {u.index: u for u in self.units}
+
+    @staticmethod
+    def _column(values, dtype):
+        array = np.array(values, dtype=dtype)
+        array.setflags(write=False)
+        return array
+
+    def __len__(self):
+        return len(self.units)
+
+    def __iter__(self):
+        return iter(self.units)
+
+    def unit(self, index):
+        return self._by_index.get(index)
+
+    def by_slot(self, slot):
+        return [self.units[i] for i in np.flatnonzero(self.slots == slot)]
+
+    def to_screen(self, unit, region):
+        """Absolute screen point for a unit in the current region (left, top, right, bottom)"""
+        return region[0] + unit.x, region[1] + unit.y
+
+
+def _parse_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def _parse_int(value):
+    """int for "12", "12.0" or 12; None for "" / None; raises ValueError otherwise"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return int(float(value))
+
+
+def _recorded_window(config, region):
+    """(x, y, width, height) of the window the coordinates were picked in"""
+    info = config.get("WindowInfo")
+    if isinstance(info, dict):
+        try:
+            return int(info["x"]), int(info["y"]), int(info["width"]), int(info["height"])
+        except (KeyError, TypeError, ValueError):
+            pass
+    if region:
+        return region[0], region[1], region[2] - region[0], region[3] - region[1]
+    return 0, 0, None, None
+
+
+def compile_plan(config, region=None, include_disabled=False, strict=True):
+    """Parse and validate a unit config into a PlacementPlan.
+
+    region is the current Roblox region (left, top, right, bottom); coordinates
+    picked in a window of another size are scaled to it. Disabled units are
+    left out unless include_disabled, and are never validated. With strict
+    off, invalid records are kept as far as they parse (for display only).
+    """
+    window_x, window_y, window_width, window_height = _recorded_window(config, region)
+    if region:
+        region_size = (region[2] - region[0], region[3] - region[1])
+    else:
+        region_size = (window_width, window_height)
+    scale_x = region_size[0] / window_width if window_width and region_size[0] else 1.0
+    scale_y = region_size[1] / window_height if window_height and region_size[1] else 1.0
+
+    units, errors, warnings, seen = [], [], [], set()
+    for record in config.get("Units") or []:
+        problems = []
+        try:
+            index = int(record.get("Index"))
+        except (TypeError, ValueError, AttributeError):
+            if strict:
+                errors.append(f"Unit record without a valid Index: {record!r}")
+            continue
+        name = f"Unit {index}" + (f" ({record['Note']})" if record.get("Note") else "")
+        if not 1 <= index <= UNIT_SLOTS or index in seen:
+            if strict:
+                errors.append(f"{name}: Index must be unique and 1-{UNIT_SLOTS}")
+            continue
+        seen.add(index)
+
+        enabled = _parse_bool(record.get("Enabled", False))
+        if not enabled and not include_disabled:
+            continue
+
+        try:
+            slot = _parse_int(record.get("Slot", "1"))
+            if slot is None or not 0 <= slot <= MAX_SLOT:
+                raise ValueError
+        except (TypeError, ValueError):
+            problems.append(f"Slot {record.get('Slot')!r} is not 0-{MAX_SLOT}")
+            slot = 0
+
+        upgrade_text = str(record.get("Upgrade", "0")).strip()
+        upgrade_text = 'Max' if upgrade_text.lower() == 'max' else upgrade_text
+        if upgrade_text in UPGRADE_VALUES:
+            upgrade = UPGRADE_VALUES.index(upgrade_text)
+        else:
+            problems.append(f"Upgrade {record.get('Upgrade')!r} is not one of {', '.join(UPGRADE_VALUES)}")
+            upgrade = 0
+
+        try:
+            screen_x, screen_y = _parse_int(record.get("X")), _parse_int(record.get("Y"))
+        except (TypeError, ValueError):
+            problems.append(f"X/Y {record.get('X')!r}, {record.get('Y')!r} are not numbers")
+            screen_x = screen_y = None
+        x = y = NO_POSITION
+        if screen_x is None or screen_y is None:
+            if enabled and not problems:
+                warnings.append(f"{name}: no coordinates, placed inside the placement area (use Pick to fix a spot)")
+            screen_x = screen_y = None
+        else:
+            x = round((screen_x - window_x) * scale_x)
+            y = round((screen_y - window_y) * scale_y)
+            width, height = region_size
+            if width and height and not (0 <= x < width and 0 <= y < height):
+                problems.append(f"({screen_x}, {screen_y}) is outside the Roblox window")
+
+        if problems and enabled and strict:
+            errors.extend(f"{name}: {problem}" for problem in problems)
+            continue
+        units.append(UnitPlan(index, enabled, _parse_bool(record.get("PlaceBeforeYes", False)),
+                              _parse_bool(record.get("AutoUpgrade", False)), slot, upgrade,
+                              screen_x, screen_y, x, y, str(record.get("Note") or "")))
+
+    if errors:
+        raise PlacementPlanError(errors)
+    units.sort(key=lambda unit: unit.index)
+    return PlacementPlan(units, region_size, warnings)
@@ -0,0 +1,175 @@
+"""
+Placement planner for AnimeParadoxMacro
+Spiral placement around a unit's configured point, inside the placement area.
+The spiral order for each (area, center, step) is computed once as a NumPy
+array, and an occupancy grid over the area remembers where units were placed
+and where placement failed, so known-blocked positions are never tried again.
+
+Coordinates are pixels relative to the Roblox region (same as the compiled
+placement plan), so the planner does not care where the window sits.
+"""
+import threading
+from functools import lru_cache
+import numpy as np
+from placement_plan import PlacementPlanError
+
+FREE = 0
+OCCUPIED = 1
+BLOCKED = 2
+
+DEFAULT_AREA = (0, 0, 960, 600)
+DEFAULT_STEP = 20
+
+
+def parse_area(area):
+    """(left, top, right, bottom) ints from a configured area; raises PlacementPlanError if malformed or inverted"""
+    try:
+        left, top, right, bottom = (int(v) for v in area)
+    except (TypeError, ValueError):
+        raise PlacementPlanError([f"placement_area {area!r} is not 4 numbers (left, top, right, bottom)"]) from None
+    if right <= left or bottom <= top:
+        raise PlacementPlanError([f"placement_area {area!r} is empty: right must be greater than left and bottom greater than top"])
+    return left, top, right, bottom
+
+
+@lru_cache(maxsize=64)
+def spiral_candidates(area, center, step):
+    """Grid points of area in square-spiral order around center, as a read-only (N, 2) int32 array"""
+    left, top, right, bottom = area
+    cx, cy = center
+    # Offsets reaching the farthest corner of the area from the center
+    reach_x = max(cx - left, right - cx) // step + 1
+    reach_y = max(cy - top, bottom - cy) // step + 1
+    dx, dy = np.meshgrid(np.arange(-reach_x, reach_x + 1), np.arange(-reach_y, reach_y + 1))
+    dx, dy = dx.ravel(), dy.ravel()
+    xs = cx + dx * step
+    ys = cy + dy * step
+    inside = (xs >= left) & (xs < right) & (ys >= top) & (ys < bottom)
+    dx, dy, xs, ys = dx[inside], dy[inside], xs[inside], ys[inside]
+    # Ring by ring outwards, clockwise from the right within each ring
+    ring = np.maximum(np.abs(dx), np.abs(dy))
+    angle = np.mod(np.arctan2(dy, dx), 2 * np.pi)
+    order = np.lexsort((angle, ring))
+    points = np.stack([xs[order], ys[order]], axis=1).astype(np.int32)
+    points.setflags(write=False)
+    return points
+
+
+class PlacementPlanner:
+    """Next free spiral position per unit, with an occupancy grid shared by all units"""
+
+    def __init__(self, area=DEFAULT_AREA, step=DEFAULT_STEP, footprint=1):
+        self.area = parse_area(area)
+        self.step = int(step)
+        if self.step < 1:
+            raise PlacementPlanError([f"placement_step {step!r} must be at least 1"])
+        # Cells around a placed unit (in steps) that count as taken
+        self.footprint = int(footprint)
+        left, top, right, bottom = self.area
+        self.grid = np.zeros(((bottom - top + self.step - 1) // self.step,
+                              (right - left + self.step - 1) // self.step), dtype=np.uint8)
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self.attempts = 0
+        self.failures = 0
+        self.skipped = 0
+
+    def _cell(self, x, y):
+        return (int(y) - self.area[1]) // self.step, (int(x) - self.area[0]) // self.step
+
+    def _clamp_center(self, center):
+        left, top, right, bottom = self.area
+        return (min(max(int(center[0]), left), right - 1), min(max(int(center[1]), top), bottom - 1))
+
+    def candidates(self, center):
+        return spiral_candidates(self.area, self._clamp_center(center), self.step)
+
+    def next_position(self, center):
+        """First spiral point around center whose cell is free, or None when the area is full"""
+        center = self._clamp_center(center)
+        points = spiral_candidates(self.area, center, self.step)
+        with self._lock:
+            cursor = self._cursors.get(center, 0)
+            if cursor < len(points):
+                rows = (points[cursor:, 1] - self.area[1]) // self.step
+                cols = (points[cursor:, 0] - self.area[0]) // self.step
+                free = np.flatnonzero(self.grid[rows, cols] == FREE)
+                if free.size:
+                    index = cursor + int(free[0])
+                    self.skipped += int(free[0])
+                    # Cells only stop being free until release(), so earlier points never need rechecking
+                    self._cursors[center] = index
+                    self.attempts += 1
+                    return int(points[index, 0]), int(points[index, 1])
+            self._cursors[center] = len(points)
+            return None
+
+    def mark_placed(self, position):
+        """A unit now stands at position; its footprint is taken"""
+        row, col = self._cell(*position)
+        with self._lock:
+            r0, r1 = max(0, row - self.footprint), row + self.footprint + 1
+            c0, c1 = max(0, col - self.footprint), col + self.footprint + 1
+            block = self.grid[r0:r1, c0:c1]
+            block[block == FREE] = OCCUPIED
+
+    def mark_failed(self, position):
+        """Placement at position failed; never offer it again"""
+        row, col = self._cell(*position)
+        with self._lock:
+            self.grid[row, col] = BLOCKED
+            self.failures += 1
+
+    def release(self, position):
+        """A unit at position was sold; its footprint is free again (blocked cells stay blocked)"""
+        row, col = self._cell(*position)
+        with self._lock:
+            r0, r1 = max(0, row - self.footprint), row + self.footprint + 1
+            c0, c1 = max(0, col - self.footprint), col + self.footprint + 1
+            block = self.grid[r0:r1, c0:c1]
+            block[block == OCCUPIED] = FREE
+            self._cursors.clear()
+
+    def reset(self, keep_blocked=True):
+        """Start a new match; blocked cells are a property of the map and are kept by default"""
+        with self._lock:
+            if keep_blocked:
+                self.grid[self.grid == OCCUPIED] = FREE
+            else:
+                self.grid[:] = FREE
+            self._cursors.clear()
+
+    def blocked_positions(self):
+        """Centers of blocked cells, region-relative (the last row/column can be cut off by the area edge)"""
+        left, top, right, bottom = self.area
+        rows, cols = np.nonzero(self.grid == BLOCKED)
+        xs = np.minimum(left + cols * self.step + self.step // 2, right - 1)
+        ys = np.minimum(top + rows * self.step + self.step // 2, bottom - 1)
+        return [(int(x), int(y)) for x, y in zip(xs, ys)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "failures": self.failures,
+                "skipped": self.skipped,
+                "occupied": int(np.count_nonzero(self.grid == OCCUPIED)),
+                "blocked": int(np.count_nonzero(self.grid == BLOCKED))
+            }
+
+
+_planners = {}
+_planners_lock = threading.Lock()
+
+
+def get_placement_planner(location, act, area=DEFAULT_AREA, step=DEFAULT_STEP):
+    """Planner for a map, kept for the session so blocked cells carry over between matches"""
+    key = (location, act, tuple(area), step)
+    with _planners_lock:
+        planner = _planners.get(key)
+        if planner is None:
+            planner = PlacementPlanner(area, step)
+            _planners[key] = planner
+        else:
+            planner.reset(keep_blocked=True)
+        return planner
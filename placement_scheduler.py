@@ -0,0 +1,356 @@
+"""
+Placement and upgrade scheduler for AnimeParadoxMacro
+Keeps every pending place/upgrade action of a compiled placement plan in
+priority queues instead of re-scanning the unit list each tick. Actions are
+bucketed by cost (a handful of distinct prices: one per slot and upgrade
+level), each bucket a heap ordered by class and priority, so adding or
+finishing an action is O(log n) and finding the best affordable one only
+compares the tops of the buckets money covers. Actions whose unit changed
+(placed, sold, maxed) are not removed from the heaps; they are marked dead
+and skipped when they reach the top.
+
+Order: PlaceBeforeYes placements (the only ones allowed before the match
+starts), then placements, then upgrades of units with AutoUpgrade up to their
+Upgrade level ("Max" upgrades until mark_maxed()). Per-slot limits cap how
+many units of a slot are placed at once. Without configured costs every
+action costs 0, so the order is class, then priority (the unit's Index unless
+priorities say otherwise), and money never holds an action back.
+
+Benchmark with synthetic money/wave traces against a re-scanning scheduler:
+    python placement_scheduler.py [units] [ticks]
+"""
+import sys
+import time
+import heapq
+import bisect
+import random
+import itertools
+from unit_fields import UPGRADE_MAX
+
+PLACE = 'place'
+UPGRADE = 'upgrade'
+
+CLASS_PRE_START = 0
+CLASS_PLACE = 1
+CLASS_UPGRADE = 2
+
+
+class Action:
+    """One pending place or upgrade step; level is the upgrade level it reaches"""
+    __slots__ = ('kind', 'unit', 'slot', 'level', 'cost', 'klass', 'priority', 'attempts', 'live')
+
+    def __init__(self, kind, unit, slot, level, cost, klass, priority, attempts=0):
+        self.kind = kind
+        self.unit = unit
+        self.slot = slot
+        self.level = level
+        self.cost = cost
+        self.klass = klass
+        self.priority = priority
+        self.attempts = attempts
+        self.live = True
+
+    def __repr__(self):
+        target = f" -> {self.level}" if self.kind == UPGRADE else ""
+        return f"Action({self.kind} unit {self.unit.index}{target}, slot {self.slot}, cost {self.cost})"
+
+
+def _cost_lookup(costs, default=0):
+    """callable(slot, level) from a callable, {slot: cost} or {slot: [cost per level]}"""
+    if callable(costs):
+        return costs
+    costs = {int(slot): value for slot, value in (costs or {}).items()}
+
+    def lookup(slot, level):
+        value = costs.get(slot, default)
+        if isinstance(value, (list, tuple)):
+            if not value:
+                return default
+            return value[min(level, len(value)) - 1] if level else value[0]
+        return value
+    return lookup
+
+
+class PlacementScheduler:
+    """Next best place/upgrade action for the engine, updated incrementally"""
+
+    def __init__(self, plan, place_cost=None, upgrade_cost=None, slot_limits=None, priorities=None,
+                 strict_priority=False, max_attempts=3):
+        # place_cost(slot, 0) / upgrade_cost(slot, level) in money; unknown costs are 0
+        self._place_cost = _cost_lookup(place_cost)
+        self._upgrade_cost = _cost_lookup(upgrade_cost)
+        self.slot_limits = {int(slot): int(limit) for slot, limit in (slot_limits or {}).items()}
+        # {unit index: priority}, lower first; defaults to the unit's Index (JSON keys may be strings)
+        self.priorities = {int(index): priority for index, priority in (priorities or {}).items()}
+        # Strict: never skip an unaffordable action for a cheaper one behind it
+        self.strict_priority = strict_priority
+        self.max_attempts = max_attempts
+        self._seq = itertools.count()
+        # {cost: heap of (class, priority, seq, action)} and the sorted costs that have a bucket
+        self._buckets = {}
+        self._costs = []
+        self._held = []
+        self._parked = {}
+        self._current = {}
+        self._levels = {}
+        self._placed = {}
+        self.started = False
+        self.money = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.stale_skipped = 0
+        self._units = {unit.index: unit for unit in plan if unit.enabled}
+        for unit in self._units.values():
+            self._add(self._place_action(unit))
+
+    # Action construction
+
+    def _priority(self, unit):
+        return self.priorities.get(unit.index, unit.index)
+
+    def _place_action(self, unit, attempts=0):
+        klass = CLASS_PRE_START if unit.place_before_yes else CLASS_PLACE
+        return Action(PLACE, unit, unit.slot, 0, self._place_cost(unit.slot, 0), klass,
+                      self._priority(unit), attempts)
+
+    def _upgrade_action(self, unit, attempts=0):
+        level = self._levels.get(unit.index, 0) + 1
+        if not unit.auto_upgrade or (unit.upgrade != UPGRADE_MAX and level > unit.upgrade):
+            return None
+        return Action(UPGRADE, unit, unit.slot, level, self._upgrade_cost(unit.slot, level), CLASS_UPGRADE,
+                      self._priority(unit), attempts)
+
+    # Heap bookkeeping
+
+    def _add(self, action):
+        if action is None:
+            return
+        previous = self._current.get(action.unit.index)
+        if previous is not None:
+            previous.live = False
+        self._current[action.unit.index] = action
+        if not self.started and action.klass != CLASS_PRE_START:
+            self._held.append(action)
+        else:
+            self._push(action)
+
+    def _push(self, action):
+        bucket = self._buckets.get(action.cost)
+        if bucket is None:
+            bucket = self._buckets[action.cost] = []
+            bisect.insort(self._costs, action.cost)
+        heapq.heappush(bucket, (action.klass, action.priority, next(self._seq), action))
+
+    def _remove(self, action):
+        action.live = False
+        if self._current.get(action.unit.index) is action:
+            del self._current[action.unit.index]
+
+    def _slot_full(self, slot):
+        limit = self.slot_limits.get(slot)
+        return limit is not None and self._placed.get(slot, 0) >= limit
+
+    def _bucket_top(self, cost):
+        """Live, placeable head of a cost bucket (dead and slot-capped heads are cleared), or None"""
+        bucket = self._buckets[cost]
+        while bucket:
+            action = bucket[0][3]
+            if not action.live:
+                heapq.heappop(bucket)
+                self.stale_skipped += 1
+            elif action.kind == PLACE and self._slot_full(action.slot):
+                # Comes back when a unit of this slot is sold
+                heapq.heappop(bucket)
+                self._parked.setdefault(action.slot, []).append(action)
+            else:
+                return bucket[0]
+        del self._buckets[cost]
+        self._costs.remove(cost)
+        return None
+
+    def next_action(self, money=None):
+        """Best action payable with money (default: the last known money), or None to wait"""
+        if money is not None:
+            self.money = money
+        # Strict priority looks at every bucket, so a better unaffordable action blocks cheaper ones
+        limit = len(self._costs) if self.strict_priority else bisect.bisect_right(self._costs, self.money)
+        best = None
+        for cost in self._costs[:limit]:
+            top = self._bucket_top(cost)
+            if top is not None and (best is None or top[:2] < best[:2]):
+                best = top
+        if best is None or best[3].cost > self.money:
+            return None
+        return best[3]
+
+    # Game events
+
+    def start_match(self):
+        """The match started (Yes clicked): every placement becomes eligible"""
+        self.started = True
+        held, self._held = self._held, []
+        for action in held:
+            if action.live:
+                self._push(action)
+
+    def set_money(self, money):
+        self.money = money
+
+    def complete(self, action, success=True):
+        """The engine tried action; queue what follows from it"""
+        if not action.live:
+            return
+        unit = action.unit
+        self._remove(action)
+        if success:
+            self.completed += 1
+            self.money = max(0, self.money - action.cost)
+            if action.kind == PLACE:
+                self._placed[action.slot] = self._placed.get(action.slot, 0) + 1
+                self._levels[unit.index] = 0
+            else:
+                self._levels[unit.index] = action.level
+            self._add(self._upgrade_action(unit))
+            return
+        self.failed += 1
+        if action.attempts + 1 >= self.max_attempts:
+            self.dropped += 1
+            return
+        retry = self._place_action(unit, action.attempts + 1) if action.kind == PLACE \
+            else self._upgrade_action(unit, action.attempts + 1)
+        self._add(retry)
+
+    def sell(self, unit_index):
+        """A placed unit is gone: drop its upgrades, free its slot and queue it for placement again"""
+        unit = self._units.get(unit_index)
+        if unit is None or unit_index not in self._levels:
+            return
+        del self._levels[unit_index]
+        self._placed[unit.slot] -= 1
+        for action in self._parked.pop(unit.slot, []):
+            if action.live:
+                self._push(action)
+        self._add(self._place_action(unit))
+
+    def mark_maxed(self, unit_index):
+        """The game reports a unit fully upgraded; stop upgrading it"""
+        pending = self._current.get(unit_index)
+        if pending is not None and pending.kind == UPGRADE:
+            self._remove(pending)
+
+    def pending(self):
+        return len(self._current)
+
+    def stats(self):
+        return {
+            "pending": len(self._current),
+            "queued": sum(len(bucket) for bucket in self._buckets.values()),
+            "cost_buckets": len(self._buckets),
+            "held": len(self._held),
+            "parked": sum(len(actions) for actions in self._parked.values()),
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "stale_skipped": self.stale_skipped
+        }
+
+
+def replay(scheduler, trace, succeed=lambda action: True, max_per_step=100):
+    """Drive a scheduler through (wave, money income) steps; returns the actions taken as (wave, action).
+
+    The first wave starts the match; every action the money allows is taken
+    before the next step (at most max_per_step, since free "Max" upgrades never
+    run out), with succeed(action) deciding if the game accepted it.
+    """
+    taken = []
+    money = 0
+    for wave, income in trace:
+        if not scheduler.started and wave > 0:
+            scheduler.start_match()
+        money += income
+        for _ in range(max_per_step):
+            action = scheduler.next_action(money)
+            if action is None:
+                break
+            ok = succeed(action)
+            scheduler.complete(action, ok)
+            if ok:
+                money -= action.cost
+            taken.append((wave, action))
+    return taken
+
+
+class _ScanScheduler:
+    """Baseline for the benchmark: re-scan every unit for the best affordable action each tick"""
+
+    def __init__(self, plan, place_cost, upgrade_cost):
+        self.units = [unit for unit in plan if unit.enabled]
+        self.place_cost = _cost_lookup(place_cost)
+        self.upgrade_cost = _cost_lookup(upgrade_cost)
+        self.levels = {}
+
+    def next_action(self, money):
+        best = None
+        for unit in self.units:
+            level = self.levels.get(unit.index)
+            if level is None:
+                key = (CLASS_PRE_START if unit.place_before_yes else CLASS_PLACE, unit.index,
+                       self.place_cost(unit.slot, 0))
+            elif unit.auto_upgrade and (unit.upgrade == UPGRADE_MAX or level < unit.upgrade):
+                key = (CLASS_UPGRADE, unit.index, self.upgrade_cost(unit.slot, level + 1))
+            else:
+                continue
+            if key[2] <= money and (best is None or key < best[0]):
+                best = (key, unit)
+        return best
+
+    def complete(self, best):
+        unit = best[1]
+        self.levels[unit.index] = self.levels.get(unit.index, -1) + 1
+
+
+def _synthetic_plan(count, seed=1):
+    from placement_plan import UnitPlan
+    rng = random.Random(seed)
+    return [UnitPlan(i, True, rng.random() < 0.1, rng.random() < 0.7, rng.randint(1, 6),
+                     rng.choice((1, 2, 3, 4, UPGRADE_MAX)), 0, 0, 0, 0, "")
+            for i in range(1, count + 1)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    plan = _synthetic_plan(count)
+    place_cost = {slot: 200 * slot for slot in range(1, 7)}
+    upgrade_cost = {slot: [150 * slot * level for level in range(1, 6)] for slot in range(1, 7)}
+    rng = random.Random(2)
+    # Money arrives per tick and grows with the wave, like the in-game income
+    trace = [(1 + tick // 50, rng.randint(50, 150) * (1 + tick // 50)) for tick in range(ticks)]
+
+    scheduler = PlacementScheduler(plan, place_cost, upgrade_cost)
+    started = time.perf_counter()
+    taken = replay(scheduler, trace)
+    heap_seconds = time.perf_counter() - started
+
+    baseline = _ScanScheduler(plan, place_cost, upgrade_cost)
+    money, scanned = 0, 0
+    started = time.perf_counter()
+    for wave, income in trace:
+        money += income
+        while True:
+            best = baseline.next_action(money)
+            if best is None:
+                break
+            money -= best[0][2]
+            baseline.complete(best)
+            scanned += 1
+    scan_seconds = time.perf_counter() - started
+
+    print(f"{count} units, {ticks} ticks: heap scheduler took {len(taken)} actions in {heap_seconds * 1000:.1f} ms, "
+          f"re-scan took {scanned} in {scan_seconds * 1000:.1f} ms ({scan_seconds / max(heap_seconds, 1e-9):.1f}x)")
+    print(scheduler.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Map preview cache for AnimeParadoxMacro
+Keeps downscaled thumbnails of map screenshots in an LRU cache keyed by
+(path, mtime, size) and serves them from a local HTTP server, so the UI loads
+previews by URL instead of receiving base64 images over the JS bridge.
+"""
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+PREVIEW_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+class PreviewCache:
+    """LRU cache of thumbnails plus the local server that serves them"""
+
+    def __init__(self, max_entries=16, max_size=(640, 400)):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._dir_listings = {}
+        self._lock = threading.Lock()
+        self._server_lock = threading.Lock()
+        self._server = None
+        self.hits = 0
+        self.misses = 0
+
+    def find_image(self, folder):
+        """First preview image in a folder; the listing is cached until the folder's mtime changes"""
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._dir_listings.get(folder)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        image_path = None
+        for filename in sorted(os.listdir(folder)):
+            if filename.lower().endswith(PREVIEW_EXTENSIONS):
+                image_path = os.path.join(folder, filename)
+                break
+        self._dir_listings[folder] = (mtime, image_path)
+        return image_path
+
+    def get_url(self, image_path):
+        """Make sure a thumbnail for the image is cached and return its URL"""
+        stat = os.stat(image_path)
+        key = hashlib.sha1(f"{image_path}|{stat.st_mtime_ns}|{stat.st_size}".encode('utf-8')).hexdigest()[:16]
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._entries[key] = self._make_thumbnail(image_path)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return f"http://127.0.0.1:{self._ensure_server()}/preview/{key}.jpg"
+
+    def _make_thumbnail(self, image_path):
+        from PIL import Image
+        with Image.open(image_path) as img:
+            img = img.convert('RGB')
+            img.thumbnail(self.max_size)
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=85)
+        return buffer.getvalue()
+
+    def get_bytes(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def _ensure_server(self):
+        with self._server_lock:
+            if self._server is None:
+                self._start_server()
+            return self._server.server_address[1]
+
+    def _start_server(self):
+        cache = self
+
+        class PreviewHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                name = self.path.rsplit('/', 1)[-1]
+                data = cache.get_bytes(name[:-4]) if name.endswith('.jpg') else None
+                if data is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('Content-Length', str(len(data)))
+                # Keys change whenever the source image changes, so URLs can be cached forever
+                self.send_header('Cache-Control', 'max-age=31536000, immutable')
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), PreviewHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="PreviewServer", daemon=True).start()
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
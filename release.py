@@ -62,46 +62,42 @@ def build_exe():
 def create_release_zip():
     """Create the release zip file"""
     print("\n📁 Creating release zip...")
-    import shutil
+    import time
+    from release_packager import collect_release_files, build_release_zip, print_report
     
     zip_name = 'AnimeParadoxMacro_Release'
     
-    # Remove old zip if exists
-    if os.path.exists(f'{zip_name}.zip'):
-        os.remove(f'{zip_name}.zip')
-    
-    # Create zip with required files
-    shutil.make_archive(
-        zip_name,
-        'zip',
-        root_dir='.',
-        base_dir=None
-    )
-    
-    # Actually we need to use a different approach for selective files
-    import zipfile
-    
-    # Remove the archive we just made
-    os.remove(f'{zip_name}.zip')
-    
-    with zipfile.ZipFile(f'{zip_name}.zip', 'w', zipfile.ZIP_DEFLATED) as zipf:
-        # Add exe
-        exe_path = os.path.join('dist', 'AnimeParadoxMacro.exe')
-        if os.path.exists(exe_path):
-            zipf.write(exe_path, 'AnimeParadoxMacro.exe')
-        
-        # Add folders
-        folders = ['buttons', 'Settings', 'starting image', 'unit stuff']
-        for folder in folders:
-            if os.path.exists(folder):
-                for root, dirs, files in os.walk(folder):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        zipf.write(file_path, file_path)
-    
-    print(f"✅ Created {zip_name}.zip")
+    # Sorted members with fixed timestamps: same inputs, same zip
+    started = time.perf_counter()
+    release_files = collect_release_files()
+    stats = build_release_zip(f'{zip_name}.zip', release_files)
+    print_report(stats, time.perf_counter() - started)
+    
+    # Per-file manifest so the updater only fetches what changed
+    write_release_manifest(get_current_version(), release_files)
+    
+    # Publish the digest so the updater can verify the download
+    import hashlib
+    sha256 = hashlib.sha256()
+    with open(f'{zip_name}.zip', 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    with open(f'{zip_name}.zip.sha256', 'w') as f:
+        f.write(f"{sha256.hexdigest()}  {zip_name}.zip\n")
+    
+    print(f"✅ Created {zip_name}.zip (sha256 {sha256.hexdigest()})")
     return True
 
+def write_release_manifest(version, release_files):
+    """Write the per-file manifest (path, size, sha256) published next to the zip"""
+    import json
+    from update_manifest import MANIFEST_NAME, build_manifest
+    
+    manifest = build_manifest(version, release_files)
+    with open(MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"✅ Created {MANIFEST_NAME} ({len(manifest['files'])} files)")
+
 def git_commit_and_tag(version):
     """Commit changes and create tag"""
     print(f"\n📝 Committing version {version}...")
@@ -137,6 +133,8 @@ def create_github_release(version):
     result = subprocess.run([
         'gh', 'release', 'create', f'v{version}',
         'AnimeParadoxMacro_Release.zip',
+        'AnimeParadoxMacro_Release.zip.sha256',
+        'AnimeParadoxMacro_Manifest.json',
         '--title', f'AnimeParadoxMacro v{version}',
         '--notes', f'Release v{version}\n\nDownload AnimeParadoxMacro_Release.zip and extract to install.'
     ], env=env)
@@ -0,0 +1,157 @@
+"""
+Release packaging for AnimeParadoxMacro
+Builds the release zip in one pass. Members are sorted and carry a fixed
+timestamp and permissions so the same inputs always produce the same archive,
+and media that is already compressed is stored as-is. Everything else is
+deflated on a thread pool, a bounded window of files at a time, and written
+out in order.
+"""
+import os
+import time
+import zlib
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from zip_installer import FOLDERS_TO_UPDATE
+
+EXE_NAME = 'AnimeParadoxMacro.exe'
+# Formats that are compressed already; deflating them again only costs time
+STORED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.zip', '.7z', '.gz', '.mp3', '.mp4')
+COMPRESS_LEVEL = 6
+# rw-r--r-- regular file, whatever the permissions on the build machine
+MEMBER_ATTR = (0o100644 << 16)
+
+
+def collect_release_files(root='.', exe_path=os.path.join('dist', EXE_NAME)):
+    """(archive name, local path) pairs for a release, sorted by archive name"""
+    files = []
+    if os.path.exists(exe_path):
+        files.append((EXE_NAME, exe_path))
+    for folder in FOLDERS_TO_UPDATE:
+        folder_path = os.path.join(root, folder)
+        for dirpath, dirs, names in os.walk(folder_path):
+            dirs.sort()
+            for name in names:
+                path = os.path.join(dirpath, name)
+                arcname = os.path.relpath(path, root).replace(os.sep, '/')
+                files.append((arcname, path))
+    return sorted(files)
+
+
+def _member_date_time():
+    """Fixed member timestamp: SOURCE_DATE_EPOCH if set, else the earliest DOS date"""
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        return time.gmtime(max(int(epoch), 315532800))[:6]
+    return (1980, 1, 1, 0, 0, 0)
+
+
+def _member_info(arcname, date_time):
+    """ZipInfo with everything that would vary between builds pinned"""
+    info = zipfile.ZipInfo(arcname, date_time=date_time)
+    info.create_system = 3
+    info.external_attr = MEMBER_ATTR
+    return info
+
+
+def _compress_member(path):
+    """Read and compress one file; returns (compress type, crc, size, data, seconds)"""
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        raw = f.read()
+    crc = zlib.crc32(raw)
+    compress_type, data = zipfile.ZIP_STORED, raw
+    if not path.lower().endswith(STORED_EXTENSIONS):
+        # Raw deflate stream, as zip stores it
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15)
+        deflated = compressor.compress(raw) + compressor.flush()
+        # Keep whichever is smaller, as incompressible files can grow
+        if len(deflated) < len(raw):
+            compress_type, data = zipfile.ZIP_DEFLATED, deflated
+    return compress_type, crc, len(raw), data, time.perf_counter() - started
+
+
+def _compress_ahead(pool, files, window):
+    """Yield (arcname, future) in order, with at most window files compressed but not yet written"""
+    pending = deque()
+    for arcname, path in files:
+        if len(pending) >= window:
+            yield pending.popleft()
+        pending.append((arcname, pool.submit(_compress_member, path)))
+    while pending:
+        yield pending.popleft()
+
+
+def _write_compressed(archive, info, data):
+    """ZipFile.writestr() for data already compressed as info says (compress_type, CRC and sizes set).
+
+    zipfile has no public call for precompressed data, so this does what
+    writestr() does through the same ZipFile attributes; zipfile still writes
+    the central directory, with ZIP64 records where they are needed.
+    """
+    zip64 = max(info.file_size, info.compress_size) > zipfile.ZIP64_LIMIT
+    archive.fp.seek(archive.start_dir)
+    info.header_offset = archive.fp.tell()
+    archive._writecheck(info)
+    archive._didModify = True
+    archive.fp.write(info.FileHeader(zip64))
+    archive.fp.write(data)
+    archive.filelist.append(info)
+    archive.NameToInfo[info.filename] = info
+    archive.start_dir = archive.fp.tell()
+
+
+def _folder_of(arcname):
+    return arcname.split('/', 1)[0] if '/' in arcname else '(root)'
+
+
+def build_release_zip(zip_path, files, max_workers=None):
+    """Write files ((archive name, local path) pairs) to zip_path.
+
+    Returns per-folder stats: {folder: {"files", "size", "compressed", "seconds"}}.
+    """
+    files = sorted(files)
+    date_time = _member_date_time()
+    max_workers = max_workers or min(8, (os.cpu_count() or 2))
+    stats = {}
+    temp_path = zip_path + '.tmp'
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool, zipfile.ZipFile(temp_path, 'w') as archive:
+        # Only a couple of files per worker are held in memory, not the whole release
+        for arcname, future in _compress_ahead(pool, files, max_workers * 2):
+            compress_type, crc, size, data, seconds = future.result()
+            info = _member_info(arcname, date_time)
+            info.compress_type = compress_type
+            info.CRC = crc
+            info.file_size = size
+            info.compress_size = len(data)
+            _write_compressed(archive, info, data)
+
+            folder = stats.setdefault(_folder_of(arcname), {"files": 0, "size": 0, "compressed": 0, "seconds": 0.0})
+            folder["files"] += 1
+            folder["size"] += info.file_size
+            folder["compressed"] += info.compress_size
+            folder["seconds"] += seconds
+
+    os.replace(temp_path, zip_path)
+    return stats
+
+
+def print_report(stats, elapsed=None):
+    """Per-folder size/time table for a build_release_zip() result"""
+    print(f"{'Folder':<20}{'Files':>7}{'Size':>12}{'Zipped':>12}{'Ratio':>8}{'CPU s':>8}")
+    total = {"files": 0, "size": 0, "compressed": 0, "seconds": 0.0}
+    for folder in sorted(stats):
+        entry = stats[folder]
+        for key in total:
+            total[key] += entry[key]
+        _print_row(folder, entry)
+    _print_row('Total', total)
+    if elapsed is not None:
+        print(f"Packed in {elapsed:.2f}s")
+
+
+def _print_row(label, entry):
+    ratio = entry["compressed"] / entry["size"] if entry["size"] else 1.0
+    print(f"{label:<20}{entry['files']:>7}{entry['size'] / 1024:>10.0f}KB{entry['compressed'] / 1024:>10.0f}KB"
+          f"{ratio:>8.0%}{entry['seconds']:>8.2f}")
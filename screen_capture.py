@@ -0,0 +1,195 @@
+"""
+Persistent screen capture for AnimeParadoxMacro
+Keeps one mss grabber open per captured window and fills a fixed ring of
+preallocated frame buffers, so the detection loop and the screenshot hotkey
+stop paying grabber setup and image allocation on every capture. When the
+window moves the service is retargeted in place; buffers are only
+reallocated when its size changes.
+"""
+import threading
+import time
+import numpy as np
+
+DEFAULT_RING_SIZE = 4
+
+
+class Frame:
+    """A captured frame backed by a slot of the capture ring.
+
+    The arrays are views into the ring and stay valid until the ring wraps
+    around (``ring_size`` captures later). Call ``copy()`` to keep a frame
+    for longer than that.
+    """
+    __slots__ = ('bgra', 'region', 'timestamp', 'sequence', '_gray', '_scratch', '_gray_ready')
+
+    def __init__(self, bgra, gray, scratch):
+        self.bgra = bgra
+        self.region = None
+        self.timestamp = 0.0
+        self.sequence = 0
+        self._gray = gray
+        self._scratch = scratch
+        self._gray_ready = False
+
+    @property
+    def width(self):
+        return self.bgra.shape[1]
+
+    @property
+    def height(self):
+        return self.bgra.shape[0]
+
+    def rgb(self):
+        """Zero-copy RGB view (channel order reversed via strides)"""
+        return self.bgra[..., 2::-1]
+
+    def bgr(self):
+        """Zero-copy BGR view, the layout OpenCV expects"""
+        return self.bgra[..., :3]
+
+    def gray(self):
+        """Grayscale image computed into the slot's preallocated buffer"""
+        if not self._gray_ready:
+            # Integer BT.601 weights (29/150/77 over 256) to stay in uint16
+            acc, tmp = self._scratch
+            np.multiply(self.bgra[..., 0], 29, out=acc, dtype=np.uint16)
+            np.multiply(self.bgra[..., 1], 150, out=tmp, dtype=np.uint16)
+            acc += tmp
+            np.multiply(self.bgra[..., 2], 77, out=tmp, dtype=np.uint16)
+            acc += tmp
+            np.right_shift(acc, 8, out=acc)
+            np.copyto(self._gray, acc, casting='unsafe')
+            self._gray_ready = True
+        return self._gray
+
+    def to_pil(self):
+        """Build a PIL RGB image (copies, for saving to disk)"""
+        from PIL import Image
+        return Image.frombuffer('RGB', (self.width, self.height), self.bgra, 'raw', 'BGRX', 0, 1)
+
+    def copy(self):
+        """Detach this frame from the ring"""
+        frame = Frame(self.bgra.copy(), self._gray.copy(), np.empty_like(self._scratch))
+        frame.region = self.region
+        frame.timestamp = self.timestamp
+        frame.sequence = self.sequence
+        frame._gray_ready = self._gray_ready
+        return frame
+
+
+def allocate_frames(count, width, height):
+    """Allocate ``count`` Frames sharing contiguous BGRA/gray/scratch blocks"""
+    bgra = np.empty((count, height, width, 4), dtype=np.uint8)
+    gray = np.empty((count, height, width), dtype=np.uint8)
+    scratch = np.empty((count, 2, height, width), dtype=np.uint16)
+    return [Frame(bgra[i], gray[i], scratch[i]) for i in range(count)]
+
+
+class ScreenCapture:
+    """Long-lived capture service for a single screen region"""
+
+    def __init__(self, region, ring_size=DEFAULT_RING_SIZE):
+        self.region, self.monitor = self._target(region)
+        self.ring_size = max(1, int(ring_size))
+        self._lock = threading.Lock()
+        # mss keeps per-thread device contexts, so each capturing thread gets its own grabber
+        self._local = threading.local()
+        self._grabbers = []
+        self._sequence = 0
+        self._closed = False
+
+        self._frames = allocate_frames(self.ring_size, self.monitor["width"], self.monitor["height"])
+        self._latest = None
+
+    @staticmethod
+    def _target(region):
+        left, top, right, bottom = region
+        if right <= left or bottom <= top:
+            raise ValueError(f"Invalid capture region: {region}")
+        return tuple(region), {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+    def retarget(self, region):
+        """Capture another region from now on; the ring is reused unless the size changed"""
+        region, monitor = self._target(region)
+        with self._lock:
+            if region == self.region:
+                return
+            resized = (monitor["width"], monitor["height"]) != (self.monitor["width"], self.monitor["height"])
+            self.region, self.monitor = region, monitor
+            if resized:
+                # Frames handed out earlier keep their old buffers alive until dropped
+                self._frames = allocate_frames(self.ring_size, monitor["width"], monitor["height"])
+                self._latest = None
+
+    def _grabber(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            import mss
+            sct = mss.mss()
+            self._local.sct = sct
+            self._grabbers.append(sct)
+        return sct
+
+    def grab(self):
+        """Capture the region into the next ring slot and return its Frame"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Capture service is closed")
+            shot = self._grabber().grab(self.monitor)
+            frame = self._frames[self._sequence % self.ring_size]
+            raw = np.frombuffer(shot.raw, dtype=np.uint8)
+            np.copyto(frame.bgra, raw.reshape(frame.bgra.shape))
+            self._sequence += 1
+            frame.region = self.region
+            frame.timestamp = time.perf_counter()
+            frame.sequence = self._sequence
+            frame._gray_ready = False
+            self._latest = frame
+            return frame
+
+    def latest(self):
+        """Most recently captured frame, or None"""
+        return self._latest
+
+    def close(self):
+        """Release the grabbers"""
+        with self._lock:
+            self._closed = True
+            for sct in self._grabbers:
+                try:
+                    sct.close()
+                except Exception:
+                    pass
+            self._grabbers = []
+            self._local = threading.local()
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_capture_service(region, ring_size=DEFAULT_RING_SIZE, key=None):
+    """Get the shared capture service for key (e.g. a window handle; default: the region itself).
+
+    A service that already exists for key is retargeted to region, so a
+    moving window keeps using one ring instead of leaving one behind per
+    position.
+    """
+    region = tuple(int(v) for v in region)
+    key = region if key is None else key
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = ScreenCapture(region, ring_size)
+            _services[key] = service
+    service.retarget(region)
+    return service
+
+
+def close_all_captures():
+    """Close every shared capture service (call on exit)"""
+    with _services_lock:
+        services = list(_services.values())
+        _services.clear()
+    for service in services:
+        service.close()
@@ -0,0 +1,207 @@
+"""
+Screen classifier for AnimeParadoxMacro
+Answers "which known screen is this" before any OCR runs. Each known screen
+has a signature taken from reference screenshots: a coarse color histogram
+and a grid of sampled pixels at fixed relative positions (so any window size
+works). A frame is matched against all signatures at once with NumPy; only
+when the best two candidates are too close, or nothing is close enough, does
+the classifier fall back to OCR.
+
+Reference screenshots live in their own folder, starting image/screens,
+apart from the per-location map screenshots the F4 hotkey replaces (the
+screenshot writer only prunes files, never this subfolder). A file's label
+is the folder it sits in, relative to that root (menus/story), or its own
+name for files at the top level (victory.png -> victory). Several
+screenshots with the same label all count as samples of that screen.
+"""
+import os
+import time
+import threading
+import numpy as np
+
+SCREENS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'starting image', 'screens')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+GRID_WIDTH = 48
+GRID_HEIGHT = 30
+HIST_BITS = 3  # per channel, 512 bins
+
+
+def _bgr_pixels(image):
+    """BGR(A) uint8 array for a Frame, PIL image or BGR/BGRA array"""
+    if hasattr(image, 'bgra'):
+        return image.bgra
+    if hasattr(image, 'convert'):
+        return np.asarray(image.convert('RGB'))[..., ::-1]
+    return np.asarray(image)
+
+
+def _grid_indices(height, width):
+    ys = ((np.arange(GRID_HEIGHT) + 0.5) * height / GRID_HEIGHT).astype(np.intp)
+    xs = ((np.arange(GRID_WIDTH) + 0.5) * width / GRID_WIDTH).astype(np.intp)
+    return ys, xs
+
+
+def signature(image):
+    """(histogram, sampled pixels) for an image; both float32 vectors"""
+    pixels = _bgr_pixels(image)
+    ys, xs = _grid_indices(pixels.shape[0], pixels.shape[1])
+    grid = pixels[ys[:, None], xs[None, :], :3]
+    shift = 8 - HIST_BITS
+    bins = ((grid[..., 0] >> shift).astype(np.intp) << (2 * HIST_BITS)) \
+        | ((grid[..., 1] >> shift).astype(np.intp) << HIST_BITS) \
+        | (grid[..., 2] >> shift).astype(np.intp)
+    hist = np.bincount(bins.ravel(), minlength=1 << (3 * HIST_BITS)).astype(np.float32)
+    hist /= hist.sum()
+    return hist, grid.astype(np.float32).ravel()
+
+
+class Classification:
+    """Result of classify(); label is None when the screen is unknown"""
+    __slots__ = ('label', 'distance', 'confident', 'method', 'seconds')
+
+    def __init__(self, label, distance, confident, method, seconds):
+        self.label = label
+        self.distance = distance
+        self.confident = confident
+        self.method = method
+        self.seconds = seconds
+
+    def __repr__(self):
+        return (f"Classification({self.label!r}, distance={self.distance:.1f}, confident={self.confident}, "
+                f"method={self.method}, {self.seconds * 1e6:.0f} us)")
+
+
+class ScreenClassifier:
+    """Signature cascade over known screens with an optional OCR fallback"""
+
+    def __init__(self, ocr_fallback=None, max_hist_distance=0.6, max_pixel_distance=28.0, min_gap=6.0):
+        # ocr_fallback(frame, candidate_labels) -> label or None, for ambiguous frames
+        self.ocr_fallback = ocr_fallback
+        self.max_hist_distance = max_hist_distance
+        self.max_pixel_distance = max_pixel_distance
+        self.min_gap = min_gap
+        self.labels = []
+        self._hists = np.empty((0, 1 << (3 * HIST_BITS)), dtype=np.float32)
+        self._pixels = np.empty((0, GRID_WIDTH * GRID_HEIGHT * 3), dtype=np.float32)
+        self.fallbacks = 0
+        self.classified = 0
+
+    def add(self, label, image):
+        """Add a reference sample for a screen"""
+        hist, pixels = signature(image)
+        self.labels.append(label)
+        self._hists = np.vstack([self._hists, hist])
+        self._pixels = np.vstack([self._pixels, pixels])
+
+    @classmethod
+    def from_folder(cls, folder=SCREENS_DIR, **kwargs):
+        """Classifier with one sample per screenshot under folder"""
+        from PIL import Image
+        classifier = cls(**kwargs)
+        for root, dirs, files in os.walk(folder):
+            dirs.sort()
+            for file in sorted(files):
+                if not file.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                rel_dir = os.path.relpath(root, folder)
+                label = os.path.splitext(file)[0] if rel_dir == '.' else rel_dir.replace(os.sep, '/')
+                try:
+                    with Image.open(os.path.join(root, file)) as img:
+                        classifier.add(label, img)
+                except Exception as e:
+                    print(f"Skipping reference screenshot {file}: {e}")
+        return classifier
+
+    def classify(self, frame):
+        """Label of the known screen frame shows (None if unknown)"""
+        started = time.perf_counter()
+        if not self.labels:
+            return self._fallback(frame, [], float('inf'), started)
+        hist, pixels = signature(frame)
+
+        # Stage 1: histogram L1 distance (0..2) rules out screens with different colors
+        hist_distance = np.abs(self._hists - hist).sum(axis=1)
+        candidates = np.flatnonzero(hist_distance <= self.max_hist_distance)
+        if candidates.size == 0:
+            return self._fallback(frame, [], float('inf'), started)
+
+        # Stage 2: mean absolute difference of the sampled pixels, per screen
+        pixel_distance = np.abs(self._pixels[candidates] - pixels).mean(axis=1)
+        best_per_label = {}
+        for index, distance in zip(candidates, pixel_distance):
+            label = self.labels[index]
+            if distance < best_per_label.get(label, float('inf')):
+                best_per_label[label] = float(distance)
+        ranked = sorted(best_per_label.items(), key=lambda item: item[1])
+        label, distance = ranked[0]
+        gap = ranked[1][1] - distance if len(ranked) > 1 else float('inf')
+
+        if distance <= self.max_pixel_distance and gap >= self.min_gap:
+            self.classified += 1
+            return Classification(label, distance, True, 'signature', time.perf_counter() - started)
+        return self._fallback(frame, [name for name, _ in ranked[:3]], distance, started)
+
+    def _fallback(self, frame, candidates, distance, started):
+        if self.ocr_fallback is None:
+            label = candidates[0] if candidates else None
+            return Classification(label, distance, False, 'signature', time.perf_counter() - started)
+        self.fallbacks += 1
+        label = self.ocr_fallback(frame, candidates or sorted(set(self.labels)))
+        return Classification(label, distance, label is not None, 'ocr', time.perf_counter() - started)
+
+    def stats(self):
+        return {
+            "screens": len(set(self.labels)),
+            "samples": len(self.labels),
+            "classified": self.classified,
+            "fallbacks": self.fallbacks
+        }
+
+
+def text_label_fallback(read_text):
+    """OCR fallback that reads the frame's text and picks the candidate whose name appears in it.
+
+    ``read_text(image)`` is any OCR call (e.g. an OCRCache); a label matches on
+    its last path component, so Results/victory matches a frame reading VICTORY!
+    """
+    def fallback(frame, candidates):
+        image = frame.to_pil() if hasattr(frame, 'to_pil') else frame
+        text = (read_text(image) or '').lower()
+        for label in candidates:
+            if label.rsplit('/', 1)[-1].lower() in text:
+                return label
+        return None
+    return fallback
+
+
+_classifiers = {}
+_classifiers_lock = threading.Lock()
+
+
+def _folder_fingerprint(folder):
+    fingerprint = []
+    for root, dirs, files in os.walk(folder):
+        for file in files:
+            if file.lower().endswith(IMAGE_EXTENSIONS):
+                try:
+                    stat = os.stat(os.path.join(root, file))
+                except OSError:
+                    continue
+                fingerprint.append((root, file, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(fingerprint))
+
+
+def get_screen_classifier(folder=SCREENS_DIR, **kwargs):
+    """Shared classifier for a folder, rebuilt when its screenshots change"""
+    fingerprint = _folder_fingerprint(folder)
+    with _classifiers_lock:
+        cached = _classifiers.get(folder)
+        if cached and cached[0] == fingerprint:
+            classifier = cached[1]
+        else:
+            classifier = ScreenClassifier.from_folder(folder, **kwargs)
+            _classifiers[folder] = (fingerprint, classifier)
+    if 'ocr_fallback' in kwargs:
+        classifier.ocr_fallback = kwargs['ocr_fallback']
+    return classifier
@@ -0,0 +1,119 @@
+"""
+Background screenshot writer for AnimeParadoxMacro
+Encodes and saves screenshots off the hotkey thread, skips captures identical
+to the last one written, and atomically replaces the target file.
+"""
+import os
+import queue
+import hashlib
+import tempfile
+import threading
+import numpy as np
+
+# png_fast: low-compression PNG, png: PIL default compression, raw: BGRA .npy dump (plus a png_fast copy)
+ENCODINGS = {
+    'png_fast': '.png',
+    'png': '.png',
+    'raw': '.npy',
+}
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.npy')
+
+
+class ScreenshotWriter:
+    """Single background thread draining a bounded queue of screenshot jobs"""
+
+    def __init__(self, max_pending=2, status_callback=None):
+        self.status_callback = status_callback or print
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._last_hash = {}
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="ScreenshotWriter", daemon=True)
+                self._thread.start()
+
+    def submit(self, frame, folder, name="screenshot", encoding='png_fast', message=None):
+        """Queue a frame for saving. Returns False if the writer is backed up."""
+        if encoding not in ENCODINGS:
+            encoding = 'png_fast'
+        if self._queue.full():
+            self.dropped += 1
+            return False
+        # The frame is a ring-buffer view, so detach it before the ring wraps
+        job = (frame.copy(), folder, name, encoding, message)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self._ensure_thread()
+        return True
+
+    def flush(self):
+        """Wait for all queued screenshots to be written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._write(*job)
+            except Exception as e:
+                self.status_callback(f"Screenshot error: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, frame, folder, name, encoding, message):
+        os.makedirs(folder, exist_ok=True)
+        target = os.path.join(folder, name + ENCODINGS[encoding])
+        # The picker and map previews only read images, so a raw dump keeps a fast PNG next to it
+        outputs = [(target, encoding)]
+        if encoding == 'raw':
+            outputs.append((os.path.join(folder, name + ENCODINGS['png_fast']), 'png_fast'))
+
+        digest = hashlib.blake2b(frame.bgra.data, digest_size=16).hexdigest()
+        if self._last_hash.get(target) == digest and all(os.path.exists(path) for path, _ in outputs):
+            self.status_callback(f"Screenshot unchanged, kept {target}")
+            return
+
+        for path, path_encoding in outputs:
+            self._save(frame, folder, name, path, path_encoding)
+        self._last_hash[target] = digest
+
+        # Only one screenshot per folder is kept; subfolders are left alone
+        written = {path for path, _ in outputs}
+        for filename in os.listdir(folder):
+            path = os.path.join(folder, filename)
+            if path not in written and filename.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        if message:
+            self.status_callback(message)
+        print(f"Screenshot saved: {target}")
+
+    @staticmethod
+    def _save(frame, folder, name, target, encoding):
+        """Encode frame to a temp file in folder and atomically move it to target"""
+        fd, temp_path = tempfile.mkstemp(prefix=f".{name}-", suffix='.tmp', dir=folder)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if encoding == 'raw':
+                    np.save(f, frame.bgra)
+                else:
+                    img = frame.to_pil()
+                    img.save(f, format='PNG', compress_level=1 if encoding == 'png_fast' else 6)
+            os.replace(temp_path, target)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
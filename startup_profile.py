@@ -0,0 +1,180 @@
+"""
+Startup profiling for AnimeParadoxMacro
+Times imports and initialization phases from the moment main_webview starts
+loading until the UI is ready, and provides lazy module proxies so heavy
+dependencies are imported (and timed) on first use instead of at startup.
+
+Budget check for CI, in a fresh interpreter each run (also run by
+tests/test_startup_budget.py on Windows):
+    python startup_profile.py --budget 1.5 --runs 3
+"""
+import sys
+import time
+import json
+import threading
+import importlib
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """Timeline of startup phases and module imports"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready_at = None
+        self._events = []
+        self._lazy = []
+        self._lock = threading.Lock()
+
+    def _record(self, kind, name, start, end):
+        with self._lock:
+            self._events.append({
+                "kind": kind,
+                "name": name,
+                "start_ms": round((start - self.started) * 1000, 2),
+                "ms": round((end - start) * 1000, 2),
+                "thread": threading.current_thread().name
+            })
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of startup work"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record('phase', name, start, time.perf_counter())
+
+    def import_module(self, name):
+        """Import a module, recording how long it took if it was not loaded yet"""
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        self._record('import', name, start, time.perf_counter())
+        return module
+
+    def lazy(self, name):
+        """Proxy that imports ``name`` on first attribute access"""
+        self._lazy.append(name)
+        return LazyModule(name, self)
+
+    def mark(self, name):
+        """Record a point in time"""
+        now = time.perf_counter()
+        self._record('mark', name, now, now)
+        return now
+
+    def mark_ready(self, name='ui ready'):
+        """Record the point the app became usable (first call wins)"""
+        now = self.mark(name)
+        if self.ready_at is None:
+            self.ready_at = now
+
+    def report(self):
+        """Timing breakdown as plain data (also served to the UI)"""
+        with self._lock:
+            events = list(self._events)
+        return {
+            "ready_ms": round((self.ready_at - self.started) * 1000, 2) if self.ready_at else None,
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "events": events,
+            "deferred": [name for name in self._lazy if name not in sys.modules]
+        }
+
+    def format_report(self):
+        report = self.report()
+        lines = ["Startup profile:"]
+        for event in sorted(report["events"], key=lambda e: e["start_ms"]):
+            lines.append(f"  {event['start_ms']:>9.1f} ms  {event['kind']:<7}{event['name']:<32}{event['ms']:>9.1f} ms  [{event['thread']}]")
+        if report["ready_ms"] is not None:
+            lines.append(f"  Ready after {report['ready_ms']:.1f} ms")
+        if report["deferred"]:
+            lines.append(f"  Not loaded yet: {', '.join(report['deferred'])}")
+        return "\n".join(lines)
+
+
+class LazyModule:
+    """Stands in for a module until one of its attributes is used"""
+
+    def __init__(self, name, profile):
+        self._name = name
+        self._profile = profile
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = self._profile.import_module(self._name)
+            self._module = module
+        return getattr(module, attr)
+
+
+# Shared by the whole process; created when main_webview starts importing
+PROFILE = StartupProfile()
+
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main_webview
+imported = time.perf_counter()
+api = main_webview.MacroAPI()
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "init_ms": (done - imported) * 1000,
+                  "loaded": sorted(name for name in ("webview", "keyboard", "macro_engine", "updater", "urllib.request", "PIL", "mss", "numpy") if name in sys.modules)}))
+"""
+
+
+class ProbeError(RuntimeError):
+    """The cold-start probe could not import main_webview or build MacroAPI; stderr is the child's output"""
+
+    def __init__(self, returncode, stderr):
+        self.returncode = returncode
+        self.stderr = stderr
+        lines = stderr.strip().splitlines()
+        super().__init__(f"startup probe exited with {returncode}: {lines[-1] if lines else 'no output'}")
+
+
+def measure_cold_start(runs=3):
+    """Import main_webview and build MacroAPI in fresh interpreters; returns one result per run.
+
+    Raises ProbeError when the probe fails (no Windows APIs, missing modules).
+    """
+    import os
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for _ in range(runs):
+        process = subprocess.run([sys.executable, '-c', _PROBE], cwd=here, capture_output=True, text=True)
+        if process.returncode != 0:
+            raise ProbeError(process.returncode, process.stderr)
+        results.append(json.loads(process.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Check the cold-start cost of main_webview against a budget")
+    parser.add_argument('--budget', type=float, default=1.5, help="Allowed seconds for import + MacroAPI()")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        results = measure_cold_start(args.runs)
+    except ProbeError as e:
+        print(f"ERROR: {e}")
+        print(e.stderr.rstrip(), file=sys.stderr)
+        sys.exit(2)
+    for result in results:
+        print(f"import {result['import_ms']:.0f} ms, init {result['init_ms']:.0f} ms, eagerly loaded: {', '.join(result['loaded']) or 'none'}")
+    best = min(result['import_ms'] + result['init_ms'] for result in results) / 1000
+    if best > args.budget:
+        print(f"FAIL: cold start {best:.2f}s exceeds budget {args.budget:.2f}s")
+        sys.exit(1)
+    print(f"OK: cold start {best:.2f}s within budget {args.budget:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Status bus for AnimeParadoxMacro
+Collects structured status events from the engine, updater and API, coalesces
+bursts, caps memory, and pushes batches to the UI with evaluate_js at a bounded
+rate instead of the UI polling the bridge.
+"""
+import json
+import time
+import threading
+from collections import deque
+
+# Event levels double as the CSS classes used by addStatus() in ui.html
+LEVELS = ('', 'info', 'success', 'warning', 'error')
+
+
+class StatusBus:
+    """Bounded, coalescing queue of status events with an optional UI pusher"""
+
+    def __init__(self, max_events=500, max_fps=20):
+        self.max_events = max_events
+        self.min_interval = 1.0 / max_fps
+        self._events = deque()
+        self._keyed = {}
+        self._cond = threading.Condition()
+        self._window = None
+        self._thread = None
+        self._closed = False
+        self.published = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def publish(self, message, type='log', level='', key=None, data=None):
+        """Queue an event.
+
+        Events with the same ``key`` replace the pending one (progress updates);
+        an event identical to the last pending one just bumps its ``count``.
+        """
+        with self._cond:
+            self.published += 1
+            if key is not None and key in self._keyed:
+                event = self._keyed[key]
+                event["message"] = message
+                event["level"] = level
+                event["data"] = data
+                event["ts"] = time.time()
+                self.coalesced += 1
+                return
+            if self._events:
+                last = self._events[-1]
+                if last["message"] == message and last["type"] == type and last["key"] is None and key is None:
+                    last["count"] += 1
+                    last["ts"] = time.time()
+                    self.coalesced += 1
+                    return
+
+            event = {
+                "type": type,
+                "level": level if level in LEVELS else '',
+                "message": message,
+                "ts": time.time(),
+                "count": 1,
+                "key": key,
+                "data": data
+            }
+            self._events.append(event)
+            if key is not None:
+                self._keyed[key] = event
+            while len(self._events) > self.max_events:
+                old = self._events.popleft()
+                if old["key"] is not None:
+                    self._keyed.pop(old["key"], None)
+                self.dropped += 1
+            self._cond.notify()
+
+    def drain(self):
+        """Remove and return all pending events"""
+        with self._cond:
+            events = list(self._events)
+            self._events.clear()
+            self._keyed.clear()
+        return events
+
+    def stats(self):
+        return {
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "pending": len(self._events)
+        }
+
+    def attach(self, window):
+        """Start pushing batches to a pywebview window (idempotent)"""
+        with self._cond:
+            self._window = window
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._push_loop, name="StatusBus", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def _push_loop(self):
+        last_push = 0.0
+        while True:
+            with self._cond:
+                while not self._closed and not self._events:
+                    self._cond.wait()
+                if self._closed:
+                    return
+
+            # Let bursts accumulate so at most max_fps batches reach the UI
+            wait = self.min_interval - (time.monotonic() - last_push)
+            if wait > 0:
+                time.sleep(wait)
+
+            events = self.drain()
+            if not events:
+                continue
+            try:
+                self._window.evaluate_js(f"window.onStatusBatch && window.onStatusBatch({json.dumps(events)})")
+                self.batches += 1
+            except Exception as e:
+                print(f"Error pushing status updates: {e}")
+            last_push = time.monotonic()
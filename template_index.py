@@ -0,0 +1,292 @@
+"""
+Preloaded template index for AnimeParadoxMacro
+Decodes every image in the buttons folder once, keeps grayscale copies at a
+few scales packed into one contiguous array per scale, and matches batches of
+templates against a frame region (normalized cross-correlation). The scale
+nearest to the frame's size relative to the 960x600 reference is used, so
+matching does not depend on the Roblox window having exactly that size.
+
+OpenCV is used for matching when it is installed; otherwise an FFT-based
+NumPy implementation computes the same TM_CCOEFF_NORMED scores.
+"""
+import os
+import sys
+import time
+import threading
+import numpy as np
+
+BUTTONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'buttons')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+# Templates are authored against the embedded game size (see window_geometry)
+REFERENCE_WIDTH = 960
+REFERENCE_HEIGHT = 600
+DEFAULT_SCALES = (0.75, 0.875, 1.0, 1.25, 1.5)
+DEFAULT_THRESHOLD = 0.8
+
+
+def to_gray(image):
+    """uint8 grayscale from a Frame, a gray array or a BGR/BGRA array"""
+    if hasattr(image, 'gray'):
+        return image.gray()
+    image = np.asarray(image)
+    if image.ndim == 2:
+        return image
+    # Same integer BT.601 weights as Frame.gray()
+    acc = image[..., 0].astype(np.uint16) * 29
+    acc += image[..., 1].astype(np.uint16) * 150
+    acc += image[..., 2].astype(np.uint16) * 77
+    return (acc >> 8).astype(np.uint8)
+
+
+class Match:
+    """Best location of one template, in frame pixels"""
+    __slots__ = ('name', 'x', 'y', 'width', 'height', 'score', 'scale')
+
+    def __init__(self, name, x, y, width, height, score, scale):
+        self.name = name
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.score = score
+        self.scale = scale
+
+    @property
+    def center(self):
+        return (self.x + self.width // 2, self.y + self.height // 2)
+
+    def __repr__(self):
+        return f"Match({self.name!r}, x={self.x}, y={self.y}, score={self.score:.3f}, scale={self.scale})"
+
+
+class _ScaleBank:
+    """All templates at one scale: one flat uint8 buffer plus per-template views"""
+
+    def __init__(self, scale, grays):
+        self.scale = scale
+        sizes = [g.size for g in grays]
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)))
+        self.pixels = np.empty(int(self.offsets[-1]), dtype=np.uint8)
+        self.shapes = []
+        self.views = []
+        self.zero_mean = []
+        self.norms = np.zeros(len(grays), dtype=np.float64)
+        for i, gray in enumerate(grays):
+            view = self.pixels[self.offsets[i]:self.offsets[i + 1]].reshape(gray.shape)
+            view[...] = gray
+            self.shapes.append(gray.shape)
+            self.views.append(view)
+            centered = view.astype(np.float64)
+            centered -= centered.mean()
+            self.zero_mean.append(centered)
+            self.norms[i] = np.sqrt(np.square(centered).sum())
+
+
+class TemplateIndex:
+    """Every template in a folder, decoded once, matchable in batches"""
+
+    def __init__(self, folder=BUTTONS_DIR, scales=DEFAULT_SCALES, use_cv2=None):
+        self.folder = folder
+        self.scales = tuple(sorted(scales))
+        self.names = []
+        self._positions = {}
+        self._banks = {}
+        self._fft_cache = {}
+        self._lock = threading.Lock()
+        self._cv2 = self._load_cv2() if use_cv2 is not False else None
+        self.load_seconds = 0.0
+        self._load()
+
+    @staticmethod
+    def _load_cv2():
+        try:
+            import cv2
+            return cv2
+        except ImportError:
+            return None
+
+    def _load(self):
+        from PIL import Image
+        started = time.perf_counter()
+        paths = []
+        for root, dirs, files in os.walk(self.folder):
+            dirs.sort()
+            for file in sorted(files):
+                if file.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.join(root, file))
+
+        base = []
+        for path in paths:
+            name = os.path.splitext(os.path.relpath(path, self.folder))[0].replace(os.sep, '/')
+            try:
+                with Image.open(path) as img:
+                    rgb = np.asarray(img.convert('RGB'))
+            except Exception as e:
+                print(f"Skipping template {path}: {e}")
+                continue
+            self._positions[name] = len(self.names)
+            self.names.append(name)
+            base.append(to_gray(rgb[..., ::-1]))
+
+        for scale in self.scales:
+            grays = []
+            for gray in base:
+                if scale == 1.0:
+                    grays.append(gray)
+                    continue
+                height, width = gray.shape
+                size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                resample = Image.LANCZOS if scale < 1.0 else Image.BILINEAR
+                grays.append(np.asarray(Image.fromarray(gray).resize(size, resample)))
+            self._banks[scale] = _ScaleBank(scale, grays)
+        self.load_seconds = time.perf_counter() - started
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def __len__(self):
+        return len(self.names)
+
+    def scale_for(self, frame_width):
+        """Precomputed scale closest to a frame's size relative to the reference"""
+        wanted = frame_width / REFERENCE_WIDTH
+        return min(self.scales, key=lambda scale: abs(scale - wanted))
+
+    def template(self, name, scale=1.0):
+        """Grayscale template (a view into the packed array)"""
+        return self._banks[scale].views[self._positions[name]]
+
+    def find(self, frame, names=None, roi=None, threshold=DEFAULT_THRESHOLD, scale=None):
+        """Best match of each named template inside roi (left, top, right, bottom) of frame.
+
+        Returns {name: Match or None}; None when the best score is below threshold
+        or the template does not fit in the region. Coordinates are frame pixels.
+        """
+        gray = to_gray(frame)
+        if scale is None:
+            scale = self.scale_for(gray.shape[1])
+        bank = self._banks[scale]
+        left, top = 0, 0
+        if roi is not None:
+            left, top, right, bottom = (int(v) for v in roi)
+            left, top = max(0, left), max(0, top)
+            gray = gray[top:bottom, left:right]
+        names = self.names if names is None else names
+
+        results = {}
+        if self._cv2 is not None:
+            scores = self._scores_cv2(gray, bank, names)
+        else:
+            scores = self._scores_numpy(gray, bank, names)
+        for name in names:
+            found = scores.get(name)
+            if found is None or found[0] < threshold:
+                results[name] = None
+                continue
+            score, x, y = found
+            height, width = bank.shapes[self._positions[name]]
+            results[name] = Match(name, left + x, top + y, width, height, score, scale)
+        return results
+
+    def find_one(self, frame, name, roi=None, threshold=DEFAULT_THRESHOLD, scale=None):
+        return self.find(frame, [name], roi, threshold, scale)[name]
+
+    def _scores_cv2(self, gray, bank, names):
+        cv2 = self._cv2
+        scores = {}
+        gray = np.ascontiguousarray(gray)
+        for name in names:
+            view = bank.views[self._positions[name]]
+            if view.shape[0] > gray.shape[0] or view.shape[1] > gray.shape[1]:
+                continue
+            result = cv2.matchTemplate(gray, view, cv2.TM_CCOEFF_NORMED)
+            _, best, _, location = cv2.minMaxLoc(result)
+            scores[name] = (float(best), location[0], location[1])
+        return scores
+
+    def _template_fft(self, bank, position, shape):
+        """Conjugate spectrum of a zero-mean template padded to the region size, cached"""
+        key = (bank.scale, position, shape)
+        spectrum = self._fft_cache.get(key)
+        if spectrum is None:
+            spectrum = np.conj(np.fft.rfft2(bank.zero_mean[position], s=shape))
+            with self._lock:
+                # Regions are mostly fixed ROIs, so a small cache covers the hot loop
+                if len(self._fft_cache) > 256:
+                    self._fft_cache.clear()
+                self._fft_cache[key] = spectrum
+        return spectrum
+
+    def _scores_numpy(self, gray, bank, names):
+        """TM_CCOEFF_NORMED for several templates sharing one region FFT and integral images"""
+        height, width = gray.shape
+        image = gray.astype(np.float64)
+        image_fft = None
+        # Integral images give every window's sum and sum of squares in O(1)
+        integral = np.zeros((height + 1, width + 1))
+        integral[1:, 1:] = image.cumsum(0).cumsum(1)
+        integral_sq = np.zeros((height + 1, width + 1))
+        integral_sq[1:, 1:] = np.square(image).cumsum(0).cumsum(1)
+
+        scores = {}
+        for name in names:
+            position = self._positions[name]
+            t_height, t_width = bank.shapes[position]
+            norm = bank.norms[position]
+            if t_height > height or t_width > width or norm == 0:
+                continue
+            if image_fft is None:
+                image_fft = np.fft.rfft2(image)
+            # Circular correlation has no wrap-around inside the valid window range
+            correlation = np.fft.irfft2(image_fft * self._template_fft(bank, position, (height, width)), s=(height, width))
+            correlation = correlation[:height - t_height + 1, :width - t_width + 1]
+
+            window_sum = (integral[t_height:, t_width:] - integral[:-t_height, t_width:]
+                          - integral[t_height:, :-t_width] + integral[:-t_height, :-t_width])
+            window_sq = (integral_sq[t_height:, t_width:] - integral_sq[:-t_height, t_width:]
+                         - integral_sq[t_height:, :-t_width] + integral_sq[:-t_height, :-t_width])
+            variance = window_sq - np.square(window_sum) / (t_height * t_width)
+            denominator = np.sqrt(np.maximum(variance, 0)) * norm
+            score = np.divide(correlation, denominator, out=np.zeros_like(correlation), where=denominator > 1e-6)
+
+            index = int(np.argmax(score))
+            y, x = divmod(index, score.shape[1])
+            scores[name] = (float(min(score[y, x], 1.0)), x, y)
+        return scores
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_template_index(folder=BUTTONS_DIR):
+    """Shared index for a folder, built on first use"""
+    with _indexes_lock:
+        index = _indexes.get(folder)
+        if index is None:
+            index = TemplateIndex(folder)
+            _indexes[folder] = index
+        return index
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else BUTTONS_DIR
+    index = TemplateIndex(folder)
+    print(f"Loaded {len(index)} templates x {len(index.scales)} scales in {index.load_seconds * 1000:.1f} ms "
+          f"({'OpenCV' if index._cv2 else 'NumPy'} matching)")
+    if not index.names:
+        return
+    # Paste every template into a synthetic frame and time a batch lookup
+    frame = np.random.default_rng(0).integers(0, 256, (REFERENCE_HEIGHT, REFERENCE_WIDTH), dtype=np.uint8)
+    name = index.names[0]
+    template = index.template(name)
+    frame[100:100 + template.shape[0], 200:200 + template.shape[1]] = template
+    started = time.perf_counter()
+    results = index.find(frame)
+    elapsed = time.perf_counter() - started
+    print(f"Batch find of {len(results)} templates: {elapsed * 1000:.1f} ms; {name} -> {results[name]}")
+
+
+if __name__ == "__main__":
+    main()
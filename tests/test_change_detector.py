@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from change_detector import ChangeDetector
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+MONEY_BOX = (780, 10, 940, 60)
+
+
+def hud_frame(text, size=None):
+    image = Image.new('L', (960, 600), 30)
+    font = ImageFont.load_default() if size is None else ImageFont.load_default(size)
+    ImageDraw.Draw(image).text((800, 20), text, fill=230, font=font)
+    return np.asarray(image)
+
+
+@pytest.mark.parametrize("size", [None, 14, 20])
+@pytest.mark.parametrize("before,after", [("1500", "1600"), ("1500", "1700"), ("12", "17")])
+def test_single_digit_change_marks_region(size, before, after):
+    detector = ChangeDetector({'money': MONEY_BOX})
+    detector.update(hud_frame(before, size))
+    assert detector.update(hud_frame(after, size)) == ['money']
+
+
+def test_unchanged_counter_stays_clean():
+    detector = ChangeDetector({'money': MONEY_BOX})
+    detector.update(hud_frame("1500"))
+    assert detector.consume('money')
+    assert detector.update(hud_frame("1500")) == []
+    assert not detector.consume('money')
+
+
+def test_whole_frame_block_means_cover_every_pixel():
+    frame = np.random.default_rng(0).integers(0, 256, (600, 960), dtype=np.uint8)
+    detector = ChangeDetector()
+    sample = detector._sample(frame, None)
+    assert np.allclose(sample, frame.reshape(75, 8, 120, 8).mean(axis=(1, 3)))
+    odd = frame[:597, :955]
+    assert detector._sample(odd, None).shape == (75, 120)
@@ -0,0 +1,167 @@
+import hashlib
+import io
+import os
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import downloader
+from downloader import DownloadError, RangeNotSupported, RemoteFile, StreamingDownloader, part_path_for
+
+
+class RangeServer:
+    """Local HTTP server for one file, with Range, If-Range and ETag support that tests can switch off"""
+
+    def __init__(self):
+        self.data = b''
+        self.etag = '"v1"'
+        self.ranges = True
+        # Close the connection after this many body bytes (once), to interrupt a download
+        self.cut_after = None
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                data, start = server.data, 0
+                status = 200
+                range_header = self.headers.get('Range')
+                if_range = self.headers.get('If-Range')
+                if server.ranges and range_header and (if_range is None or if_range == server.etag):
+                    first, _, last = range_header[len('bytes='):].partition('-')
+                    start = int(first)
+                    end = min(int(last), len(data) - 1) if last else len(data) - 1
+                    if start >= len(data):
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{len(data)}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    status = 206
+                    data = data[start:end + 1]
+                self.send_response(status)
+                if status == 206:
+                    self.send_header('Content-Range', f'bytes {start}-{start + len(data) - 1}/{len(server.data)}')
+                self.send_header('Content-Length', str(len(data)))
+                self.send_header('ETag', server.etag)
+                self.end_headers()
+                if server.cut_after is not None:
+                    data, server.cut_after = data[:server.cut_after], None
+                    self.close_connection = True
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/release.zip"
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = RangeServer()
+    server.data = os.urandom(700 * 1024)
+    yield server
+    server.close()
+
+
+@pytest.fixture(autouse=True)
+def no_retry_sleep(monkeypatch):
+    monkeypatch.setattr(downloader.time, 'sleep', lambda seconds: None)
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def interrupted_download(server, dest, digest):
+    server.cut_after = 300 * 1024
+    with pytest.raises(DownloadError):
+        StreamingDownloader(max_retries=0).download(server.url, dest, digest)
+    part = part_path_for(server.url, dest, digest)
+    assert 0 < os.path.getsize(part) < len(server.data)
+    return part
+
+
+def test_resume_sends_range_and_if_range(server, tmp_path):
+    dest = str(tmp_path / "release.zip")
+    digest = sha256(server.data)
+    part = interrupted_download(server, dest, digest)
+    offset = os.path.getsize(part)
+
+    assert StreamingDownloader(max_retries=0).download(server.url, dest, digest) == digest
+    assert server.requests[-1]['Range'] == f'bytes={offset}-'
+    assert server.requests[-1]['If-Range'] == server.etag
+    with open(dest, 'rb') as f:
+        assert f.read() == server.data
+    assert not os.path.exists(part) and not os.path.exists(part + '.json')
+
+
+def test_changed_file_restarts_from_zero(server, tmp_path):
+    dest = str(tmp_path / "release.zip")
+    part = interrupted_download(server, dest, None)
+    # Same URL, new content: If-Range no longer matches, so the server answers 200 with the whole file
+    server.data, server.etag = os.urandom(500 * 1024), '"v2"'
+
+    assert StreamingDownloader(max_retries=0).download(server.url, dest) == sha256(server.data)
+    assert server.requests[-1]['If-Range'] == '"v1"'
+    with open(dest, 'rb') as f:
+        assert f.read() == server.data
+    assert not os.path.exists(part)
+
+
+def test_unsatisfiable_range_discards_the_partial(server, tmp_path):
+    dest = str(tmp_path / "release.zip")
+    digest = sha256(server.data)
+    part = interrupted_download(server, dest, digest)
+    # The partial is longer than the file now, with the validator unchanged: the server answers 416
+    with open(part, 'ab') as f:
+        f.write(b'\0' * len(server.data))
+
+    assert StreamingDownloader(max_retries=1).download(server.url, dest, digest) == digest
+    assert [request.get('Range') is not None for request in server.requests[-2:]] == [True, False]
+    with open(dest, 'rb') as f:
+        assert f.read() == server.data
+
+
+def test_checksum_mismatch_removes_the_partial(server, tmp_path):
+    dest = str(tmp_path / "release.zip")
+    wrong = sha256(b'another release')
+    with pytest.raises(DownloadError, match="Checksum mismatch"):
+        StreamingDownloader(max_retries=0).download(server.url, dest, wrong)
+    part = part_path_for(server.url, dest, wrong)
+    assert not os.path.exists(part) and not os.path.exists(part + '.json') and not os.path.exists(dest)
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_remote_file_reads_one_member_with_ranges(server):
+    members = {f"buttons/{i}.png": os.urandom(200 * 1024) for i in range(8)}
+    server.data = make_zip(members)
+    remote = RemoteFile(server.url, block_size=64 * 1024, readahead=1)
+    with zipfile.ZipFile(remote) as archive:
+        assert archive.read("buttons/3.png") == members["buttons/3.png"]
+    assert remote.bytes_fetched < len(server.data) // 2
+    assert all('Range' in request for request in server.requests)
+
+
+def test_remote_file_without_range_support_raises_for_the_fallback(server):
+    server.data = make_zip({"a.txt": b"a"})
+    server.ranges = False
+    with pytest.raises(RangeNotSupported):
+        RemoteFile(server.url)
@@ -0,0 +1,46 @@
+import sys
+import types
+
+import pytest
+
+from ocr_pool import OCRPool, _TesserocrRecognizer, parse_tesseract_config
+
+
+def test_parse_tesseract_config():
+    assert parse_tesseract_config('--oem 1 --psm 7 -l eng -c tessedit_char_whitelist=0123456789') == \
+        ('eng', 1, 7, {'tessedit_char_whitelist': '0123456789'})
+
+
+class _FakeAPI:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.psm = None
+        self.variables = {}
+
+    def SetPageSegMode(self, psm):
+        self.psm = psm
+
+    def SetVariable(self, name, value):
+        self.variables[name] = value
+
+
+def test_tesserocr_recognizer_passes_int_modes(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'tesserocr', types.SimpleNamespace(PyTessBaseAPI=_FakeAPI))
+    recognizer = _TesserocrRecognizer('--oem 1 --psm 7 -c a=b', 'eng', None)
+    assert recognizer.api.kwargs == {'lang': 'eng', 'oem': 1}
+    assert recognizer.api.psm == 7
+    assert recognizer.api.variables == {'a': 'b'}
+
+
+def test_tesserocr_backend_reads_with_psm_and_oem():
+    pytest.importorskip('tesserocr')
+    pytest.importorskip('PIL')
+    from PIL import Image, ImageDraw
+    image = Image.new('L', (240, 48), 255)
+    ImageDraw.Draw(image).text((10, 16), '1500', fill=0)
+    pool = OCRPool(workers=1, backend='tesserocr')
+    try:
+        text = pool.image_to_string(image.resize((480, 96)), '--oem 1 --psm 7')
+    finally:
+        pool.close()
+    assert isinstance(text, str)
@@ -0,0 +1,66 @@
+from placement_plan import UnitPlan
+from placement_scheduler import PLACE, UPGRADE, PlacementScheduler, replay
+
+
+def unit(index, slot=1, place_before_yes=False, auto_upgrade=False, upgrade=0):
+    return UnitPlan(index, True, place_before_yes, auto_upgrade, slot, upgrade, None, None, -1, -1, "")
+
+
+def placed(taken):
+    return [(wave, action.unit.index) for wave, action in taken if action.kind == PLACE]
+
+
+def test_place_before_yes_units_are_held_until_the_match_starts():
+    scheduler = PlacementScheduler([unit(1), unit(2, place_before_yes=True)], place_cost={1: 100})
+    taken = replay(scheduler, [(0, 1000), (0, 0), (1, 0)])
+    assert placed(taken) == [(0, 2), (1, 1)]
+
+
+def test_upgrades_follow_placement_up_to_the_upgrade_level():
+    scheduler = PlacementScheduler([unit(1, auto_upgrade=True, upgrade=2)], place_cost={1: 100},
+                                   upgrade_cost={1: [50, 80]})
+    taken = replay(scheduler, [(1, 1000)])
+    assert [(action.kind, action.level) for _, action in taken] == [(PLACE, 0), (UPGRADE, 1), (UPGRADE, 2)]
+    assert scheduler.pending() == 0
+
+
+def test_slot_limit_parks_placements_until_a_unit_is_sold():
+    scheduler = PlacementScheduler([unit(1), unit(2)], place_cost={1: 100}, slot_limits={"1": 1}, max_attempts=1)
+    taken = replay(scheduler, [(1, 1000)])
+    assert placed(taken) == [(1, 1)]
+    assert scheduler.stats()["parked"] == 1
+    assert scheduler.next_action(1000) is None
+
+    scheduler.sell(1)
+    assert scheduler.stats()["parked"] == 0
+    # The sold unit is queued again and goes first; once it is dropped the unparked unit 2 is next
+    again = scheduler.next_action(1000)
+    assert again.unit.index == 1
+    scheduler.complete(again, success=False)
+    assert scheduler.next_action(1000).unit.index == 2
+
+
+def test_strict_priority_blocks_cheaper_actions():
+    plan = [unit(1, slot=2), unit(2, slot=1)]
+    costs = {1: 100, 2: 500}
+    relaxed = PlacementScheduler(plan, place_cost=costs)
+    strict = PlacementScheduler(plan, place_cost=costs, strict_priority=True)
+    for scheduler in (relaxed, strict):
+        scheduler.start_match()
+    assert relaxed.next_action(200).unit.index == 2
+    assert strict.next_action(200) is None
+    assert strict.next_action(500).unit.index == 1
+
+
+def test_failed_actions_are_retried_then_dropped():
+    scheduler = PlacementScheduler([unit(1)], place_cost={1: 100}, max_attempts=3)
+    taken = replay(scheduler, [(1, 1000)], succeed=lambda action: False)
+    assert [action.attempts for _, action in taken] == [0, 1, 2]
+    stats = scheduler.stats()
+    assert (stats["failed"], stats["dropped"], stats["pending"]) == (3, 1, 0)
+
+
+def test_priorities_from_json_config_use_string_keys():
+    scheduler = PlacementScheduler([unit(1), unit(2), unit(3)], priorities={"3": 0, "1": 9})
+    taken = replay(scheduler, [(1, 0)])
+    assert [index for _, index in placed(taken)] == [3, 2, 1]
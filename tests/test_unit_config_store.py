@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+unit_config_store = pytest.importorskip("unit_config_store")
+UnitConfigRepository = unit_config_store.UnitConfigRepository
+
+
+def write_act(root, location, act, text):
+    folder = os.path.join(root, location)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{act}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+def test_missing_act_is_created_from_template(tmp_path):
+    repo = UnitConfigRepository(str(tmp_path), status_callback=lambda message: None)
+    config = repo.get("Leaf Village", "Act 1")
+    assert len(config["Units"]) == unit_config_store.UNIT_SLOTS
+    repo.flush()
+    assert os.path.exists(repo.path_for("Leaf Village", "Act 1"))
+
+
+def test_corrupt_act_is_reported_and_never_overwritten(tmp_path):
+    path = write_act(str(tmp_path), "Leaf Village", "Act 1", '{"Units": [')
+    messages = []
+    repo = UnitConfigRepository(str(tmp_path), delay=0.01, status_callback=messages.append)
+    config = repo.get("Leaf Village", "Act 1")
+    repo.get("Leaf Village", "Act 1")
+    repo.flush()
+    assert config == unit_config_store.unit_config_template()
+    assert len(messages) == 1 and "Error loading unit config" in messages[0]
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == '{"Units": ['
+
+
+def test_saving_replaces_a_corrupt_act(tmp_path):
+    path = write_act(str(tmp_path), "Leaf Village", "Act 1", 'not json')
+    repo = UnitConfigRepository(str(tmp_path), status_callback=lambda message: None)
+    config = repo.get("Leaf Village", "Act 1")
+    config["Units"][0]["Enabled"] = True
+    repo.save("Leaf Village", "Act 1", config)
+    repo.flush()
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)["Units"][0]["Enabled"] is True
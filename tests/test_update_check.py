@@ -0,0 +1,109 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Saving the cache goes through config_store, which needs the app config
+pytest.importorskip("config_store")
+from update_check import UpdateCheckService  # noqa: E402
+
+RELEASE = {
+    "tag_name": "v9.9.9",
+    "body": "Notes",
+    "assets": [{
+        "name": "AnimeParadoxMacro_Release.zip",
+        "browser_download_url": "https://example.invalid/AnimeParadoxMacro_Release.zip",
+        "digest": "sha256:" + "ab" * 32
+    }]
+}
+
+
+class ReleaseServer:
+    """Stand-in for the GitHub releases API that answers If-None-Match with 304"""
+
+    def __init__(self):
+        self.etag = '"r1"'
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                if self.headers.get('If-None-Match') == server.etag:
+                    self.send_response(304)
+                    self.send_header('ETag', server.etag)
+                    self.end_headers()
+                    return
+                body = json.dumps(RELEASE).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', server.etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/releases/latest"
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = ReleaseServer()
+    yield server
+    server.close()
+
+
+def service(server, tmp_path, ttl):
+    return UpdateCheckService(cache_path=str(tmp_path / "update_cache.json"), ttl=ttl, url=server.url, timeout=5)
+
+
+def test_fresh_cache_skips_the_network(server, tmp_path):
+    checks = service(server, tmp_path, ttl=3600)
+    first = checks.check()
+    assert first["success"] and first["latest_version"] == "9.9.9" and first["update_available"]
+    assert not first["stale"]
+
+    # Also across restarts: the cache on disk is still within the TTL
+    again = service(server, tmp_path, ttl=3600)
+    assert again.check() == checks.check() == first
+    assert len(server.requests) == 1
+
+
+def test_not_modified_reuses_the_cached_release(server, tmp_path):
+    checks = service(server, tmp_path, ttl=0)
+    first = checks.check()
+    second = checks.check()
+    assert len(server.requests) == 2
+    assert server.requests[1]['If-None-Match'] == '"r1"'
+    assert second["latest_version"] == first["latest_version"]
+    assert second["download_url"] == first["download_url"]
+    assert second["checked_at"] >= first["checked_at"]
+    assert checks.last_error() is None
+
+
+def test_offline_falls_back_to_the_last_result(server, tmp_path):
+    checks = service(server, tmp_path, ttl=0)
+    first = checks.check()
+    server.close()
+
+    offline = service(server, tmp_path, ttl=0)
+    result = offline.check()
+    assert result["success"] and result["latest_version"] == first["latest_version"]
+    assert result["stale"]
+    assert offline.last_error().startswith("Network error")
+
+
+def test_offline_without_cache_reports_the_error(server, tmp_path):
+    server.close()
+    result = service(server, tmp_path, ttl=0).check()
+    assert not result["success"] and result["message"].startswith("Network error")
@@ -0,0 +1,221 @@
+"""
+Unit configuration repository for AnimeParadoxMacro
+Loads every Settings/Story/<location>/<act>.json once, normalizes the 15-slot
+Units records, serves lookups from memory and writes changes back behind the
+caller with atomic renames.
+"""
+import os
+import copy
+import json
+import threading
+from config_store import atomic_write_json
+from unit_fields import UNIT_SLOTS, UPGRADE_VALUES
+SETTINGS_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Settings", "Story")
+
+
+def default_unit(index):
+    """Blank record for one unit slot"""
+    return {
+        "Index": index,
+        "Enabled": False,
+        "PlaceBeforeYes": False,
+        "AutoUpgrade": False,
+        "Slot": "1",
+        "X": "",
+        "Y": "",
+        "Upgrade": "0",
+        "Note": f"Unit {index}"
+    }
+
+
+def unit_config_template():
+    """Blank unit config with all 15 slots"""
+    return {"Units": [default_unit(i) for i in range(1, UNIT_SLOTS + 1)]}
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def _as_coord(value):
+    """Coordinates are stored as strings of ints, or "" when unset"""
+    if value is None or value == '':
+        return ''
+    try:
+        return str(int(float(value)))
+    except (TypeError, ValueError):
+        return ''
+
+
+def normalize_units(config):
+    """Return a copy of config whose Units list has exactly 15 well-formed records"""
+    config = dict(config) if isinstance(config, dict) else {}
+    by_index = {}
+    for unit in config.get("Units") or []:
+        if not isinstance(unit, dict):
+            continue
+        try:
+            index = int(unit.get("Index"))
+        except (TypeError, ValueError):
+            continue
+        if 1 <= index <= UNIT_SLOTS and index not in by_index:
+            by_index[index] = unit
+
+    units = []
+    for index in range(1, UNIT_SLOTS + 1):
+        record = default_unit(index)
+        unit = by_index.get(index)
+        if unit is not None:
+            extra = {k: v for k, v in unit.items() if k not in record}
+            record["Enabled"] = _as_bool(unit.get("Enabled", False))
+            record["PlaceBeforeYes"] = _as_bool(unit.get("PlaceBeforeYes", False))
+            record["AutoUpgrade"] = _as_bool(unit.get("AutoUpgrade", False))
+            try:
+                slot = int(float(unit.get("Slot", 1)))
+                record["Slot"] = str(slot) if 0 <= slot <= 6 else "1"
+            except (TypeError, ValueError):
+                pass
+            record["X"] = _as_coord(unit.get("X"))
+            record["Y"] = _as_coord(unit.get("Y"))
+            upgrade = str(unit.get("Upgrade", "0")).strip()
+            record["Upgrade"] = "Max" if upgrade.lower() == "max" else (upgrade if upgrade in UPGRADE_VALUES else "0")
+            note = unit.get("Note", record["Note"])
+            record["Note"] = "" if note is None else str(note)
+            record.update(extra)
+        units.append(record)
+
+    config["Units"] = units
+    return config
+
+
+class UnitConfigRepository:
+    """In-memory index of all per-act unit configs with write-behind saves"""
+
+    def __init__(self, root=SETTINGS_ROOT, delay=0.5, status_callback=None):
+        self.root = root
+        self.delay = delay
+        self.status_callback = status_callback or print
+        self._lock = threading.RLock()
+        self._index = None
+        # {(location, act): error} for files that exist but cannot be parsed; they are never overwritten
+        self._unreadable = {}
+        self._reported = set()
+        self._dirty = set()
+        self._timer = None
+
+    def path_for(self, location, act):
+        return os.path.join(self.root, location, f"{act}.json")
+
+    def _read(self, path):
+        """Normalized config, or None if the file does not exist; raises OSError/ValueError if unreadable"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return normalize_units(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def _load(self, key):
+        """_read() for an indexed act; an unreadable file is remembered instead of raising"""
+        try:
+            config = self._read(self.path_for(*key))
+        except (OSError, ValueError) as e:
+            self._unreadable[key] = str(e)
+            self._reported.discard(key)
+            return None
+        self._unreadable.pop(key, None)
+        return config
+
+    def _ensure_index(self):
+        if self._index is not None:
+            return
+        self._index = {}
+        if not os.path.isdir(self.root):
+            return
+        for location in os.listdir(self.root):
+            folder = os.path.join(self.root, location)
+            if not os.path.isdir(folder):
+                continue
+            for filename in os.listdir(folder):
+                if filename.lower().endswith('.json'):
+                    key = (location, filename[:-5])
+                    config = self._load(key)
+                    if config is not None:
+                        self._index[key] = config
+
+    def locations(self):
+        """All indexed (location, act) pairs"""
+        with self._lock:
+            self._ensure_index()
+            return sorted(self._index)
+
+    def get(self, location, act):
+        """Unit config for a location/act; a blank one is created if missing.
+
+        A file that exists but cannot be read is left on disk untouched: a blank
+        config is returned without being saved, and the error is reported once.
+        """
+        with self._lock:
+            self._ensure_index()
+            key = (location, act)
+            config = self._index.get(key)
+            if config is None and key in self._unreadable:
+                if key not in self._reported:
+                    self._reported.add(key)
+                    self.status_callback(f"Error loading unit config {self.path_for(location, act)}: "
+                                         f"{self._unreadable[key]} (fix the file or save to replace it)")
+                return unit_config_template()
+            if config is None:
+                config = unit_config_template()
+                self._index[(location, act)] = config
+                self._mark_dirty((location, act))
+            return copy.deepcopy(config)
+
+    def save(self, location, act, config):
+        """Store a unit config in memory and schedule it to be written"""
+        with self._lock:
+            self._ensure_index()
+            self._index[(location, act)] = normalize_units(config)
+            self._unreadable.pop((location, act), None)
+            self._mark_dirty((location, act))
+
+    def invalidate(self, location, act):
+        """Re-read one config from disk (after an external tool changed it)"""
+        with self._lock:
+            self._ensure_index()
+            if (location, act) in self._dirty:
+                return
+            config = self._load((location, act))
+            if config is not None:
+                self._index[(location, act)] = config
+            elif (location, act) in self._unreadable:
+                # Keep serving the last good copy, if any, instead of a blank one
+                self._reported.add((location, act))
+                self.status_callback(f"Error loading unit config {self.path_for(location, act)}: "
+                                     f"{self._unreadable[(location, act)]}")
+
+    def _mark_dirty(self, key):
+        self._dirty.add(key)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Write all pending configs now"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            for location, act in sorted(self._dirty):
+                path = self.path_for(location, act)
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    atomic_write_json(path, self._index[(location, act)])
+                    print(f"Unit config saved to: {path}")
+                except Exception as e:
+                    print(f"Error saving unit config {path}: {e}")
+                    continue
+                self._dirty.discard((location, act))
@@ -0,0 +1,10 @@
+"""
+Unit record fields for AnimeParadoxMacro
+Limits and value sets of the per-act unit records. Kept free of the app
+config so the unit config store, the compiled placement plan and the
+scheduler can share them (and be tested) without it.
+"""
+UNIT_SLOTS = 15
+UPGRADE_VALUES = ('0', '1', '2', '3', '4', 'Max')
+# Index of "Max" in UPGRADE_VALUES: upgrade until the game reports the unit maxed
+UPGRADE_MAX = UPGRADE_VALUES.index('Max')
@@ -0,0 +1,146 @@
+"""
+Background update checks for AnimeParadoxMacro
+Keeps the last GitHub release response on disk together with its ETag and
+Last-Modified headers, revalidates it with conditional requests once the TTL
+has passed, and runs checks on a worker thread so callers on the UI bridge
+always get an answer straight from the cache.
+"""
+import os
+import json
+import time
+import threading
+import urllib.request
+import urllib.error
+from version import GITHUB_RELEASES_API
+from updater import AutoUpdater
+
+CACHE_NAME = 'update_cache.json'
+DEFAULT_TTL = 6 * 60 * 60
+
+
+class UpdateCheckService:
+    """Cached, conditional checks of the latest release"""
+
+    def __init__(self, cache_path=None, ttl=DEFAULT_TTL, url=GITHUB_RELEASES_API, timeout=10):
+        self._updater = AutoUpdater(status_callback=lambda message: None)
+        self.cache_path = cache_path or os.path.join(self._updater.app_dir, CACHE_NAME)
+        self.ttl = ttl
+        self.url = url
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._thread = None
+        self._callbacks = []
+        self._last_error = None
+        self._cache = self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except Exception:
+            return None
+        # A cache written for another endpoint says nothing about this one
+        if cache.get("url") != self.url or not isinstance(cache.get("release"), dict):
+            return None
+        return cache
+
+    def _save_cache(self, cache):
+        from config_store import atomic_write_json
+        try:
+            atomic_write_json(self.cache_path, cache)
+        except OSError as e:
+            print(f"Could not save update cache: {e}")
+
+    def is_fresh(self):
+        cache = self._cache
+        return cache is not None and time.time() - cache.get("checked_at", 0) < self.ttl
+
+    def is_checking(self):
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def cached(self):
+        """Result from the last successful check without touching the network, or None"""
+        cache = self._cache
+        if cache is None:
+            return None
+        result = self._updater.result_for_release(cache["release"])
+        result["checked_at"] = cache.get("checked_at")
+        result["stale"] = not self.is_fresh()
+        return result
+
+    def check(self, force=False):
+        """Blocking check: cached while fresh, otherwise a conditional request"""
+        if not force and self.is_fresh():
+            return self.cached()
+
+        cache = self._cache
+        headers = {'User-Agent': 'AnimeParadoxMacro-Updater'}
+        if cache:
+            if cache.get("etag"):
+                headers['If-None-Match'] = cache["etag"]
+            if cache.get("last_modified"):
+                headers['If-Modified-Since'] = cache["last_modified"]
+
+        try:
+            req = urllib.request.Request(self.url, headers=headers)
+            try:
+                with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                    data = json.loads(response.read().decode())
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
+            except urllib.error.HTTPError as e:
+                if e.code != 304 or not cache:
+                    raise
+                # Not modified: the cached release is still current
+                cache = dict(cache, checked_at=time.time())
+            else:
+                cache = {
+                    "url": self.url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "checked_at": time.time(),
+                    "release": self._updater.parse_release(data)
+                }
+        except Exception as e:
+            self._last_error = f"Network error: {e}" if isinstance(e, urllib.error.URLError) else f"Error checking for updates: {e}"
+            # An outdated answer beats none; the UI can still offer the known release
+            result = self.cached()
+            if result is not None:
+                return result
+            return {"success": False, "message": self._last_error}
+
+        with self._lock:
+            self._cache = cache
+            self._last_error = None
+        self._save_cache(cache)
+        return self.cached()
+
+    def check_async(self, callback=None, force=False):
+        """Run check() on a worker thread; ``callback(result)`` runs there when it finishes.
+
+        Overlapping requests share the check already in flight.
+        """
+        with self._lock:
+            if callback:
+                self._callbacks.append(callback)
+            if self.is_checking():
+                return False
+            self._thread = threading.Thread(target=self._run, args=(force,), name="UpdateCheck", daemon=True)
+            self._thread.start()
+        return True
+
+    def _run(self, force):
+        result = self.check(force=force)
+        with self._lock:
+            callbacks = self._callbacks
+            self._callbacks = []
+            self._thread = None
+        for callback in callbacks:
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"Update check callback error: {e}")
+
+    def last_error(self):
+        return self._last_error
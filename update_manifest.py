@@ -0,0 +1,99 @@
+"""
+Release manifests for AnimeParadoxMacro
+A manifest lists every file in a release with its size and SHA-256. release.py
+publishes one next to the zip; the updater compares it against the installed
+tree so only changed files are written and removed files are deleted.
+"""
+import os
+import json
+import hashlib
+
+MANIFEST_NAME = 'AnimeParadoxMacro_Manifest.json'
+INSTALLED_MANIFEST = 'install_manifest.json'
+
+# User data that updates must never overwrite or delete
+PROTECTED_FILES = ('config.json', 'macro_config.json', INSTALLED_MANIFEST)
+
+
+def hash_file(path):
+    """SHA-256 hex digest of a file"""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def build_manifest(version, files):
+    """Manifest for (archive name, local path) pairs"""
+    entries = {}
+    for arcname, path in files:
+        entries[arcname.replace('\\', '/')] = {
+            "size": os.path.getsize(path),
+            "sha256": hash_file(path)
+        }
+    return {"version": version, "files": entries}
+
+
+def load_installed_manifest(app_dir):
+    """Manifest recorded by the last successful update, or None"""
+    path = os.path.join(app_dir, INSTALLED_MANIFEST)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def save_installed_manifest(app_dir, manifest):
+    """Record the installed manifest plus file mtimes so later diffs can skip rehashing"""
+    from config_store import atomic_write_json
+    files = {}
+    for name, entry in manifest["files"].items():
+        record = dict(entry)
+        try:
+            record["mtime_ns"] = os.stat(os.path.join(app_dir, name)).st_mtime_ns
+        except OSError:
+            continue
+        files[name] = record
+    atomic_write_json(os.path.join(app_dir, INSTALLED_MANIFEST), {"version": manifest.get("version"), "files": files})
+
+
+def _is_protected(name):
+    return os.path.basename(name) in PROTECTED_FILES
+
+
+def diff_manifest(manifest, app_dir, installed=None):
+    """Compare a release manifest with the tree in app_dir.
+
+    Returns (changed, removed): names whose local copy is missing or differs,
+    and names the previous install shipped that the new release no longer has.
+    Local hashes are only computed when size/mtime don't match the installed record.
+    """
+    installed_files = (installed or {}).get("files", {})
+    changed = []
+    for name, entry in sorted(manifest["files"].items()):
+        if _is_protected(name):
+            continue
+        path = os.path.join(app_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            changed.append(name)
+            continue
+        if stat.st_size != entry["size"]:
+            changed.append(name)
+            continue
+        record = installed_files.get(name)
+        if record and record.get("mtime_ns") == stat.st_mtime_ns and record.get("size") == stat.st_size:
+            local_hash = record["sha256"]
+        else:
+            local_hash = hash_file(path)
+        if local_hash != entry["sha256"]:
+            changed.append(name)
+
+    removed = [
+        name for name in sorted(installed_files)
+        if name not in manifest["files"] and not _is_protected(name)
+    ]
+    return changed, removed
@@ -5,18 +5,24 @@ Checks GitHub for new versions and updates the application.
 import os
 import sys
 import json
-import shutil
 import tempfile
-import subprocess
 import urllib.request
 import urllib.error
 from version import VERSION, GITHUB_REPO, GITHUB_RELEASES_API
+import zipfile
+import hashlib
+from downloader import StreamingDownloader, DownloadError, RemoteFile, RangeNotSupported
+from zip_installer import ZipInstaller, replace_file, safe_member_path
+from update_manifest import MANIFEST_NAME, diff_manifest, load_installed_manifest, save_installed_manifest
+from install_slots import InstallSlots, SlotError
 
 class AutoUpdater:
     def __init__(self, status_callback=None):
         self.status_callback = status_callback or print
         self.current_version = VERSION
         self.app_dir = self._get_app_directory()
+        # Installed builds update into a spare A/B slot; running from source updates in place
+        self.use_slots = getattr(sys, 'frozen', False)
         
     def _get_app_directory(self):
         """Get the application directory (handles both .py and .exe)"""
@@ -46,38 +52,7 @@ class AutoUpdater:
             with urllib.request.urlopen(req, timeout=10) as response:
                 data = json.loads(response.read().decode())
             
-            latest_version = data.get('tag_name', '').lstrip('v')
-            release_notes = data.get('body', 'No release notes available.')
-            download_url = None
-            
-            # Find the zip asset
-            for asset in data.get('assets', []):
-                if asset['name'].endswith('.zip'):
-                    download_url = asset['browser_download_url']
-                    break
-            
-            # If no assets, check for the release zip directly
-            if not download_url:
-                # Try to get from releases/download
-                download_url = f"https://github.com/{GITHUB_REPO}/releases/download/{data.get('tag_name')}/AnimeParadoxMacro_Release.zip"
-            
-            if not latest_version:
-                return {
-                    "success": False,
-                    "message": "Could not determine latest version"
-                }
-            
-            # Compare versions
-            is_newer = self._compare_versions(latest_version, self.current_version)
-            
-            return {
-                "success": True,
-                "current_version": self.current_version,
-                "latest_version": latest_version,
-                "update_available": is_newer,
-                "download_url": download_url,
-                "release_notes": release_notes
-            }
+            return self.result_for_release(self.parse_release(data))
             
         except urllib.error.URLError as e:
             return {
@@ -90,6 +65,85 @@ class AutoUpdater:
                 "message": f"Error checking for updates: {str(e)}"
             }
     
+    def parse_release(self, data):
+        """Pull the fields the updater needs out of a GitHub release JSON"""
+        latest_version = data.get('tag_name', '').lstrip('v')
+        release_notes = data.get('body', 'No release notes available.')
+        download_url = None
+        sha256 = None
+        
+        # Find the zip asset
+        for asset in data.get('assets', []):
+            if asset['name'].endswith('.zip'):
+                download_url = asset['browser_download_url']
+                # GitHub publishes "sha256:<hex>" digests for release assets
+                digest = asset.get('digest') or ''
+                if digest.startswith('sha256:'):
+                    sha256 = digest.split(':', 1)[1]
+                break
+        
+        # Fall back to the .sha256 file uploaded by release.py
+        if download_url and not sha256:
+            sha256 = self._fetch_published_digest(data.get('assets', []), download_url)
+        
+        # Per-file manifest for differential updates
+        manifest_url = None
+        for asset in data.get('assets', []):
+            if asset['name'] == MANIFEST_NAME:
+                manifest_url = asset['browser_download_url']
+                break
+        
+        # If no assets, check for the release zip directly
+        if not download_url:
+            # Try to get from releases/download
+            download_url = f"https://github.com/{GITHUB_REPO}/releases/download/{data.get('tag_name')}/AnimeParadoxMacro_Release.zip"
+        
+        return {
+            "latest_version": latest_version,
+            "download_url": download_url,
+            "sha256": sha256,
+            "manifest_url": manifest_url,
+            "release_notes": release_notes
+        }
+    
+    def result_for_release(self, release):
+        """check_for_updates() result for parsed release info"""
+        if not release.get("latest_version"):
+            return {
+                "success": False,
+                "message": "Could not determine latest version"
+            }
+        
+        # Compare versions
+        is_newer = self._compare_versions(release["latest_version"], self.current_version)
+        
+        return {
+            "success": True,
+            "current_version": self.current_version,
+            "latest_version": release["latest_version"],
+            "update_available": is_newer,
+            "download_url": release["download_url"],
+            "sha256": release.get("sha256"),
+            "manifest_url": release.get("manifest_url"),
+            "release_notes": release.get("release_notes")
+        }
+    
+    def _fetch_published_digest(self, assets, download_url):
+        """Read the SHA-256 from a '<zip name>.sha256' release asset, if there is one"""
+        zip_name = download_url.rsplit('/', 1)[-1]
+        for asset in assets:
+            if asset['name'] == zip_name + '.sha256':
+                try:
+                    req = urllib.request.Request(
+                        asset['browser_download_url'],
+                        headers={'User-Agent': 'AnimeParadoxMacro-Updater'}
+                    )
+                    with urllib.request.urlopen(req, timeout=10) as response:
+                        return response.read().decode().split()[0].lower()
+                except Exception:
+                    return None
+        return None
+    
     def _compare_versions(self, latest, current):
         """Compare version strings. Returns True if latest > current"""
         try:
@@ -111,192 +165,177 @@ class AutoUpdater:
         except:
             return False
     
-    def download_and_install(self, download_url):
+    def download_and_install(self, download_url, expected_sha256=None, manifest_url=None):
         """Download the update and install it"""
         try:
-            self._update_status("Downloading update...")
-            
-            # Create temp directory
-            temp_dir = tempfile.mkdtemp(prefix="anime_paradox_update_")
-            zip_path = os.path.join(temp_dir, "update.zip")
-            extract_dir = os.path.join(temp_dir, "extracted")
-            
-            # Download the zip file
-            self._download_file(download_url, zip_path)
-            
-            self._update_status("Extracting update...")
-            
-            # Extract using available method
-            if not self._extract_zip(zip_path, extract_dir):
-                return {
-                    "success": False,
-                    "message": "Failed to extract update package"
-                }
-            
-            self._update_status("Installing update...")
-            
-            # Find the extracted content
-            extracted_contents = os.listdir(extract_dir)
-            source_dir = extract_dir
-            
-            # If there's a single folder, use that as source
-            if len(extracted_contents) == 1:
-                potential_dir = os.path.join(extract_dir, extracted_contents[0])
-                if os.path.isdir(potential_dir):
-                    source_dir = potential_dir
+            slots = None
+            target_dir = self.app_dir
+            if self.use_slots:
+                # Build the new version next to the running one; the live install is never touched
+                self._update_status("Preparing install slot...")
+                slots = InstallSlots.for_app_dir(self.app_dir)
+                try:
+                    slot_name, target_dir = slots.stage(self.app_dir)
+                except SlotError as e:
+                    # The last update is installed but not running yet; nothing was touched
+                    return {"success": False, "message": str(e), "restart_required": True}
             
-            # Copy files to app directory
-            files_updated = self._copy_update_files(source_dir, self.app_dir)
+            manifest = self._fetch_manifest(manifest_url) if manifest_url else None
+            if manifest:
+                files_updated = self._install_differential(download_url, manifest, target_dir, expected_sha256)
+            else:
+                self._update_status("Downloading update...")
+                
+                # Download the zip file (kept in a stable place so an interrupted download can resume)
+                zip_path = self._download_file(download_url, expected_sha256)
+                
+                self._update_status("Installing update...")
+                
+                # Stream changed members straight into the target directory
+                stats = ZipInstaller(zip_path, target_dir, self._update_status).install()
+                files_updated = stats["written"] + stats["removed"]
+                
+                try:
+                    os.remove(zip_path)
+                except OSError:
+                    pass
             
-            # Cleanup temp directory
-            try:
-                shutil.rmtree(temp_dir)
-            except:
-                pass
+            if slots and files_updated:
+                self._update_status("Validating update...")
+                slots.validate(slot_name, manifest)
+                slots.activate(slot_name)
+                self._update_status(f"Switched to install slot {slot_name}")
             
             self._update_status(f"Update complete! {files_updated} files updated.")
             
             return {
                 "success": True,
                 "message": f"Update installed successfully! {files_updated} files updated.",
-                "restart_required": True
+                "restart_required": files_updated > 0
             }
             
+        except SlotError as e:
+            return {
+                "success": False,
+                "message": f"Update failed validation, still running the current version: {str(e)}"
+            }
+        except DownloadError as e:
+            return {
+                "success": False,
+                "message": f"Download failed: {str(e)}"
+            }
         except Exception as e:
             return {
                 "success": False,
                 "message": f"Update failed: {str(e)}"
             }
     
-    def _download_file(self, url, dest_path):
-        """Download a file with progress updates"""
-        req = urllib.request.Request(
-            url,
-            headers={'User-Agent': 'AnimeParadoxMacro-Updater'}
-        )
-        
-        with urllib.request.urlopen(req, timeout=300) as response:
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            block_size = 8192
-            
-            with open(dest_path, 'wb') as f:
-                while True:
-                    chunk = response.read(block_size)
-                    if not chunk:
-                        break
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    
-                    if total_size > 0:
-                        percent = int((downloaded / total_size) * 100)
-                        self._update_status(f"Downloading... {percent}%")
+    def _fetch_manifest(self, manifest_url):
+        """Fetch the release manifest; None if it is unavailable"""
+        try:
+            req = urllib.request.Request(manifest_url, headers={'User-Agent': 'AnimeParadoxMacro-Updater'})
+            with urllib.request.urlopen(req, timeout=30) as response:
+                manifest = json.loads(response.read().decode())
+            if isinstance(manifest.get("files"), dict):
+                return manifest
+        except Exception as e:
+            self._update_status(f"Manifest unavailable, falling back to full update: {e}")
+        return None
     
-    def _extract_zip(self, zip_path, extract_dir):
-        """Extract zip file using available methods"""
-        os.makedirs(extract_dir, exist_ok=True)
-        
-        # Try WinRAR first
-        winrar_paths = [
-            r"C:\Program Files\WinRAR\WinRAR.exe",
-            r"C:\Program Files (x86)\WinRAR\WinRAR.exe"
-        ]
+    def _install_differential(self, download_url, manifest, target_dir, expected_sha256=None):
+        """Write only the files whose hashes differ from the manifest, delete removed ones.
+
+        Returns the number of files written or removed.
+        """
+        self._update_status("Comparing installed files...")
+        # Manifest names become paths under target_dir; refuse any that could escape it
+        for name in manifest["files"]:
+            try:
+                safe_member_path(target_dir, name)
+            except ValueError as e:
+                raise DownloadError(str(e))
+        changed, removed = diff_manifest(manifest, target_dir, load_installed_manifest(target_dir))
         
-        for winrar_path in winrar_paths:
-            if os.path.exists(winrar_path):
+        if changed:
+            self._update_status(f"Fetching {len(changed)} changed files...")
+            try:
+                # Read just the needed members out of the remote zip
+                zip_source = RemoteFile(download_url)
+            except RangeNotSupported:
+                zip_source = self._download_file(download_url, expected_sha256)
+            with zipfile.ZipFile(zip_source) as zipf:
+                for name in changed:
+                    self._install_member(zipf, name, manifest["files"][name]["sha256"], target_dir)
+                    self._update_status(f"Updated: {name}")
+            if isinstance(zip_source, str):
                 try:
-                    subprocess.run(
-                        [winrar_path, 'x', '-y', zip_path, extract_dir + '\\'],
-                        check=True,
-                        capture_output=True,
-                        timeout=300
-                    )
-                    self._update_status("Extracted with WinRAR")
-                    return True
-                except:
+                    os.remove(zip_source)
+                except OSError:
                     pass
         
-        # Try 7-Zip
-        sevenz_paths = [
-            r"C:\Program Files\7-Zip\7z.exe",
-            r"C:\Program Files (x86)\7-Zip\7z.exe"
-        ]
-        
-        for sevenz_path in sevenz_paths:
-            if os.path.exists(sevenz_path):
-                try:
-                    subprocess.run(
-                        [sevenz_path, 'x', '-y', f'-o{extract_dir}', zip_path],
-                        check=True,
-                        capture_output=True,
-                        timeout=300
-                    )
-                    self._update_status("Extracted with 7-Zip")
-                    return True
-                except:
-                    pass
+        for name in removed:
+            try:
+                os.remove(safe_member_path(target_dir, name))
+                self._update_status(f"Removed: {name}")
+            except (OSError, ValueError):
+                pass
         
-        # Fallback to Python's zipfile
-        try:
-            import zipfile
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-            self._update_status("Extracted with Python zipfile")
-            return True
-        except Exception as e:
-            self._update_status(f"Extraction failed: {str(e)}")
-            return False
+        save_installed_manifest(target_dir, manifest)
+        return len(changed) + len(removed)
     
-    def _copy_update_files(self, source_dir, dest_dir):
-        """Copy update files to destination, skipping config files"""
-        files_to_skip = ['config.json', 'macro_config.json']
-        folders_to_update = ['buttons', 'Settings', 'starting image', 'unit stuff']
-        files_updated = 0
+    def _install_member(self, zipf, name, expected_sha256, target_dir):
+        """Extract one member next to its destination, verify it, then swap it in"""
+        try:
+            dst_path = safe_member_path(target_dir, name)
+        except ValueError as e:
+            raise DownloadError(str(e))
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        temp_path = dst_path + '.update-tmp'
+        sha256 = hashlib.sha256()
+        with zipf.open(name) as src, open(temp_path, 'wb') as dst:
+            for chunk in iter(lambda: src.read(1024 * 1024), b''):
+                sha256.update(chunk)
+                dst.write(chunk)
+        if sha256.hexdigest() != expected_sha256:
+            os.remove(temp_path)
+            raise DownloadError(f"Checksum mismatch for {name}")
         
-        # Copy folders
-        for folder in folders_to_update:
-            src_folder = os.path.join(source_dir, folder)
-            dst_folder = os.path.join(dest_dir, folder)
-            
-            if os.path.exists(src_folder):
-                # Remove existing folder and copy new one
-                if os.path.exists(dst_folder):
-                    try:
-                        shutil.rmtree(dst_folder)
-                    except:
-                        pass
-                
-                try:
-                    shutil.copytree(src_folder, dst_folder)
-                    files_updated += 1
-                    self._update_status(f"Updated: {folder}/")
-                except Exception as e:
-                    self._update_status(f"Warning: Could not update {folder}: {e}")
+        replace_file(temp_path, dst_path)
+    
+    def _download_file(self, url, expected_sha256=None):
+        """Download a file with resume, checksum verification and throttled progress"""
+        download_dir = os.path.join(tempfile.gettempdir(), "anime_paradox_download")
+        os.makedirs(download_dir, exist_ok=True)
+        dest_path = os.path.join(download_dir, url.rsplit('/', 1)[-1] or "update.zip")
         
-        # Copy exe if it exists in update
-        for filename in os.listdir(source_dir):
-            src_path = os.path.join(source_dir, filename)
-            dst_path = os.path.join(dest_dir, filename)
-            
-            if os.path.isfile(src_path):
-                if filename in files_to_skip:
-                    continue
-                
-                if filename.endswith('.exe'):
-                    # For exe, we need to rename current and copy new
-                    try:
-                        if os.path.exists(dst_path):
-                            backup_path = dst_path + '.old'
-                            if os.path.exists(backup_path):
-                                os.remove(backup_path)
-                            os.rename(dst_path, backup_path)
-                        shutil.copy2(src_path, dst_path)
-                        files_updated += 1
-                        self._update_status(f"Updated: {filename}")
-                    except Exception as e:
-                        self._update_status(f"Warning: Could not update {filename}: {e}")
+        def on_progress(downloaded, total):
+            if total > 0:
+                percent = int((downloaded / total) * 100)
+                self._update_status(f"Downloading... {percent}%")
         
-        return files_updated
+        downloader = StreamingDownloader(progress_callback=on_progress)
+        digest = downloader.download(url, dest_path, expected_sha256)
+        if expected_sha256:
+            self._update_status("Download verified (SHA-256)")
+        else:
+            self._update_status(f"Downloaded (SHA-256 {digest[:12]}..., no published digest to verify)")
+        return dest_path
+
+
+def rollback_update():
+    """Switch an installed build back to the version that ran before the last update"""
+    updater = AutoUpdater()
+    if not updater.use_slots:
+        return {"success": False, "message": "Rollback is only available in the installed app"}
+    try:
+        name = InstallSlots.for_app_dir(updater.app_dir).rollback()
+    except (SlotError, OSError) as e:
+        return {"success": False, "message": f"Rollback failed: {str(e)}"}
+    return {
+        "success": True,
+        "message": f"Rolled back to install slot {name}.",
+        "restart_required": True
+    }
 
 
 def check_update():
@@ -305,7 +344,7 @@ def check_update():
     return updater.check_for_updates()
 
 
-def perform_update(download_url, status_callback=None):
+def perform_update(download_url, status_callback=None, expected_sha256=None, manifest_url=None):
     """Perform the update - downloads and installs"""
     updater = AutoUpdater(status_callback)
-    return updater.download_and_install(download_url)
+    return updater.download_and_install(download_url, expected_sha256, manifest_url)
@@ -0,0 +1,226 @@
+"""
+Window geometry service for AnimeParadoxMacro
+Computes the UI layout metrics once (until ui.html changes), tracks the
+attached Roblox window rect and DPI in one place, and notifies listeners such
+as the engine when the region moves. Win32 calls live in a backend so the
+service can run against a stub on other platforms.
+"""
+import os
+import re
+import threading
+
+UI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ui.html')
+
+# CSS constants from ui.html that the embedded layout depends on
+DEFAULT_MAIN_PANEL_WIDTH = 550
+BODY_PADDING = 15
+PANEL_GAP = 15
+BORDER_ADJUST = 5
+HEADER_HEIGHT = 60
+GAME_WIDTH = 960
+GAME_HEIGHT = 600
+
+_layout_cache = {}
+
+
+def get_layout_metrics(ui_path=UI_PATH):
+    """Layout metrics derived from ui.html, cached until its mtime changes"""
+    try:
+        mtime = os.stat(ui_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    cached = _layout_cache.get(ui_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    main_panel_width = DEFAULT_MAIN_PANEL_WIDTH
+    if mtime is not None:
+        try:
+            with open(ui_path, 'r', encoding='utf-8') as fh:
+                content = fh.read()
+            m = re.search(r"\.main-panel\s*\{[^}]*width:\s*(\d+)px", content)
+            if m:
+                main_panel_width = int(m.group(1))
+        except Exception:
+            pass
+
+    metrics = {
+        "main_panel_width": main_panel_width,
+        "settings_width": main_panel_width + BODY_PADDING + PANEL_GAP + BORDER_ADJUST,
+        "header_height": HEADER_HEIGHT,
+        "game_width": GAME_WIDTH,
+        "game_height": GAME_HEIGHT
+    }
+    _layout_cache[ui_path] = (mtime, metrics)
+    return metrics
+
+
+class Win32GeometryBackend:
+    """Window rects and DPI from user32/gdi32"""
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._user32 = ctypes.windll.user32
+        self._gdi32 = ctypes.windll.gdi32
+
+    def is_window(self, hwnd):
+        return bool(hwnd) and bool(self._user32.IsWindow(hwnd))
+
+    def get_rect(self, hwnd):
+        rect = self._wintypes.RECT()
+        self._user32.GetWindowRect(hwnd, self._ctypes.byref(rect))
+        return (rect.left, rect.top, rect.right, rect.bottom)
+
+    def get_dpi(self, hwnd):
+        try:
+            # Windows 10+
+            dpi = self._user32.GetDpiForWindow(hwnd)
+            if dpi:
+                return dpi
+        except Exception:
+            pass
+        try:
+            # Fallback: use desktop DPI
+            hdc = self._user32.GetDC(0)
+            LOGPIXELSX = 88
+            dpi = self._gdi32.GetDeviceCaps(hdc, LOGPIXELSX)
+            self._user32.ReleaseDC(0, hdc)
+            return dpi or 96
+        except Exception:
+            return 96
+
+
+class StubGeometryBackend:
+    """In-memory backend for running without Win32 (tests, replay, Linux)"""
+
+    def __init__(self, windows=None, dpi=96):
+        self.windows = dict(windows or {})
+        self.dpi = dpi
+
+    def is_window(self, hwnd):
+        return hwnd in self.windows
+
+    def get_rect(self, hwnd):
+        return tuple(self.windows[hwnd])
+
+    def get_dpi(self, hwnd):
+        return self.dpi
+
+
+def default_backend():
+    """Win32 backend on Windows, stub elsewhere"""
+    if os.name == 'nt':
+        return Win32GeometryBackend()
+    return StubGeometryBackend()
+
+
+class GeometryService:
+    """Single owner of the Roblox window rect/DPI with change notifications"""
+
+    def __init__(self, backend=None, ui_path=UI_PATH):
+        self.backend = backend or default_backend()
+        self.ui_path = ui_path
+        self._lock = threading.Lock()
+        self._hwnd = None
+        self._region = None
+        self._dpi = {}
+        self._tracked_dpi = None
+        self._listeners = []
+        self._watch_stop = None
+
+    def layout(self):
+        return get_layout_metrics(self.ui_path)
+
+    def add_listener(self, callback):
+        """``callback(region)`` runs whenever the tracked region changes (region may be None)"""
+        self._listeners.append(callback)
+
+    def track(self, hwnd):
+        """Start tracking a window (None to stop)"""
+        with self._lock:
+            self._hwnd = hwnd
+        return self.refresh()
+
+    @property
+    def hwnd(self):
+        return self._hwnd
+
+    def is_attached(self):
+        return self._hwnd is not None and self.backend.is_window(self._hwnd)
+
+    def refresh(self):
+        """Re-read the tracked window rect, notifying listeners if it changed"""
+        with self._lock:
+            hwnd = self._hwnd
+            region = None
+            dpi = None
+            if hwnd is not None and self.backend.is_window(hwnd):
+                region = self.backend.get_rect(hwnd)
+                dpi = self.backend.get_dpi(hwnd)
+            changed = region != self._region
+            # A move (possibly to another monitor) or a scaling change makes every cached scale suspect,
+            # including the app window's, which the tracked window is embedded in
+            if changed or dpi != self._tracked_dpi:
+                self._dpi.clear()
+            self._region = region
+            self._tracked_dpi = dpi
+        if changed:
+            for callback in list(self._listeners):
+                try:
+                    callback(region)
+                except Exception as e:
+                    print(f"Geometry listener error: {e}")
+        return region
+
+    def roblox_region(self):
+        """Current (left, top, right, bottom) of the tracked window, or None"""
+        return self.refresh()
+
+    def window_info(self):
+        """Tracked window as x/y/width/height, or the default embedded position"""
+        region = self.refresh()
+        if region:
+            return {"x": region[0], "y": region[1], "width": region[2] - region[0], "height": region[3] - region[1]}
+        layout = self.layout()
+        return {"x": layout["settings_width"], "y": layout["header_height"],
+                "width": layout["game_width"], "height": layout["game_height"]}
+
+    def dpi_scale(self, hwnd):
+        """DPI scale factor (1.0 = 96 DPI) for a window, cached until the tracked window moves or rescales"""
+        with self._lock:
+            scale = self._dpi.get(hwnd)
+        if scale is None:
+            dpi = self.backend.get_dpi(hwnd)
+            scale = float(dpi) / 96.0 if dpi else 1.0
+            with self._lock:
+                self._dpi[hwnd] = scale
+        return scale
+
+    def invalidate_dpi(self, hwnd=None):
+        """Drop cached scales (e.g. on WM_DPICHANGED for a window the watcher does not track)"""
+        with self._lock:
+            if hwnd is None:
+                self._dpi.clear()
+            else:
+                self._dpi.pop(hwnd, None)
+
+    def start_watching(self, interval=0.5):
+        """Poll the tracked window in the background so listeners see moves/resizes"""
+        if self._watch_stop is not None:
+            return
+        stop = threading.Event()
+        self._watch_stop = stop
+
+        def watch():
+            while not stop.wait(interval):
+                self.refresh()
+
+        threading.Thread(target=watch, name="GeometryWatcher", daemon=True).start()
+
+    def stop_watching(self):
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+            self._watch_stop = None
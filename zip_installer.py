@@ -0,0 +1,166 @@
+"""
+In-process update installer for AnimeParadoxMacro
+Streams members of an update zip straight to their final location (temp name
+plus rename), skips members whose size and CRC32 already match the installed
+file, and decompresses members on a thread pool.
+"""
+import os
+import zlib
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# What an update replaces: these folders plus any top-level .exe
+FOLDERS_TO_UPDATE = ('buttons', 'glyphs', 'Settings', 'starting image', 'unit stuff')
+# Stale files are pruned from updated folders, except where users keep their own files
+KEEP_STALE_FOLDERS = ('Settings',)
+FILES_TO_SKIP = ('config.json', 'macro_config.json')
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_crc32(path):
+    """CRC32 of a file, as zipfile stores it"""
+    crc = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc & 0xFFFFFFFF
+
+
+def replace_file(temp_path, dst_path):
+    """Move a finished temp file over its destination"""
+    if dst_path.lower().endswith('.exe') and os.path.exists(dst_path):
+        # A running exe can be renamed but not overwritten
+        backup_path = dst_path + '.old'
+        if os.path.exists(backup_path):
+            os.remove(backup_path)
+        os.rename(dst_path, backup_path)
+    os.replace(temp_path, dst_path)
+
+
+def safe_member_path(dest_dir, rel):
+    """Path of a '/'-separated archive name inside dest_dir.
+
+    Raises ValueError for names that could land outside it (zip slip):
+    absolute paths, drive letters, backslashes, '..' components.
+    """
+    parts = rel.split('/')
+    if not rel or '\\' in rel or ':' in rel or any(part in ('', '.', '..') for part in parts):
+        raise ValueError(f"Unsafe path in update archive: {rel!r}")
+    root = os.path.realpath(dest_dir)
+    path = os.path.realpath(os.path.join(root, *parts))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Update archive path escapes the install folder: {rel!r}")
+    return path
+
+
+def _strip_common_root(names):
+    """Prefix to drop when the whole archive sits in one wrapper folder"""
+    tops = {name.split('/', 1)[0] for name in names}
+    if len(tops) == 1:
+        top = tops.pop()
+        if top not in FOLDERS_TO_UPDATE and all('/' in name for name in names):
+            return top + '/'
+    return ''
+
+
+class ZipInstaller:
+    """Installs an update zip into dest_dir in one pass"""
+
+    def __init__(self, zip_path, dest_dir, status_callback=None, max_workers=None):
+        self.zip_path = zip_path
+        self.dest_dir = dest_dir
+        self.status_callback = status_callback or print
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 2))
+        self._local = threading.local()
+        self._handles = []
+        self._handles_lock = threading.Lock()
+
+    def _zip(self):
+        """Per-thread ZipFile handle so members decompress independently"""
+        zipf = getattr(self._local, 'zipf', None)
+        if zipf is None:
+            zipf = zipfile.ZipFile(self.zip_path)
+            self._local.zipf = zipf
+            with self._handles_lock:
+                self._handles.append(zipf)
+        return zipf
+
+    def _select_members(self, infos):
+        files = [info for info in infos if not info.is_dir()]
+        prefix = _strip_common_root([info.filename for info in files])
+        selected = []
+        for info in files:
+            rel = info.filename[len(prefix):]
+            if not rel or os.path.basename(rel) in FILES_TO_SKIP:
+                continue
+            try:
+                safe_member_path(self.dest_dir, rel)
+            except ValueError as e:
+                self.status_callback(f"Skipping {info.filename}: {e}")
+                continue
+            top = rel.split('/', 1)[0]
+            if ('/' in rel and top in FOLDERS_TO_UPDATE) or ('/' not in rel and rel.lower().endswith('.exe')):
+                selected.append((info, rel))
+        return selected
+
+    def _install_member(self, info, rel):
+        dst_path = safe_member_path(self.dest_dir, rel)
+        try:
+            if os.path.getsize(dst_path) == info.file_size and file_crc32(dst_path) == info.CRC:
+                return False
+        except OSError:
+            pass
+
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        temp_path = dst_path + '.update-tmp'
+        try:
+            # ZipExtFile checks the CRC when the member has been read completely
+            with self._zip().open(info) as src, open(temp_path, 'wb') as dst:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                    dst.write(chunk)
+            replace_file(temp_path, dst_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return True
+
+    def _prune_stale(self, installed):
+        removed = 0
+        for folder in FOLDERS_TO_UPDATE:
+            if folder in KEEP_STALE_FOLDERS or not any(rel.startswith(folder + '/') for rel in installed):
+                continue
+            root_dir = os.path.join(self.dest_dir, folder)
+            for root, dirs, files in os.walk(root_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    rel = os.path.relpath(path, self.dest_dir).replace(os.sep, '/')
+                    if rel not in installed:
+                        try:
+                            os.remove(path)
+                            removed += 1
+                        except OSError:
+                            pass
+        return removed
+
+    def install(self):
+        """Extract everything that changed; returns counts of written/skipped/removed files"""
+        with zipfile.ZipFile(self.zip_path) as zipf:
+            members = self._select_members(zipf.infolist())
+
+        written = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = pool.map(lambda member: (member[1], self._install_member(*member)), members)
+                for rel, changed in results:
+                    if changed:
+                        written += 1
+                        self.status_callback(f"Updated: {rel}")
+        finally:
+            for zipf in self._handles:
+                zipf.close()
+            self._handles = []
+
+        removed = self._prune_stale({rel for _, rel in members})
+        return {"written": written, "skipped": len(members) - written, "removed": removed}